@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""Measure the all command against printing one list of every object.
+
+Usage: python3 benchmarks/bench_all.py [number_of_places]
+
+The output goes to a sink that records when its first write arrives;
+peak memory is the largest size traced by tracemalloc during the command.
+The json output mode is timed twice: the first run encodes every record,
+the second reuses the records cached by the first.
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+class Sink(io.TextIOBase):
+    """Text stream that drops its input and times its first write."""
+
+    def __init__(self):
+        self.first = None
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(text)
+
+
+def whole_list():
+    """Print every place the way the all command used to."""
+    objl = []
+    for obj in storage.all(Place).values():
+        objl.append(obj.__str__())
+    print(objl)
+
+
+def measure(command):
+    """Return (seconds to first write, seconds, peak MB) of command()."""
+    sink = Sink()
+    stdout = sys.stdout
+    sys.stdout = sink
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        command()
+    finally:
+        end = time.perf_counter()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        sys.stdout = stdout
+    return sink.first - start, end - start, peak / 1e6
+
+
+def main(n):
+    """Store n places and time printing them."""
+    for i in range(n):
+        storage.new(Place(id=str(i), created_at="2024-01-01T00:00:00",
+                          updated_at="2024-01-01T00:00:00",
+                          name="Place {}".format(i), price_by_night=i))
+    console = HBNBCommand()
+    console.onecmd("output json")
+    print("{} places".format(n))
+    print("{:<36} {:>12} {:>10} {:>10}".format(
+        "command", "first byte", "total", "peak"))
+    for name, command in (
+            ("one list", whole_list),
+            ("all Place", lambda: HBNBCommand().onecmd("all Place")),
+            ("all Place --page-size 100 --page 3",
+             lambda: HBNBCommand().onecmd(
+                 "all Place --page-size 100 --page 3")),
+            ("json: all Place", lambda: console.onecmd("all Place")),
+            ("json: all Place, cached", lambda: console.onecmd(
+                "all Place"))):
+        first, total, peak = measure(command)
+        print("{:<36} {:>9.1f} ms {:>7.2f} s {:>7.1f} MB".format(
+            name, first * 1000, total, peak))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
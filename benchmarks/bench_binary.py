@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""Compare reload of the JSON and binary snapshot formats.
+
+Usage: python3 benchmarks/bench_binary.py [number_of_objects]
+
+The same objects are written as file.json and converted to file.hbnb.
+Each loader runs in its own interpreter and reports the reload time,
+its peak RSS, and the time of 1000 get() calls on random ids (scaled
+from fewer calls when there are fewer objects).
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+LOADERS = {
+    "json": {"HBNB_SNAPSHOT_FORMAT": "json"},
+    "json-lazy": {"HBNB_SNAPSHOT_FORMAT": "json", "HBNB_LAZY_LOAD": "1"},
+    "binary": {"HBNB_SNAPSHOT_FORMAT": "binary"}
+}
+
+
+def run(loader, workdir):
+    """Reload workdir with loader and print its measurements."""
+    os.environ.update(LOADERS[loader])
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    from models.engine.file_storage import FileStorage
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    os.chdir(workdir)
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    with open("ids.txt") as f:
+        keys = f.read().split()
+    keys = random.Random(0).sample(keys, min(1000, len(keys)))
+    start = time.perf_counter()
+    for key in keys:
+        storage.get(*key.split("."))
+    get = (time.perf_counter() - start) * 1000 * 1000 / max(len(keys), 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print("{:<10} {:>10.2f} s {:>10.1f} ms {:>10.1f} MiB {:>10}".format(
+        loader, elapsed, get, peak / 1024, storage.count()))
+    FileStorage._FileStorage__objects = {}
+
+
+def main(n):
+    """Write n objects in both formats and time every loader on them."""
+    from benchmarks.fixtures import write_snapshot
+    from models.engine import binary_snapshot
+    from models.engine.json_stream import JSONStream
+    workdir = tempfile.mkdtemp()
+    json_path = os.path.join(workdir, "file.json")
+    write_snapshot(json_path, n)
+    binary_snapshot.convert(json_path, os.path.join(workdir, "file.hbnb"))
+    with open(json_path) as f, \
+            open(os.path.join(workdir, "ids.txt"), "w") as ids:
+        for key, o in JSONStream(f):
+            ids.write(key + "\n")
+    print("{} objects, file.json {:.1f} MiB, file.hbnb {:.1f} MiB".format(
+        n, os.path.getsize(json_path) / 2 ** 20,
+        os.path.getsize(os.path.join(workdir, "file.hbnb")) / 2 ** 20))
+    print("{:<10} {:>12} {:>13} {:>14} {:>10}".format(
+        "loader", "reload", "1000 get()", "peak RSS", "objects"))
+    for loader in LOADERS:
+        subprocess.run([sys.executable, __file__, "--run", loader, workdir],
+                       check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""Compare strptime() with parse_datetime() when rebuilding objects.
+
+Usage: python3 benchmarks/bench_datetime.py [number_of_objects]
+
+Times parsing the timestamps alone, then rebuilding the objects the way
+FileStorage.reload() does, once with each parser.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+import models.base_model  # noqa: E402
+from benchmarks.fixtures import make_object  # noqa: E402
+from models.engine import file_storage  # noqa: E402
+
+
+def strptime(value):
+    """Parse value the way BaseModel did before parse_datetime()."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+
+
+def rebuild(dicts):
+    """Rebuild every object of dicts as reload() does."""
+    for o in dicts:
+        o = dict(o)
+        cls_name = o.pop("__class__")
+        getattr(file_storage, cls_name)(**o)
+
+
+def main(n):
+    """Time both parsers on n objects."""
+    dicts = [make_object(i) for i in range(n)]
+    stamps = [o["created_at"] for o in dicts]
+    fast = models.base_model.parse_datetime
+    print("{} objects".format(n))
+    print("{:<16} {:>12} {:>12}".format("parser", "parse", "rebuild"))
+    for name, parser in (("strptime", strptime), ("parse_datetime", fast)):
+        start = time.perf_counter()
+        for stamp in stamps:
+            parser(stamp)
+        parse = time.perf_counter() - start
+        models.base_model.parse_datetime = parser
+        start = time.perf_counter()
+        rebuild(dicts)
+        build = time.perf_counter() - start
+        print("{:<16} {:>10.2f} s {:>10.2f} s".format(name, parse, build))
+    models.base_model.parse_datetime = fast
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""Compare the file and SQLite engines on memory and lookup latency.
+
+Usage: python3 benchmarks/bench_engines.py [number_of_objects ...]
+
+For every size, each engine opens the same fake data in its own
+interpreter, then runs 1000 get() calls and a filtered count; the peak
+RSS covers the whole run.
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def run(engine, workdir):
+    """Open workdir with engine and print its measurements."""
+    os.environ["HBNB_TYPE_STORAGE"] = engine
+    os.chdir(workdir)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    from models import storage
+    opened = time.perf_counter() - start
+    with open("ids.txt") as f:
+        ids = f.read().split()
+    ids = random.Random(0).sample(ids, min(1000, len(ids)))
+    start = time.perf_counter()
+    for id in ids:
+        storage.get("User", id)
+    get = (time.perf_counter() - start) * 1000 / len(ids)
+    start = time.perf_counter()
+    places = storage.columns("Place").aggregate("count", None,
+                                                [("max_guest", ">=", 4)])
+    query = (time.perf_counter() - start) * 1000
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print("{:<7} {:>9.2f} s {:>10.4f} {:>10.1f} {:>10.1f} MiB {:>8}".format(
+        engine, opened, get, query, peak / 1024, places))
+
+
+def build(workdir, n):
+    """Write n fake objects as file.json and as file.db in workdir."""
+    from benchmarks.fixtures import write_snapshot
+    os.chdir(workdir)
+    write_snapshot("file.json", n)
+    from models.engine.file_storage import FileStorage
+    from models.engine.sqlite_storage import SQLiteStorage
+    objs = FileStorage()
+    objs.reload()
+    engine = SQLiteStorage()
+    engine.reload()
+    with open("ids.txt", "w") as f:
+        for key, obj in objs.all().items():
+            engine.new(obj)
+            if key.startswith("User."):
+                f.write(obj.id + "\n")
+    engine.save()
+
+
+def main(sizes):
+    """Build the data for every size and measure both engines on it."""
+    print("{:<7} {:>11} {:>10} {:>10} {:>14} {:>8}".format(
+        "engine", "open", "get ms", "query ms", "peak RSS", "matches"))
+    for n in sizes:
+        print("{} objects".format(n))
+        workdir = tempfile.mkdtemp()
+        subprocess.run([sys.executable, __file__, "--build", workdir,
+                        str(n)], check=True)
+        for engine in ("file", "sqlite"):
+            subprocess.run([sys.executable, __file__, "--run", engine,
+                            workdir], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) > 1 and sys.argv[1] == "--build":
+        build(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(n) for n in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""Measure geospatial queries against a full scan.
+
+Usage: python3 benchmarks/bench_geo.py [number_of_places]
+
+Places are spread uniformly over the contiguous United States, plus a
+tenth of them within 10 km of San Francisco to show a dense city. Each
+query is run from random points, in the city and elsewhere, and the
+mean latency is reported.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.engine import geo  # noqa: E402
+from models.place import Place  # noqa: E402
+
+QUERIES = 200
+
+
+def scan(lat, lon, radius_km, limit):
+    """Answer nearby() by computing the distance of every place."""
+    found = []
+    for key, obj in storage.all(Place).items():
+        distance = geo.distance_km(lat, lon, obj.latitude, obj.longitude)
+        if distance <= radius_km:
+            found.append((distance, key))
+    return sorted(found)[:limit]
+
+
+def timed(query, points):
+    """Return the mean milliseconds of query over points."""
+    start = time.perf_counter()
+    for lat, lon in points:
+        query(lat, lon)
+    return (time.perf_counter() - start) * 1000 / len(points)
+
+
+def main(n):
+    """Store n places and time nearby() and bbox() on them."""
+    rand = random.Random(0)
+    for i in range(n):
+        if i % 10:
+            lat, lon = rand.uniform(24.5, 49.0), rand.uniform(-124.7, -67.0)
+        else:
+            lat = 37.77 + rand.uniform(-0.09, 0.09)
+            lon = -122.42 + rand.uniform(-0.11, 0.11)
+        storage.new(Place(id=str(i), created_at="2023-08-11T00:00:00",
+                          updated_at="2023-08-11T00:00:00", latitude=lat,
+                          longitude=lon))
+    start = time.perf_counter()
+    storage.nearby(0.0, 0.0, 1.0)
+    print("{} places, index built in {:.2f} s".format(
+        n, time.perf_counter() - start))
+    city = [(37.77 + rand.uniform(-0.05, 0.05),
+             -122.42 + rand.uniform(-0.05, 0.05)) for _ in range(QUERIES)]
+    country = [(rand.uniform(25.0, 48.5), rand.uniform(-124.0, -68.0))
+               for _ in range(QUERIES)]
+    queries = (
+        ("nearby 10 km, 50 nearest",
+         lambda lat, lon: storage.nearby(lat, lon, 10.0, 50)),
+        ("nearby 1 km",
+         lambda lat, lon: storage.nearby(lat, lon, 1.0)),
+        ("bbox 0.1 x 0.1 deg",
+         lambda lat, lon: storage.bbox(lat - 0.05, lon - 0.05, lat + 0.05,
+                                       lon + 0.05)),
+    )
+    print("{:<26} {:>12} {:>12}".format("query", "city", "country"))
+    for name, query in queries:
+        print("{:<26} {:>9.3f} ms {:>9.3f} ms".format(
+            name, timed(query, city), timed(query, country)))
+    print("{:<26} {:>9.1f} ms".format(
+        "full scan, 10 km", timed(lambda lat, lon: scan(lat, lon, 10.0, 50),
+                                  city[:3])))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
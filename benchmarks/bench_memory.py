@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+"""Compare bytes per object of the regular and compact model classes.
+
+Usage: python3 benchmarks/bench_memory.py [number_of_objects]
+
+Places are rebuilt from to_dict() output as reload() does, measured with
+tracemalloc once built and again after to_dict() has run on every one of
+them, as the first save does.
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from benchmarks.fixtures import make_object  # noqa: E402
+from models.compact import compact  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def measure(cls, dicts):
+    """Return bytes per object of cls once built and after to_dict()."""
+    tracemalloc.start()
+    objs = [cls(**o) for o in dicts]
+    built = tracemalloc.get_traced_memory()[0]
+    for obj in objs:
+        obj.to_dict()
+    saved = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built / len(objs), saved / len(objs)
+
+
+def main(n):
+    """Measure n Places with each representation."""
+    dicts = []
+    for i in range(n):
+        odict = make_object(i * 6 + 3)
+        del odict["__class__"]
+        dicts.append(odict)
+    print("{} Places".format(n))
+    print("{:<8} {:>12} {:>12}".format("class", "built", "after save"))
+    for name, cls in (("regular", Place), ("compact", compact(Place))):
+        built, saved = measure(cls, dicts)
+        print("{:<8} {:>8.0f} B/o {:>8.0f} B/o".format(name, built, saved))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
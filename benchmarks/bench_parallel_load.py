@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""Measure reload() with 1, 2, 4 and 8 worker processes.
+
+Usage: python3 benchmarks/bench_parallel_load.py [number_of_objects]
+
+Each run is a cold start in its own interpreter. "eager" builds every
+object, "lazy" (HBNB_LAZY_LOAD=1) only keeps the decoded dictionaries,
+which isolates the decoding the workers take over.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+WORKERS = (1, 2, 4, 8)
+
+
+def run(workdir):
+    """Reload workdir/file.json and print the elapsed time."""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    os.chdir(workdir)
+    start = time.perf_counter()
+    storage.reload()
+    print("{:.2f}".format(time.perf_counter() - start))
+
+
+def main(n):
+    """Build a snapshot of n objects and reload it with each worker count."""
+    from benchmarks.fixtures import write_snapshot
+    workdir = tempfile.mkdtemp()
+    write_snapshot(os.path.join(workdir, "file.json"), n)
+    size = os.path.getsize(os.path.join(workdir, "file.json"))
+    print("{} objects, {:.1f} MiB snapshot, {} CPUs".format(
+        n, size / 2 ** 20, os.cpu_count()))
+    print("{:<8} {:>10} {:>10}".format("workers", "eager", "lazy"))
+    for workers in WORKERS:
+        times = []
+        for lazy in ("0", "1"):
+            env = dict(os.environ, HBNB_LOAD_WORKERS=str(workers),
+                       HBNB_LAZY_LOAD=lazy)
+            out = subprocess.run([sys.executable, __file__, "--run",
+                                  workdir], env=env, check=True,
+                                 stdout=subprocess.PIPE, text=True).stdout
+            times.append(float(out))
+        print("{:<8} {:>8.2f} s {:>8.2f} s".format(workers, *times))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Measure storage.query() against filtering storage.all() by hand.
+
+Usage: python3 benchmarks/bench_query.py [number_of_places]
+
+Places are spread over 1000 cities with random prices, guests and update
+times. Each query is timed once its indexes are built, next to the same
+query answered by scanning and sorting every place.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+RUNS = 20
+
+
+def timed(query):
+    """Return the mean milliseconds of list(query()) after a first run."""
+    list(query())
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        list(query())
+    return (time.perf_counter() - start) * 1000 / RUNS
+
+
+def scan(keep, key, limit):
+    """Answer a query by filtering and sorting every place."""
+    found = [obj for obj in storage.all(Place).values() if keep(obj)]
+    if key is not None:
+        found.sort(key=key)
+    return found[:limit]
+
+
+def main(n):
+    """Store n places and time queries on them."""
+    rand = random.Random(0)
+    epoch = datetime(2024, 1, 1)
+    for i in range(n):
+        storage.new(Place(
+            id=str(i), created_at=epoch.isoformat(),
+            updated_at=(epoch + timedelta(seconds=i * 7)).isoformat(),
+            city_id="city-{}".format(rand.randrange(1000)),
+            name=rand.choice(["Loft", "Cabin", "Studio", "Villa"]),
+            price_by_night=rand.randrange(20, 500),
+            max_guest=rand.randrange(1, 10)))
+    latest = (epoch + timedelta(seconds=n * 7 - 3600)).isoformat()
+    queries = (
+        ("price<100, guests>=2, by price, 20",
+         lambda: storage.query(Place, [("price_by_night", "<", 100),
+                                       ("max_guest", ">=", 2)],
+                               ["price_by_night"], 20),
+         lambda: scan(lambda o: o.price_by_night < 100 and o.max_guest >= 2,
+                      lambda o: o.price_by_night, 20)),
+        ("city_id==, by -price",
+         lambda: storage.query(Place, [("city_id", "==", "city-7")],
+                               ["-price_by_night"]),
+         lambda: scan(lambda o: o.city_id == "city-7",
+                      lambda o: -o.price_by_night, None)),
+        ("updated in the last hour",
+         lambda: storage.query(Place, [("updated_at", ">=", latest)],
+                               ["updated_at"]),
+         lambda: scan(lambda o: o.updated_at >= datetime.fromisoformat(
+             latest), lambda o: o.updated_at, None)),
+        ("name==Villa, first 20",
+         lambda: storage.query(Place, [("name", "==", "Villa")], limit=20),
+         lambda: scan(lambda o: o.name == "Villa", None, 20)),
+    )
+    print("{} places".format(n))
+    print("{:<36} {:>12} {:>12}".format("query", "query()", "scan"))
+    for name, query, baseline in queries:
+        print("{:<36} {:>9.2f} ms {:>9.2f} ms".format(
+            name, timed(query), timed(baseline)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Compare peak RSS and wall time of the streaming and json.load reloads.
+
+Usage: python3 benchmarks/bench_reload.py [number_of_objects]
+
+Each loader runs in its own interpreter so peak RSS is not shared.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def legacy_reload(storage):
+    """Reload file.json the way FileStorage did before streaming."""
+    from models.engine import file_storage
+    with open("file.json") as f:
+        objdict = json.load(f)
+        for o in objdict.values():
+            cls_name = o["__class__"]
+            del o["__class__"]
+            storage.new(getattr(file_storage, cls_name)(**o))
+
+
+def run(loader, workdir):
+    """Run one loader on workdir/file.json and print its measurements."""
+    os.chdir(tempfile.mkdtemp())
+    from models import storage
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    os.chdir(workdir)
+    start = time.perf_counter()
+    if loader == "json.load":
+        legacy_reload(storage)
+    else:
+        storage.reload()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print("{:<10} {:>10.2f} s {:>10.1f} MiB {:>10}".format(
+        loader, elapsed, peak / 1024, storage.count()))
+
+
+def main(n):
+    """Build a snapshot of n objects and time both loaders on it."""
+    from benchmarks.fixtures import write_snapshot
+    workdir = tempfile.mkdtemp()
+    write_snapshot(os.path.join(workdir, "file.json"), n)
+    size = os.path.getsize(os.path.join(workdir, "file.json"))
+    print("{} objects, {:.1f} MiB snapshot".format(n, size / 2 ** 20))
+    print("{:<10} {:>12} {:>14} {:>10}".format("loader", "wall", "peak RSS",
+                                               "objects"))
+    for loader in ("json.load", "stream"):
+        subprocess.run([sys.executable, __file__, "--run", loader, workdir],
+                       check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""Measure save() latency under each fsync policy.
+
+Usage: python3 benchmarks/bench_save.py [number_of_objects] [saves]
+
+For every policy, in snapshot and journal mode, one object is changed
+before each save() and the latency of the save is recorded.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from benchmarks.fixtures import write_snapshot  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+POLICIES = ("never", "100", "always")
+
+
+def run(workdir, journal, policy, saves):
+    """Return the sorted save() latencies, in milliseconds."""
+    os.chdir(workdir)
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__journal = journal
+    FileStorage._FileStorage__fsync = policy
+    storage.reload()
+    objs = list(storage.all().values())
+    latencies = []
+    for i in range(saves):
+        objs[i % len(objs)].name = "renamed {}".format(i)
+        start = time.perf_counter()
+        storage.save()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def main(n, saves):
+    """Time saves of a store of n objects under every policy."""
+    source = tempfile.mkdtemp()
+    write_snapshot(os.path.join(source, "file.json"), n)
+    print("{} objects, {} saves".format(n, saves))
+    print("{:<9} {:<7} {:>10} {:>10} {:>10}".format(
+        "mode", "fsync", "mean ms", "p50 ms", "p99 ms"))
+    for journal in (False, True):
+        for policy in POLICIES:
+            workdir = tempfile.mkdtemp()
+            shutil.copy(os.path.join(source, "file.json"), workdir)
+            lat = run(workdir, journal, policy, saves)
+            print("{:<9} {:<7} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                "journal" if journal else "snapshot", policy,
+                sum(lat) / len(lat), lat[len(lat) // 2],
+                lat[min(len(lat) - 1, len(lat) * 99 // 100)]))
+            shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Measure full-text search against a substring scan.
+
+Usage: python3 benchmarks/bench_search.py [number_of_reviews]
+
+Reviews hold 40 words drawn from a 20000-word vocabulary with a Zipf-like
+distribution. The index is timed when built from scratch, when rebuilt
+after reload() in the same process and when loaded from its file by a
+new process; queries are timed for a rare word, a common word and three
+words with a limit of 10.
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+QUERIES = 100
+VOCABULARY = ["w{}".format(i) for i in range(20000)]
+
+
+def word(rand):
+    """Return a word of VOCABULARY, the first ones being the commonest."""
+    return VOCABULARY[min(int(rand.paretovariate(1.0)), len(VOCABULARY)) - 1]
+
+
+def scan(text):
+    """Answer a one-word query by checking every review."""
+    return [obj for obj in storage.all(Review).values()
+            if text in obj.text.lower().split()]
+
+
+def timed(query, runs=QUERIES):
+    """Return the mean milliseconds of query()."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        query()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def main(n):
+    """Store n reviews and time search() on them."""
+    rand = random.Random(0)
+    for i in range(n):
+        storage.new(Review(id=str(i), created_at="2023-08-11T00:00:00",
+                           updated_at="2023-08-11T00:00:00",
+                           text=" ".join(word(rand) for _ in range(40))))
+    storage.save()
+    start = time.perf_counter()
+    storage.search(Review, "w1")
+    print("{} reviews, index built in {:.2f} s".format(
+        n, time.perf_counter() - start))
+    start = time.perf_counter()
+    storage.flush()
+    print("index saved in {:.2f} s".format(time.perf_counter() - start))
+    start = time.perf_counter()
+    storage.reload()
+    storage.search(Review, "w1")
+    print("reload() and first search in {:.2f} s".format(
+        time.perf_counter() - start))
+    script = ("import time; from models import storage; "
+              "start = time.perf_counter(); "
+              "storage.search('Review', 'w1'); "
+              "print('{:.2f}'.format(time.perf_counter() - start))")
+    for name in ("file.json.Review.fts", None):
+        if name is None:
+            os.remove("file.json.Review.fts")
+        seconds = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True,
+            env=dict(os.environ, PYTHONPATH=sys.path[0])).stdout.strip()
+        print("first search of a new process, {}: {} s".format(
+            "index loaded" if name else "no index file", seconds))
+    print("{:<26} {:>12}".format("query", "latency"))
+    for name, terms, limit in (("rare word", "w15000", None),
+                               ("common word, 10 best", "w2", 10),
+                               ("three words, 10 best", "w7 w300 w9000", 10)):
+        print("{:<26} {:>9.3f} ms".format(name, timed(
+            lambda: storage.search(Review, terms, limit))))
+    print("{:<26} {:>9.1f} ms".format(
+        "substring scan", timed(lambda: scan("w15000"), 3)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Compare the snapshot throughput of every installed serializer.
+
+Usage: python3 benchmarks/bench_serializers.py [number_of_objects]
+
+For each serializer, a full save (every record encoded) and a reload of
+the same objects are timed, and the snapshot size is reported.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from benchmarks.fixtures import write_snapshot  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine import serializers  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+
+def timed(func):
+    """Return the seconds func() took."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(n):
+    """Save and reload n objects with every serializer."""
+    write_snapshot("source.json", n)
+    FileStorage._FileStorage__file_path = "source.json"
+    storage.reload()
+    print("{} objects".format(n))
+    print("{:<8} {:>9} {:>12} {:>9} {:>12} {:>10}".format(
+        "codec", "save s", "save obj/s", "reload s", "reload obj/s", "MiB"))
+    for serializer in serializers.SERIALIZERS.values():
+        if not serializer.available():
+            print("{:<8} not installed".format(serializer.name))
+            continue
+        path = "file" + serializer.extension
+        FileStorage._FileStorage__serializer = serializer
+        FileStorage._FileStorage__file_path = path
+        FileStorage._FileStorage__fragments = {}
+        save = timed(storage.save)
+        objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        reload = timed(storage.reload)
+        assert storage.count() == n
+        FileStorage._FileStorage__objects = objects
+        print("{:<8} {:>9.2f} {:>12.0f} {:>9.2f} {:>12.0f} {:>10.1f}".format(
+            serializer.name, save, n / save, reload, n / reload,
+            os.path.getsize(path) / 2 ** 20))
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Compare the single-file and sharded layouts.
+
+Usage: python3 benchmarks/bench_shards.py [number_of_objects]
+
+Each layout runs in its own interpreter on the same objects and reports
+the time to answer State.all() from a cold start, and the mean latency
+of a save after changing one Review.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+SAVES = 20
+
+
+def run(layout, workdir):
+    """Open workdir with layout and print its measurements."""
+    if layout == "sharded":
+        os.environ["HBNB_SHARDED"] = "1"
+    os.chdir(workdir)
+    start = time.perf_counter()
+    from console import HBNBCommand
+    with patch("sys.stdout", new=StringIO()):
+        HBNBCommand().onecmd("State.all()")
+    cold = time.perf_counter() - start
+    from models import storage
+    reviews = list(storage.all("Review").values())
+    start = time.perf_counter()
+    for i in range(SAVES):
+        reviews[i].text = "Changed {}".format(i)
+        storage.save()
+    save = (time.perf_counter() - start) * 1000 / SAVES
+    print("{:<8} {:>12.2f} s {:>14.1f} ms".format(layout, cold, save))
+
+
+def main(n):
+    """Write n objects in both layouts and measure each."""
+    from benchmarks.fixtures import write_snapshot
+    source = tempfile.mkdtemp()
+    write_snapshot(os.path.join(source, "file.json"), n)
+    print("{} objects".format(n))
+    print("{:<8} {:>14} {:>17}".format("layout", "State.all()",
+                                       "save one Review"))
+    for layout in ("single", "sharded"):
+        workdir = tempfile.mkdtemp()
+        with open(os.path.join(source, "file.json")) as f, \
+                open(os.path.join(workdir, "file.json"), "w") as out:
+            out.write(f.read())
+        if layout == "sharded":
+            subprocess.run([sys.executable, "-c",
+                            "import os, sys; sys.path.insert(0, {!r}); "
+                            "os.environ['HBNB_SHARDED'] = '1'; "
+                            "from models import storage; storage.compact()"
+                            .format(sys.path[0])],
+                           cwd=workdir, check=True)
+        subprocess.run([sys.executable, __file__, "--run", layout, workdir],
+                       check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
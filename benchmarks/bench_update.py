@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Measure console update latency against store size, sync and async.
+
+Usage: python3 benchmarks/bench_update.py [updates]
+
+For each store size, the update command is timed with saves written in
+the console thread and with saves handed to the writer thread
+(HBNB_ASYNC_SAVE=1); the final flush() is timed separately.
+"""
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.chdir(tempfile.mkdtemp())
+
+from benchmarks.fixtures import write_snapshot  # noqa: E402
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+SIZES = (1000, 10000, 50000)
+
+
+def run(n, asynchronous, updates):
+    """Return (mean update ms, flush ms) for a store of n objects."""
+    write_snapshot("file.json", n)
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__async = asynchronous
+    storage.reload()
+    storage.save()
+    storage.flush()
+    users = list(storage.all("User").values())
+    console = HBNBCommand()
+    start = time.perf_counter()
+    with patch("sys.stdout", new=StringIO()):
+        for i in range(updates):
+            console.onecmd('update User {} first_name "Betty {}"'.format(
+                users[i % len(users)].id, i))
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    storage.flush()
+    return elapsed * 1000 / updates, (time.perf_counter() - start) * 1000
+
+
+def main(updates):
+    """Time updates under both modes for every store size."""
+    print("{} updates".format(updates))
+    print("{:>8} {:>16} {:>16} {:>16}".format(
+        "objects", "sync ms/update", "async ms/update", "async flush ms"))
+    for n in SIZES:
+        sync, _ = run(n, False, updates)
+        asynchronous, flush = run(n, True, updates)
+        print("{:>8} {:>16.3f} {:>16.3f} {:>16.1f}".format(
+            n, sync, asynchronous, flush))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
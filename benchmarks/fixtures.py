@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""Defines helpers shared by the storage benchmarks."""
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+CLASSES = ("User", "State", "City", "Place", "Amenity", "Review")
+
+
+def make_object(i):
+    """Return the to_dict() representation of the i-th fake object."""
+    cls_name = CLASSES[i % len(CLASSES)]
+    stamp = (datetime(2023, 8, 11) + timedelta(seconds=i)).isoformat()
+    odict = {"id": str(uuid4()), "created_at": stamp + ".000001",
+             "updated_at": stamp + ".000002", "__class__": cls_name}
+    if cls_name == "Place":
+        odict.update({"name": "Place {}".format(i), "city_id": str(uuid4()),
+                      "user_id": str(uuid4()), "max_guest": i % 8,
+                      "price_by_night": i % 300, "latitude": 37.77,
+                      "longitude": -122.41,
+                      "description": "A cosy loft near the park"})
+    elif cls_name == "Review":
+        odict.update({"place_id": str(uuid4()), "user_id": str(uuid4()),
+                      "text": "Great stay, would come back"})
+    else:
+        odict["name"] = "{} {}".format(cls_name, i)
+    return odict
+
+
+def write_snapshot(path, n):
+    """Write a file.json holding n fake objects to path."""
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(n):
+            odict = make_object(i)
+            key = "{}.{}".format(odict["__class__"], odict["id"])
+            f.write("{}{}: {}".format(", " if i else "", json.dumps(key),
+                                      json.dumps(odict)))
+        f.write("}")
@@ -1,16 +1,17 @@
 #!/usr/bin/python3
 """Defines the HBnB console."""
 import cmd
+import json
 import re
+from itertools import islice
+from shlex import shlex
 from shlex import split
 from models import storage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+from models.base_model import registry
+from models.engine.columnar import AGGREGATES
+
+PAGE_SIZE = 100
+CHUNK_SIZE = 1 << 16
 
 
 def parse(arg):
@@ -31,23 +32,105 @@ def parse(arg):
         return retl
 
 
+def parse_query(chain):
+    """Return the (conditions, order_by, limit) of a query chain.
+
+    A chain is a dot-separated list of where(<condition>, ...),
+    order_by(<field>, ...) and limit(<n>) calls. Conditions are
+    <field><op><value> with op one of == != < <= > >=, and a field to
+    order by is prefixed with "-" for descending order.
+
+    Raises:
+        ValueError: If chain is not a valid query, with the faulty part.
+    """
+    call = re.compile(r"""\s*(\w+)\(((?:[^()"']|"[^"]*"|'[^']*')*)\)\s*""")
+    conditions = []
+    order_by = []
+    limit = None
+    pos = 0
+    while pos < len(chain):
+        match = call.match(chain, pos)
+        if match is None:
+            raise ValueError(chain[pos:])
+        pos = match.end()
+        if pos < len(chain):
+            if chain[pos] != ".":
+                raise ValueError(chain[pos:])
+            pos += 1
+        name, inner = match.groups()
+        lexer = shlex(inner, posix=True)
+        lexer.whitespace = ","
+        lexer.whitespace_split = True
+        args = [token.strip() for token in lexer]
+        if name == "where":
+            for token in args:
+                cond = re.fullmatch(r"(\w+)\s*(==|!=|<=|>=|=|<|>)\s*(.*)",
+                                    token)
+                if cond is None:
+                    raise ValueError(token)
+                conditions.append(cond.groups())
+        elif name == "order_by":
+            for token in args:
+                if re.fullmatch(r"-?\w+", token) is None:
+                    raise ValueError(token)
+                order_by.append(token)
+        elif name == "limit" and len(args) == 1 and args[0].isdigit():
+            limit = int(args[0])
+        else:
+            raise ValueError(match.group().strip())
+    return conditions, order_by, limit
+
+
+def parse_page(argl):
+    """Return argl without its paging options, the page size and the page.
+
+    The options are --page-size <n> and --page <n>, or --page-size=<n>
+    and --page=<n>. The page size is None when neither is given and
+    PAGE_SIZE when only --page is; pages are numbered from 1.
+
+    Raises:
+        ValueError: If the value of an option is not a positive integer,
+            with the name of the option.
+    """
+    options = {"--page-size": None, "--page": None}
+    rest = []
+    args = iter(argl)
+    for arg in args:
+        name, equals, value = arg.partition("=")
+        if name not in options:
+            rest.append(arg)
+            continue
+        if not equals:
+            value = next(args, "")
+        if re.fullmatch(r"[0-9]+", value) is None or int(value) == 0:
+            raise ValueError(name[2:].replace("-", " "))
+        options[name] = int(value)
+    size, page = options["--page-size"], options["--page"]
+    if size is None and page is not None:
+        size = PAGE_SIZE
+    return rest, size, page or 1
+
+
 class HBNBCommand(cmd.Cmd):
     """Defines the HolbertonBnB command interpreter.
 
     Attributes:
         prompt (str): The command prompt.
+        output (str): How instances are displayed: "text" for their
+            string representations, "json" for JSON Lines.
+        __classes (dict): The model registry, keyed by class name.
+        __chain (tuple): Calls that start a <class>.<call>(...) query.
+        __outputs (tuple): The output modes.
+        __read_only (tuple): Attributes update refuses to change, besides
+            the __dunder__ ones.
     """
 
     prompt = "(hbnb) "
-    __classes = {
-        "BaseModel",
-        "User",
-        "State",
-        "City",
-        "Place",
-        "Amenity",
-        "Review"
-    }
+    output = "text"
+    __classes = registry
+    __chain = ("where", "order_by", "limit")
+    __outputs = ("text", "json")
+    __read_only = ("id", "created_at", "updated_at")
 
     def emptyline(self):
         """Do nothing upon receiving an empty line."""
@@ -60,7 +143,11 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "stats": self.do_stats,
+            "since": self.do_since,
+            "nearby": self.do_nearby,
+            "search": self.do_search
         }
         match = re.search(r"\.", arg)
         if match is not None:
@@ -68,6 +155,8 @@ class HBNBCommand(cmd.Cmd):
             match = re.search(r"\((.*?)\)", argl[1])
             if match is not None:
                 command = [argl[1][:match.span()[0]], match.group()[1:-1]]
+                if command[0] in HBNBCommand.__chain:
+                    return self.do_query("{} {}".format(argl[0], argl[1]))
                 if command[0] in argdict.keys():
                     call = "{} {}".format(argl[0], command[1])
                     return argdict[command[0]](call)
@@ -76,13 +165,40 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, arg):
         """Quit command to exit the program."""
+        storage.flush()
         return True
 
     def do_EOF(self, arg):
         """EOF signal to exit the program."""
         print("")
+        storage.flush()
         return True
 
+    def do_output(self, arg):
+        """Usage: output [text|json]
+        Display or set the output mode. In json mode show, all, count and
+        the listing commands print one JSON document per line."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print(self.output)
+        elif argl[0] not in HBNBCommand.__outputs:
+            print("** output mode doesn't exist **")
+        else:
+            self.output = argl[0]
+
+    def do_begin(self, arg):
+        """Usage: begin
+        Start a batch: changes are saved once, on the matching commit."""
+        storage.begin()
+
+    def do_commit(self, arg):
+        """Usage: commit
+        End the current batch and save its changes in one write."""
+        try:
+            storage.commit()
+        except RuntimeError:
+            print("** no batch in progress **")
+
     def do_create(self, arg):
         """Usage: create <class>
         Create a new class instance and print its id.
@@ -93,7 +209,7 @@ class HBNBCommand(cmd.Cmd):
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            print(eval(argl[0])().id)
+            print(HBNBCommand.__classes[argl[0]]().id)
             storage.save()
 
     def do_show(self, arg):
@@ -101,60 +217,250 @@ class HBNBCommand(cmd.Cmd):
         Display the string representation of a class instance of a given id.
         """
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict:
-            print("** no instance found **")
         else:
-            print(objdict["{}.{}".format(argl[0], argl[1])])
+            obj = storage.get(argl[0], argl[1])
+            if obj is None:
+                print("** no instance found **")
+            elif self.output == "json":
+                print(storage.to_json(obj))
+            else:
+                print(obj)
 
     def do_destroy(self, arg):
         """Usage: destroy <class> <id> or <class>.destroy(<id>)
         Delete a class instance of a given id."""
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
-            print("** no instance found **")
         else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
-            storage.save()
+            obj = storage.get(argl[0], argl[1])
+            if obj is None:
+                print("** no instance found **")
+            else:
+                storage.delete(obj)
+                storage.save()
 
     def do_all(self, arg):
-        """Usage: all or all <class> or <class>.all()
+        """Usage: all [<class>] [--page-size <n>] [--page <n>] or
+       <class>.all([--page-size <n>] [--page <n>])
         Display string representations of all instances of a given class.
-        If no class is specified, displays all instantiated objects."""
+        If no class is specified, displays all instantiated objects.
+        With --page-size, only display the given page of n instances
+        (the first by default)."""
         argl = parse(arg)
+        try:
+            argl, size, page = parse_page(argl)
+        except ValueError as e:
+            print("** invalid {} **".format(e.args[0]))
+            return False
         if len(argl) > 0 and argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            objl = []
-            for obj in storage.all().values():
-                if len(argl) > 0 and argl[0] == obj.__class__.__name__:
-                    objl.append(obj.__str__())
-                elif len(argl) == 0:
-                    objl.append(obj.__str__())
-            print(objl)
+            objs = storage.all(argl[0] if argl else None).values()
+            if size is not None:
+                objs = islice(objs, (page - 1) * size, page * size)
+            self.__print_objects(objs)
+
+    def do_since(self, arg):
+        """Usage: since <class> <timestamp> or <class>.since(<timestamp>)
+        Display string representations of the instances of a class
+        updated at or after an ISO 8601 timestamp, oldest first."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+        elif argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        elif len(argl) == 1:
+            print("** timestamp missing **")
+        else:
+            try:
+                objs = storage.since(argl[1], argl[0])
+            except ValueError:
+                print("** invalid timestamp **")
+                return False
+            self.__print_objects(objs.values())
+
+    def do_nearby(self, arg):
+        """Usage: nearby <class> <latitude> <longitude> <radius_km> [<limit>]
+       or <class>.nearby(<latitude>, <longitude>, <radius_km>[, <limit>])
+        Display string representations of the instances of a class within
+        radius_km kilometres of a point, nearest first."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(argl) < 3:
+            print("** coordinates missing **")
+            return False
+        if len(argl) == 3:
+            print("** radius missing **")
+            return False
+        try:
+            lat, lon, radius = (float(value) for value in argl[1:4])
+            limit = int(argl[4]) if len(argl) > 4 else None
+        except ValueError:
+            print("** value must be a number **")
+            return False
+        if limit is not None and limit < 0:
+            print("** value out of range **")
+            return False
+        try:
+            objs = storage.nearby(lat, lon, radius, limit, argl[0])
+        except ValueError:
+            print("** value out of range **")
+            return False
+        self.__print_objects(objs.values())
+
+    def do_search(self, arg):
+        """Usage: search <class> <terms> or <class>.search(<terms>)
+        Display string representations of the instances of a class whose
+        text matches any of the words of terms, best match first."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+        elif argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        elif len(argl) == 1:
+            print("** search terms missing **")
+        else:
+            try:
+                objs = storage.search(argl[0], " ".join(argl[1:]))
+            except ValueError:
+                print("** class not searchable **")
+                return False
+            self.__print_objects(objs.values())
+
+    def do_query(self, arg):
+        """Usage: query <class> [where(<condition>, ...)][.order_by(<field>,
+       ...)][.limit(<n>)] or <class>.where(...).order_by(...).limit(...)
+        Display string representations of the instances of a class
+        matching every <attribute><op><value> condition (op is one of
+        == != < <= > >=), ordered by the given attributes (descending
+        when prefixed with -), at most n of them."""
+        argl = arg.split(None, 1)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        try:
+            conditions, order_by, limit = parse_query(
+                argl[1] if len(argl) > 1 else "")
+        except ValueError as e:
+            print("** invalid query: {} **".format(e.args[0]))
+            return False
+        try:
+            objs = storage.query(argl[0], conditions, order_by, limit)
+        except KeyError as e:
+            print("** attribute doesn't exist: {} **".format(e.args[0]))
+            return False
+        except ValueError:
+            print("** invalid value **")
+            return False
+        self.__print_objects(objs)
 
     def do_count(self, arg):
         """Usage: count <class> or <class>.count()
         Retrieve the number of instances of a given class."""
         argl = parse(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        count = storage.count(argl[0] if argl else None)
+        if self.output == "json":
+            print(json.dumps({"count": count}))
+        else:
+            print(count)
+
+    def do_stats(self, arg):
+        """Usage: stats <class> <aggregate> [<attribute>] [<condition> ...] or
+       <class>.stats(<aggregate>, [<attribute>,] [<condition>, ...])
+        Compute count, sum, avg, min or max of a numeric attribute over
+        the instances matching every <attribute><op><value> condition
+        (op is one of == != < <= > >=)."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(argl) == 1:
+            print("** aggregate missing **")
+            return False
+        if argl[1] not in AGGREGATES:
+            print("** aggregate doesn't exist **")
+            return False
+        field = None
+        conditions = []
+        for token in argl[2:]:
+            match = re.fullmatch(r"(\w+)\s*(==|!=|<=|>=|=|<|>)\s*(.+)", token)
+            if match is not None:
+                conditions.append(match.groups())
+            elif field is None:
+                field = token
+            else:
+                print("** invalid condition: {} **".format(token))
+                return False
+        if field is None and argl[1] != "count":
+            print("** attribute name missing **")
+            return False
+        try:
+            result = storage.columns(argl[0]).aggregate(argl[1], field,
+                                                        conditions)
+        except KeyError as e:
+            print("** attribute doesn't exist: {} **".format(e.args[0]))
+            return False
+        except ValueError:
+            print("** value must be a number **")
+            return False
+        if result is None:
+            print("** no instance found **")
+        else:
+            print(result)
+
+    def __print_objects(self, objs):
+        """Print objs in the output mode, one object at a time.
+
+        Text mode prints what print([obj.__str__() for obj in objs])
+        does, json mode one JSON document per line. The output is written
+        as objects come, in chunks of about CHUNK_SIZE characters, so it
+        is never held in memory whole.
+        """
+        if self.output == "json":
+            texts = (storage.to_json(obj) + "\n" for obj in objs)
+        else:
+            texts = self.__list_texts(objs)
+        chunk = []
+        length = 0
+        for text in texts:
+            chunk.append(text)
+            length += len(text)
+            if length >= CHUNK_SIZE:
+                print("".join(chunk), end="")
+                chunk = []
+                length = 0
+        print("".join(chunk), end="")
+
+    @staticmethod
+    def __list_texts(objs):
+        """Yield the pieces of print([obj.__str__() for obj in objs])."""
+        sep = "["
+        for obj in objs:
+            yield sep + repr(obj.__str__())
+            sep = ", "
+        yield "[]\n" if sep == "[" else "]\n"
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value> or
@@ -163,7 +469,6 @@ class HBNBCommand(cmd.Cmd):
         Update a class instance of a given id by adding or updating
         a given attribute key/value pair or dictionary."""
         argl = parse(arg)
-        objdict = storage.all()
 
         if len(argl) == 0:
             print("** class name missing **")
@@ -174,7 +479,8 @@ class HBNBCommand(cmd.Cmd):
         if len(argl) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        obj = storage.get(argl[0], argl[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(argl) == 2:
@@ -188,21 +494,38 @@ class HBNBCommand(cmd.Cmd):
                 return False
 
         if len(argl) == 4:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            if argl[2] in obj.__class__.__dict__.keys():
-                valtype = type(obj.__class__.__dict__[argl[2]])
-                obj.__dict__[argl[2]] = valtype(argl[3])
-            else:
-                obj.__dict__[argl[2]] = argl[3]
+            names = [argl[2]]
         elif type(eval(argl[2])) == dict:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            for k, v in eval(argl[2]).items():
-                if (k in obj.__class__.__dict__.keys() and
-                        type(obj.__class__.__dict__[k]) in {str, int, float}):
-                    valtype = type(obj.__class__.__dict__[k])
-                    obj.__dict__[k] = valtype(v)
+            names = list(eval(argl[2]))
+        else:
+            names = []
+        for k in names:
+            if (not isinstance(k, str) or k.startswith("__") or
+                    k in HBNBCommand.__read_only):
+                print("** attribute can't be updated: {} **".format(k))
+                return False
+
+        try:
+            if len(argl) == 4:
+                k = argl[2]
+                clsdict = getattr(obj, "_defaults", obj.__class__.__dict__)
+                if argl[2] in clsdict.keys():
+                    valtype = type(clsdict[argl[2]])
+                    setattr(obj, argl[2], valtype(argl[3]))
                 else:
-                    obj.__dict__[k] = v
+                    setattr(obj, argl[2], argl[3])
+            elif names:
+                clsdict = getattr(obj, "_defaults", obj.__class__.__dict__)
+                for k, v in eval(argl[2]).items():
+                    if (k in clsdict.keys() and
+                            type(clsdict[k]) in {str, int, float}):
+                        valtype = type(clsdict[k])
+                        setattr(obj, k, valtype(v))
+                    else:
+                        setattr(obj, k, v)
+        except (TypeError, AttributeError):
+            print("** attribute can't be updated: {} **".format(k))
+            return False
         storage.save()
 
 
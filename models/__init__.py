@@ -1,7 +1,17 @@
 #!/usr/bin/python3
 """__init__ magic method for models directory"""
+import atexit
+import os
 from models.engine.file_storage import FileStorage
+from models.compact import compact_all
 
 
-storage = FileStorage()
+if os.getenv("HBNB_COMPACT_MODELS") == "1":
+    compact_all()
+if os.getenv("HBNB_TYPE_STORAGE") == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+else:
+    storage = FileStorage()
 storage.reload()
+atexit.register(storage.flush)
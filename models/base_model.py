@@ -4,10 +4,30 @@ import models
 from uuid import uuid4
 from datetime import datetime
 
+# Model classes by name, filled in as BaseModel subclasses are defined.
+registry = {}
+
+
+def parse_datetime(value):
+    """Parse a datetime written by BaseModel.to_dict().
+
+    Uses datetime.fromisoformat(), which is much faster than strptime(),
+    and falls back to strptime() with the historical format otherwise.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+
 
 class BaseModel:
     """Represents the BaseModel of the HBnB project."""
 
+    def __init_subclass__(cls, **kwargs):
+        """Register a newly defined model class in registry."""
+        super().__init_subclass__(**kwargs)
+        registry[cls.__name__] = cls
+
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel.
 
@@ -15,19 +35,29 @@ class BaseModel:
             *args (any): Unused.
             **kwargs (dict): Key/value pairs of attributes.
         """
-        tform = "%Y-%m-%dT%H:%M:%S.%f"
-        self.id = str(uuid4())
-        self.created_at = datetime.today()
-        self.updated_at = datetime.today()
+        # The instance isn't stored yet, so write straight to __dict__
+        # instead of going through __setattr__, and only generate the
+        # defaults kwargs won't replace (placeholders keep the key order).
+        odict = self.__dict__
+        odict["id"] = None if "id" in kwargs else str(uuid4())
+        odict["created_at"] = None if "created_at" in kwargs else \
+            datetime.today()
+        odict["updated_at"] = None if "updated_at" in kwargs else \
+            datetime.today()
         if len(kwargs) != 0:
             for k, v in kwargs.items():
                 if k == "created_at" or k == "updated_at":
-                    self.__dict__[k] = datetime.strptime(v, tform)
+                    odict[k] = parse_datetime(v)
                 else:
-                    self.__dict__[k] = v
+                    odict[k] = v
         else:
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Set an attribute and mark the instance as changed in storage."""
+        super().__setattr__(name, value)
+        models.storage.touch(self, name)
+
     def save(self):
         """Update updated_at with the current datetime."""
         self.updated_at = datetime.today()
@@ -39,7 +69,7 @@ class BaseModel:
         Includes the key/value pair __class__ representing
         the class name of the object.
         """
-        rdict = self.__dict__.copy()
+        rdict = self._attributes().copy()
         rdict["created_at"] = self.created_at.isoformat()
         rdict["updated_at"] = self.updated_at.isoformat()
         rdict["__class__"] = self.__class__.__name__
@@ -48,4 +78,11 @@ class BaseModel:
     def __str__(self):
         """Return the print/str representation of the BaseModel instance."""
         clname = self.__class__.__name__
-        return "[{}] ({}) {}".format(clname, self.id, self.__dict__)
+        return "[{}] ({}) {}".format(clname, self.id, self._attributes())
+
+    def _attributes(self):
+        """Return the instance attributes, as shown by __str__."""
+        return self.__dict__
+
+
+registry["BaseModel"] = BaseModel
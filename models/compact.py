@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""Defines compact, slot-backed variants of the model classes.
+
+A compact variant keeps id, created_at, updated_at and the declared
+class-level fields of a model in __slots__ instead of an instance
+dictionary. Attributes that are not declared (ad-hoc ones set through
+update) still go to the instance __dict__, which is only created when
+the first of them is set. The variant subclasses the model and keeps its
+name, so keys, to_dict() and __str__ are unchanged.
+"""
+import models
+from uuid import uuid4
+from datetime import datetime
+from models.base_model import parse_datetime
+from models.base_model import registry
+
+
+class Compact:
+    """Behaviour shared by the compact variants built by compact().
+
+    Attributes:
+        _model (type): The model class the variant stands in for.
+        _fields (frozenset): Names of the attributes kept in slots.
+        _members (tuple): (name, slot descriptor) pairs in field order.
+        _defaults (mappingproxy): Class attributes of _model, which the
+            console uses to coerce update values.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        """Initialize a new compact model, as BaseModel.__init__ does.
+
+        Args:
+            *args (any): Unused.
+            **kwargs (dict): Key/value pairs of attributes.
+        """
+        set_attr = object.__setattr__
+        set_attr(self, "_overflow", False)
+        if "id" not in kwargs:
+            set_attr(self, "id", str(uuid4()))
+        if "created_at" not in kwargs:
+            set_attr(self, "created_at", datetime.today())
+        if "updated_at" not in kwargs:
+            set_attr(self, "updated_at", datetime.today())
+        if len(kwargs) != 0:
+            for k, v in kwargs.items():
+                if k == "created_at" or k == "updated_at":
+                    set_attr(self, k, parse_datetime(v))
+                elif k != "__class__":
+                    self.__set(k, v)
+        else:
+            models.storage.new(self)
+
+    def __getattr__(self, name):
+        """Return the class default of a declared field never set."""
+        try:
+            return getattr(type(self)._model, name)
+        except AttributeError:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, name)) from None
+
+    def __setattr__(self, name, value):
+        """Set an attribute and mark the instance as changed in storage."""
+        self.__set(name, value)
+        models.storage.touch(self, name)
+
+    def _attributes(self):
+        """Return the set attributes, declared fields first."""
+        attrs = {}
+        for name, member in type(self)._members:
+            try:
+                attrs[name] = member.__get__(self)
+            except AttributeError:
+                pass
+        if self._overflow:
+            attrs.update(self.__dict__)
+        return attrs
+
+    def __set(self, name, value):
+        """Store an attribute, noting when it goes to the overflow dict."""
+        if name not in type(self)._fields:
+            object.__setattr__(self, "_overflow", True)
+        object.__setattr__(self, name, value)
+
+
+def compact(cls):
+    """Define the compact variant of cls and register it in its place.
+
+    Args:
+        cls (type): A BaseModel subclass (or BaseModel itself).
+
+    Returns:
+        type: The compact variant, now registry[cls.__name__].
+    """
+    if issubclass(cls, Compact):
+        return cls
+    fields = ["id", "created_at", "updated_at"]
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if (not name.startswith("_") and name not in fields and
+                    not hasattr(value, "__get__")):
+                fields.append(name)
+    variant = type(cls.__name__, (Compact, cls), {
+        "__slots__": tuple(fields) + ("_overflow",),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+        "_model": cls,
+        "_fields": frozenset(fields),
+        "_defaults": cls.__dict__
+    })
+    variant._members = tuple((name, variant.__dict__[name])
+                             for name in fields)
+    registry[cls.__name__] = variant
+    return variant
+
+
+def compact_all():
+    """Replace every registered model class with its compact variant."""
+    for cls in list(registry.values()):
+        compact(cls)
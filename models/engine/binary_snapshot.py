@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+"""Defines the binary snapshot format of FileStorage.
+
+Layout, all integers little-endian:
+
+    header   magic "HBNBSNAP", version (u32), number of records (u64),
+             offset of the index (u64)
+    records  one per object: length (u32) then the JSON text of its
+             to_dict(), UTF-8 encoded
+    index    one entry per record, sorted by key: offset of the key
+             (u64), length of the key (u32), offset of the record (u64)
+    keys     the UTF-8 encoded keys the index entries point to
+
+The file is memory-mapped for reading; lengths, offsets and keys are
+read in place and a record is only decoded when its object is needed.
+
+Usage: python3 -m models.engine.binary_snapshot <src> <dst>
+converts a JSON snapshot to the binary format or back, according to the
+format of src.
+"""
+import json
+import mmap
+import struct
+import sys
+from models.engine.json_stream import JSONStream
+
+MAGIC = b"HBNBSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQ")
+LENGTH = struct.Struct("<I")
+ENTRY = struct.Struct("<QIQ")
+
+
+def is_binary(path):
+    """Return True if the file at path starts with the binary magic."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write(f, items):
+    """Write a binary snapshot.
+
+    Args:
+        f (file): Binary file open for writing, positioned at 0.
+        items (iterable): (key, JSON text of to_dict()) pairs.
+    """
+    f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+    offset = HEADER.size
+    offsets = {}
+    for key, text in items:
+        record = text.encode()
+        f.write(LENGTH.pack(len(record)))
+        f.write(record)
+        offsets[key.encode()] = offset
+        offset += LENGTH.size + len(record)
+    index_offset = offset
+    key_offset = index_offset + ENTRY.size * len(offsets)
+    keys = sorted(offsets)
+    for key in keys:
+        f.write(ENTRY.pack(key_offset, len(key), offsets[key]))
+        key_offset += len(key)
+    for key in keys:
+        f.write(key)
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, VERSION, len(keys), index_offset))
+
+
+class BinarySnapshot:
+    """Read-only, memory-mapped view of a binary snapshot.
+
+    Records are designated by their offset in the file, which is what
+    entries() yields and find() returns.
+
+    Attributes:
+        __map (mmap.mmap): The mapped file.
+        __count (int): Number of records.
+        __index (int): Offset of the index.
+    """
+
+    def __init__(self, path):
+        """Map the binary snapshot at path.
+
+        Raises:
+            ValueError: If the file is not a binary snapshot this version
+                can read.
+        """
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.__count, self.__index = HEADER.unpack_from(
+            self.__map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("not a binary snapshot: {}".format(path))
+
+    def __len__(self):
+        """Return the number of records."""
+        return self.__count
+
+    def close(self):
+        """Unmap the file."""
+        self.__map.close()
+
+    def entries(self):
+        """Yield the (key, record offset) pairs in key order."""
+        view = self.__map
+        for i in range(self.__count):
+            key_offset, key_len, offset = ENTRY.unpack_from(
+                view, self.__index + i * ENTRY.size)
+            yield view[key_offset:key_offset + key_len].decode(), offset
+
+    def find(self, key):
+        """Return the record offset of key, or None, by binary search."""
+        view = self.__map
+        target = key.encode()
+        lo, hi = 0, self.__count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, key_len, offset = ENTRY.unpack_from(
+                view, self.__index + mid * ENTRY.size)
+            probe = view[key_offset:key_offset + key_len]
+            if probe == target:
+                return offset
+            if probe < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def text(self, offset):
+        """Return the JSON text of the record at offset."""
+        return self.__record(offset).decode()
+
+    def load(self, offset):
+        """Return the to_dict() representation held by the record."""
+        return json.loads(self.__record(offset))
+
+    def __record(self, offset):
+        """Return the bytes of the record at offset."""
+        length, = LENGTH.unpack_from(self.__map, offset)
+        start = offset + LENGTH.size
+        return self.__map[start:start + length]
+
+
+def convert(src, dst):
+    """Convert the snapshot at src to the other format, written to dst."""
+    if is_binary(src):
+        snapshot = BinarySnapshot(src)
+        try:
+            with open(dst, "w") as f:
+                f.write("{")
+                sep = ""
+                for key, offset in snapshot.entries():
+                    f.write("{}{}: {}".format(sep, json.dumps(key),
+                                              snapshot.text(offset)))
+                    sep = ", "
+                f.write("}")
+        finally:
+            snapshot.close()
+    else:
+        with open(src) as f, open(dst, "wb") as out:
+            write(out, ((key, json.dumps(o)) for key, o in JSONStream(f)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python3 -m models.engine.binary_snapshot "
+                 "<src> <dst>")
+    convert(sys.argv[1], sys.argv[2])
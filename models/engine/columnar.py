@@ -0,0 +1,295 @@
+#!/usr/bin/python3
+"""Defines a columnar mirror of stored objects for analytical queries.
+
+Numeric fields are kept in float columns and id fields (the *_id string
+fields) are dictionary-encoded into integer codes. Columns are NumPy
+arrays when NumPy is installed, so filters and aggregates run vectorized;
+without it they fall back to the stdlib array module and Python loops.
+"""
+import operator
+from array import array
+from models.engine.indexes import Index
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OPERATORS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge
+}
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+
+
+def classify(cls):
+    """Return the (numeric, encoded) fields of a model class.
+
+    Numeric fields are the int and float class attributes, encoded ones
+    the str class attributes named *_id, both in declaration order.
+    """
+    numeric = []
+    encoded = []
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith("_") or name in numeric + encoded:
+                continue
+            if type(value) in (int, float):
+                numeric.append(name)
+            elif type(value) is str and name.endswith("_id"):
+                encoded.append(name)
+    return tuple(numeric), tuple(encoded)
+
+
+class Column:
+    """A growable typed column.
+
+    Attributes:
+        size (int): Number of values appended.
+        data (numpy.ndarray or array.array): The values; only the first
+            size entries are meaningful.
+    """
+
+    def __init__(self, typecode):
+        """Initialize a new Column.
+
+        Args:
+            typecode (str): "d" for float64, "q" for int64, "b" for int8.
+        """
+        self.size = 0
+        if numpy is None:
+            self.data = array(typecode)
+        else:
+            self.data = numpy.empty(64, dtype=typecode)
+
+    def append(self, value):
+        """Append value to the column."""
+        if numpy is None:
+            self.data.append(value)
+        else:
+            if self.size == len(self.data):
+                self.data = numpy.resize(self.data, 2 * self.size)
+            self.data[self.size] = value
+        self.size += 1
+
+    def __setitem__(self, row, value):
+        """Overwrite the value at row."""
+        self.data[row] = value
+
+    def values(self):
+        """Return the meaningful values (a view with NumPy)."""
+        return self.data[:self.size]
+
+
+class ColumnarIndex(Index):
+    """Columnar mirror of the objects of one class.
+
+    Rows are appended as objects are added; removed rows are only marked
+    dead until they outnumber the live ones.
+
+    Attributes:
+        numeric (tuple): Fields stored as float64 columns.
+        encoded (tuple): Id fields stored as dictionary-encoded codes.
+        __rows (dict): Key mapped to its row.
+        __keys (list): Row mapped to its key, None once removed.
+        __alive (Column): 1 for live rows, 0 for removed ones.
+        __columns (dict): Numeric field mapped to its Column.
+        __codes (dict): Id field mapped to its Column of codes.
+        __dicts (dict): Id field mapped to its {value: code} dictionary.
+    """
+
+    def __init__(self, cls):
+        """Initialize a new ColumnarIndex.
+
+        Args:
+            cls (type): The model class to mirror; its int and float class
+                attributes become numeric columns and its str *_id class
+                attributes become encoded ones.
+        """
+        self.cls_name = cls.__name__
+        self.numeric, self.encoded = classify(cls)
+        self.fields = self.numeric + self.encoded
+        self.clear()
+
+    def clear(self):
+        """Forget every row."""
+        self.__rows = {}
+        self.__keys = []
+        self.__alive = Column("b")
+        self.__columns = {f: Column("d") for f in self.numeric}
+        self.__codes = {f: Column("q") for f in self.encoded}
+        self.__dicts = {f: {} for f in self.encoded}
+
+    def __len__(self):
+        """Return the number of live rows."""
+        return len(self.__rows)
+
+    def add(self, key, obj):
+        """Write the fields of obj to its row, appending one if needed."""
+        row = self.__rows.get(key)
+        if row is None:
+            row = len(self.__keys)
+            self.__rows[key] = row
+            self.__keys.append(key)
+            self.__alive.append(1)
+            for column in self.__columns.values():
+                column.append(0.0)
+            for column in self.__codes.values():
+                column.append(-1)
+        for field in self.numeric:
+            try:
+                value = float(getattr(obj, field))
+            except (TypeError, ValueError):
+                value = float("nan")
+            self.__columns[field][row] = value
+        for field in self.encoded:
+            value = getattr(obj, field, "")
+            codes = self.__dicts[field]
+            code = codes.setdefault(value, len(codes)) if value else -1
+            self.__codes[field][row] = code
+
+    def remove(self, key):
+        """Mark the row of key dead."""
+        row = self.__rows.pop(key, None)
+        if row is not None:
+            self.__keys[row] = None
+            self.__alive[row] = 0
+            if len(self.__keys) > 1024 and \
+                    len(self.__keys) > 2 * len(self.__rows):
+                self.__compact()
+
+    def select(self, conditions=(), order=None, limit=None):
+        """Return the keys of the live rows matching every condition.
+
+        Args:
+            conditions (iterable): (field, operator, value) triples, where
+                operator is a key of OPERATORS.
+            order (tuple): If given, a (numeric field, descending) pair to
+                sort the keys by, ties in row order; rows whose value is
+                not a number come last.
+            limit (int): If given, only return the first limit keys.
+        """
+        mask = self.__mask(conditions)
+        if numpy is None:
+            rows = [row for row, m in enumerate(mask) if m]
+        else:
+            rows = numpy.flatnonzero(mask)
+        if order is not None:
+            field, descending = order
+            if field not in self.__columns:
+                raise KeyError(field)
+            values = self.__columns[field].values()
+            sign = -1.0 if descending else 1.0
+            if numpy is None:
+                rows.sort(key=lambda row: (values[row] != values[row],
+                                           sign * values[row]))
+            else:
+                rows = rows[numpy.argsort(sign * values[rows],
+                                          kind="stable")]
+        return [self.__keys[row] for row in rows[:limit]]
+
+    def aggregate(self, func, field=None, conditions=()):
+        """Aggregate a numeric field over the rows matching conditions.
+
+        Args:
+            func (str): One of AGGREGATES.
+            field (str): Numeric field to aggregate, unused for count.
+            conditions (iterable): (field, operator, value) triples.
+
+        Returns:
+            The count as an int, the other aggregates as a float, or None
+            when no row matches.
+        """
+        if func not in AGGREGATES:
+            raise ValueError("unknown aggregate: {}".format(func))
+        mask = self.__mask(conditions)
+        if func == "count":
+            return int(sum(mask)) if numpy is None else int(mask.sum())
+        if field not in self.numeric:
+            raise KeyError(field)
+        column = self.__columns[field].values()
+        if numpy is None:
+            values = [v for v, m in zip(column, mask) if m]
+            if not values:
+                return None
+            if func == "avg":
+                return sum(values) / len(values)
+            return float({"sum": sum, "min": min, "max": max}[func](values))
+        values = column[mask]
+        if len(values) == 0:
+            return None
+        return float(getattr(values, "mean" if func == "avg" else func)())
+
+    def __mask(self, conditions):
+        """Return the live-row mask of the rows matching conditions."""
+        if numpy is None:
+            mask = [bool(a) for a in self.__alive.values()]
+        else:
+            mask = self.__alive.values().astype(bool)
+        for field, op, value in conditions:
+            compare = OPERATORS[op]
+            if field in self.__codes:
+                column = self.__codes[field].values()
+                codes = self.__matching(field, compare, value)
+                if numpy is None:
+                    mask = [m and v in codes for m, v in zip(mask, column)]
+                else:
+                    mask &= numpy.isin(column, list(codes))
+            elif field in self.__columns:
+                column = self.__columns[field].values()
+                value = float(value)
+                if numpy is None:
+                    mask = [m and compare(v, value)
+                            for m, v in zip(mask, column)]
+                else:
+                    mask &= compare(column, value)
+            else:
+                raise KeyError(field)
+        return mask
+
+    def __matching(self, field, compare, value):
+        """Return the set of the codes of an id field whose value compares
+        true with value, as strings compare; -1 stands for an empty id.
+
+        Codes follow the order values were first seen in, so operators
+        other than == are applied to the values, not to the codes.
+        """
+        if compare is operator.eq and value:
+            code = self.__dicts[field].get(value)
+            return set() if code is None else {code}
+        codes = set()
+        for name, code in self.__dicts[field].items():
+            try:
+                if compare(name, value):
+                    codes.add(code)
+            except TypeError:
+                pass
+        if isinstance(value, str) and compare("", value):
+            codes.add(-1)
+        return codes
+
+    def __compact(self):
+        """Drop the dead rows from every column."""
+        alive = [row for row, key in enumerate(self.__keys) if key is not None]
+        for field, column in self.__columns.items():
+            self.__columns[field] = self.__keep(column, alive, "d")
+        for field, column in self.__codes.items():
+            self.__codes[field] = self.__keep(column, alive, "q")
+        self.__keys = [self.__keys[row] for row in alive]
+        self.__rows = {key: row for row, key in enumerate(self.__keys)}
+        self.__alive = Column("b")
+        for _ in alive:
+            self.__alive.append(1)
+
+    @staticmethod
+    def __keep(column, rows, typecode):
+        """Return a new Column holding the values of column at rows."""
+        values = column.values()
+        kept = Column(typecode)
+        for row in rows:
+            kept.append(values[row])
+        return kept
@@ -1,6 +1,14 @@
 #!/usr/bin/python3
 """Defines the FileStorage class."""
 import json
+import os
+import queue
+import threading
+import time
+from datetime import timedelta
+from itertools import chain
+from itertools import islice
+from models.base_model import registry
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -8,42 +16,1280 @@ from models.city import City
 from models.place import Place
 from models.amenity import Amenity
 from models.review import Review
+from models.engine import binary_snapshot
+from models.engine import geo
+from models.engine import parallel_load
+from models.engine import serializers
+from models.engine.binary_snapshot import BinarySnapshot
+from models.engine.columnar import ColumnarIndex
+from models.engine.fulltext import TextIndex
+from models.engine.indexes import ForeignKeyIndex
+from models.engine.indexes import GeoIndex
+from models.engine.indexes import SortedIndex
+from models.engine.query import fields
+from models.engine.query import matches
+from models.engine.query import ordered
+from models.engine.query import prepare
+from models.engine.storage_engine import SEARCHABLE
+from models.engine.storage_engine import StorageEngine
+from models.engine.storage_engine import TIMESTAMPS
+from models.engine.storage_engine import to_datetime
 
 
-class FileStorage:
-    """Represent an abstracted storage engine.
+class FileStorage(StorageEngine):
+    """Represent a storage engine backed by a JSON file.
+
+    In journal mode (HBNB_FILE_JOURNAL=1) every save appends the pending
+    mutations to __log_path instead of rewriting __file_path; the log is
+    folded back into a fresh snapshot once it grows past __log_limit.
+
+    In lazy mode (HBNB_LAZY_LOAD=1) reload() only keeps the decoded
+    dictionaries; an object is built the first time it is reached through
+    get(), all() or a query on its class.
+
+    Snapshots are written to a temporary file that replaces __file_path
+    with an atomic rename, so a crash never leaves a truncated database.
+    HBNB_FSYNC picks when writes are flushed to disk: "always" (default),
+    "never", or a number N to fsync at most once every N milliseconds. A
+    write whose fsync is skipped is synced by a timer once the N ms have
+    passed, so no write stays unsynced for much longer than N ms.
+
+    Saves can be grouped: between begin() and the matching commit(), and
+    within HBNB_GROUP_COMMIT milliseconds of the last physical write,
+    save() only records that a write is owed. The owed write happens on
+    commit() or flush(), and a write owed by the window is made by a
+    timer once the window ends, so it lands within HBNB_GROUP_COMMIT ms
+    even if no other save comes. Every public method holds __lock, so
+    the timer never writes while the objects are being changed.
+
+    With HBNB_SNAPSHOT_FORMAT=binary snapshots are written in the binary
+    format of models/engine/binary_snapshot.py, to file.hbnb. reload()
+    recognizes that format by its magic bytes, maps the file and stashes
+    each key with the offset of its record, which is only decoded when
+    the object is needed, as in lazy mode.
+
+    HBNB_SERIALIZER picks the codec of the snapshot among the serializers
+    of models/engine/serializers.py (json by default); the snapshot file
+    takes its extension. reload() recognizes the codec by the magic bytes
+    of the file, JSON text having none. The binary format and the journal
+    hold JSON text, so they use json when the codec does not write it.
+    After either setting changes, reload() falls back to the newest
+    snapshot of another codec or format, file.json for instance; the
+    next full snapshot replaces it.
+
+    In sharded mode (HBNB_SHARDED=1) each class is saved to its own file,
+    named after __file_path (file.State.json, ...), and a save only
+    rewrites the shards of the classes with pending mutations. reload()
+    only notes which shards exist; a shard is read the first time its
+    class is queried. A single-file snapshot found in sharded mode is
+    loaded and split into shards by the next save. Sharded saves always
+    rewrite whole shards, so the journal and the writer thread are not
+    used in this mode.
+
+    With HBNB_LOAD_WORKERS set above 1, a JSON snapshot or shard is
+    decoded by that many forked processes (models/engine/parallel_load.py)
+    while reload() builds the objects of the ranges already decoded.
+    Files smaller than twice __load_chunk are decoded in one piece.
+
+    The TextIndex of a class searched with search() is saved next to the
+    snapshot (file.json.Place.fts, ...) by flush(), which also runs at
+    exit, and loaded by the first search of a later process, which then
+    only tokenizes the objects whose text changed in between.
+
+    In asynchronous mode (HBNB_ASYNC_SAVE=1) a write only copies the
+    to_dict() of the changed objects onto a queue; a writer thread keeps
+    the JSON text of every object, encodes the changes and owns all file
+    I/O. flush() waits until every queued write is on disk.
 
     Attributes:
+        __format (str): Snapshot format written, "json" or "binary".
+        __serializer (Serializer): Codec of the snapshot and fragments.
         __file_path (str): The name of the file to save objects to.
+        __log_path (str): The name of the append-only journal file.
+        __log_limit (int): Journal size in bytes that triggers compaction.
+        __stale (list): Snapshot and journal reloaded from another codec
+            or format, removed once __file_path is written.
+        __journal (bool): Whether saves append to the journal.
+        __lazy (bool): Whether reload() defers building objects.
+        __sharded (bool): Whether each class is saved to its own file.
+        __unloaded (set): Names of the classes whose shard is not read.
+        __resharding (bool): Whether the next save must write every
+            shard and remove the single-file snapshot.
+        __workers (int): Processes decoding a JSON snapshot on reload.
+        __load_chunk (int): Approximate size in bytes of the ranges the
+            worker processes decode.
+        __fsync (str): The fsync policy, as read from HBNB_FSYNC.
+        __last_sync (float): time.monotonic() of the last fsync.
+        __unsynced (set): Paths written since the last fsync, when the
+            fsync interval skipped theirs.
+        __sync_timer (threading.Timer): Timer that fsyncs __unsynced,
+            None when it is empty.
+        __sync_lock (threading.Lock): Guards __unsynced and __sync_timer.
+        __group_window (float): Group commit window in milliseconds.
+        __commit_timer (threading.Timer): Timer making the write owed by
+            the group commit window, None when it is not running.
+        __lock (threading.RLock): Held by every public method and by the
+            group commit timer while it writes.
+        __batches (int): Number of begin() calls not committed yet.
+        __owed (bool): Whether a save() was deferred and not written yet.
+        __last_write (float): time.monotonic() of the last physical save.
+        __async (bool): Whether writes are handed to the writer thread.
+        __queue (queue.Queue): Writes waiting for the writer thread, as
+            (reset, changes, compact) tuples; None until it is started.
+        __imaged (dict): The __objects dictionary the writer thread holds
+            the JSON text of; a full copy is queued when it is replaced.
+        __failure (BaseException): Error of the last failed background
+            write, raised by the next flush() or write.
         __objects (dict): A dictionary of instantiated objects.
+        __pending (dict): Keys mutated since the last save, mapped to
+            their object or None when the object was deleted.
+        __fragments (dict): Cached record of each clean object, encoded
+            by __serializer, so a save only re-encodes the objects that
+            actually changed.
+        __by_class (dict): Per-class index mapping a class name to the
+            dictionary of its stored objects.
+        __ids (dict): Identity map from a class name to {id: obj} of its
+            built objects, so get() and exists() format no key.
+        __indexes (dict): Class name (None for every class) mapped to the
+            list of secondary indexes kept current on its objects.
+        __indexed (dict): The __objects dictionary the indexes describe;
+            they are rebuilt when __objects is replaced.
+        __raw (dict): Reloaded to_dict() representations not built yet,
+            or the offset of their record in the binary snapshot of
+            their class in __maps.
+        __raw_by_class (dict): Class name mapped to the set of its keys
+            in __raw.
+        __maps (dict): Class name mapped to the binary snapshot holding
+            the records of its stashed offsets.
+        __columns (dict): Class name mapped to its ColumnarIndex, for the
+            classes an analytical query has been run on.
+        __ranges (dict): (class name or None, timestamp field) mapped to
+            the SortedIndex answering since() for them.
+        __grids (dict): Class name mapped to the GeoIndex answering
+            nearby() and bbox() for it.
+        __texts (dict): Class name mapped to the TextIndex answering
+            search() for it.
     """
-    __file_path = "file.json"
+    __format = os.getenv("HBNB_SNAPSHOT_FORMAT", "json")
+    __serializer = serializers.get(os.getenv("HBNB_SERIALIZER", "json"))
+    if __format == "binary" and not __serializer.text:
+        __serializer = serializers.get("json")
+    if __format == "binary":
+        __file_path = "file.hbnb"
+    else:
+        __file_path = "file" + __serializer.extension
+    __log_path = __file_path + ".log"
+    __log_limit = 4 * 1024 * 1024
+    __stale = []
+    __journal = os.getenv("HBNB_FILE_JOURNAL") == "1"
+    __lazy = os.getenv("HBNB_LAZY_LOAD") == "1"
+    __sharded = os.getenv("HBNB_SHARDED") == "1"
+    __unloaded = set()
+    __resharding = False
+    __workers = int(os.getenv("HBNB_LOAD_WORKERS", "1"))
+    __load_chunk = 4 * 1024 * 1024
+    __fsync = os.getenv("HBNB_FSYNC", "always")
+    __last_sync = 0.0
+    __unsynced = set()
+    __sync_timer = None
+    __sync_lock = threading.Lock()
+    __group_window = float(os.getenv("HBNB_GROUP_COMMIT", "0"))
+    __commit_timer = None
+    __lock = threading.RLock()
+    __batches = 0
+    __owed = False
+    __last_write = float("-inf")
+    __async = os.getenv("HBNB_ASYNC_SAVE") == "1"
+    __queue = None
+    __imaged = None
+    __failure = None
     __objects = {}
+    __pending = {}
+    __fragments = {}
+    __by_class = {}
+    __ids = {}
+    __indexes = {
+        "City": [ForeignKeyIndex("City", "state_id", "State")],
+        "Place": [ForeignKeyIndex("Place", "city_id", "City"),
+                  ForeignKeyIndex("Place", "user_id", "User")],
+        "Review": [ForeignKeyIndex("Review", "place_id", "Place"),
+                   ForeignKeyIndex("Review", "user_id", "User")]
+    }
+    __indexed = None
+    __raw = {}
+    __raw_by_class = {}
+    __maps = {}
+    __columns = {}
+    __ranges = {}
+    __grids = {}
+    __texts = {}
+
+    def __init__(self):
+        """Initialize a new FileStorage.
+
+        Raises:
+            ValueError: If HBNB_FSYNC is not "always", "never" or a number
+                of milliseconds.
+        """
+        policy = FileStorage.__fsync
+        if policy not in ("always", "never"):
+            try:
+                interval = float(policy)
+            except ValueError:
+                interval = None
+            if interval is None or not 0 <= interval < float("inf"):
+                raise ValueError("invalid HBNB_FSYNC: {}".format(policy))
+
+    def all(self, cls=None):
+        """Return a copy of the dictionary __objects.
+
+        The copy can be changed freely; objects are removed from storage
+        with delete(), which keeps the indexes and the journal current.
+
+        Args:
+            cls (type or str): If given, only return the objects of this
+                class, looked up through the per-class index.
+        """
+        with FileStorage.__lock:
+            if cls is None:
+                self.__load_shards()
+                self.__materialize()
+                return dict(FileStorage.__objects)
+            cls_name = self.__cls_name(cls)
+            self.__load_shards(cls_name)
+            self.__materialize(cls_name)
+            return dict(self.__class_index().get(cls_name, {}))
+
+    def count(self, cls=None):
+        """Return the number of stored objects, optionally of class cls."""
+        with FileStorage.__lock:
+            if cls is None:
+                self.__load_shards()
+                return len(FileStorage.__objects) + len(FileStorage.__raw)
+            cls_name = self.__cls_name(cls)
+            self.__load_shards(cls_name)
+            return (len(self.__class_index().get(cls_name, ())) +
+                    len(FileStorage.__raw_by_class.get(cls_name, ())))
+
+    def get(self, cls, id):
+        """Return the object of class cls with the given id, or None.
+
+        Args:
+            cls (type or str): Class of the object.
+            id (str): Id of the object.
+        """
+        with FileStorage.__lock:
+            cls_name = self.__cls_name(cls)
+            self.__load_shards(cls_name)
+            self.__class_index()
+            obj = FileStorage.__ids.get(cls_name, {}).get(id)
+            if obj is None and FileStorage.__raw:
+                key = "{}.{}".format(cls_name, id)
+                if key in FileStorage.__raw:
+                    obj = self.__load(key)
+            return obj
+
+    def exists(self, cls, id):
+        """Return True if an object of class cls with the given id is
+        stored, without building it.
+
+        Args:
+            cls (type or str): Class of the object.
+            id (str): Id of the object.
+        """
+        with FileStorage.__lock:
+            cls_name = self.__cls_name(cls)
+            self.__load_shards(cls_name)
+            self.__class_index()
+            if id in FileStorage.__ids.get(cls_name, ()):
+                return True
+            return "{}.{}".format(cls_name, id) in FileStorage.__raw
+
+    def add_index(self, index):
+        """Register a secondary index and fill it from the stored objects.
+
+        Args:
+            index (Index): The index to keep current from now on.
+        """
+        with FileStorage.__lock:
+            FileStorage.__indexes.setdefault(index.cls_name, []).append(index)
+            self.__load_shards(index.cls_name)
+            self.__materialize(index.cls_name)
+            if index.cls_name is None:
+                self.__class_index()
+                objs = FileStorage.__objects
+            else:
+                objs = self.__class_index().get(index.cls_name, {})
+            for key, obj in objs.items():
+                index.add(key, obj)
+
+    def children(self, parent_cls, parent_id, child_cls):
+        """Return {key: obj} of the child_cls objects referencing a parent.
+
+        Args:
+            parent_cls (type or str): Class of the referenced object.
+            parent_id (str): Id of the referenced object.
+            child_cls (type or str): Class of the referencing objects.
+        """
+        with FileStorage.__lock:
+            parent = self.__cls_name(parent_cls)
+            child = self.__cls_name(child_cls)
+            self.__load_shards(child)
+            self.__materialize(child)
+            self.__class_index()
+            children = {}
+            for index in FileStorage.__indexes.get(child, ()):
+                if getattr(index, "parent", None) == parent:
+                    children.update(index.lookup(parent_id))
+            return children
+
+    def columns(self, cls):
+        """Return the columnar mirror of class cls.
+
+        The mirror is built on first use and kept in sync from then on.
+
+        Args:
+            cls (type or str): The model class.
+        """
+        with FileStorage.__lock:
+            cls_name = self.__cls_name(cls)
+            index = FileStorage.__columns.get(cls_name)
+            if index is None:
+                index = ColumnarIndex(registry[cls_name])
+                self.add_index(index)
+                FileStorage.__columns[cls_name] = index
+            return index
+
+    def since(self, ts, cls=None, field="updated_at"):
+        """Return {key: obj} of the objects whose field is at or after ts.
+
+        The objects are in ascending order of field. The SortedIndex
+        answering the query is built on first use and kept in sync from
+        then on.
+
+        Args:
+            ts (datetime or str): Lower bound, see to_datetime().
+            cls (type or str): If given, only return objects of this class.
+            field (str): One of TIMESTAMPS.
 
-    def all(self):
-        """Return the dictionary __objects."""
-        return FileStorage.__objects
+        Raises:
+            ValueError: If field is not a timestamp or ts is invalid text.
+        """
+        with FileStorage.__lock:
+            if field not in TIMESTAMPS:
+                raise ValueError("not a timestamp: {}".format(field))
+            ts = to_datetime(ts)
+            cls_name = None if cls is None else self.__cls_name(cls)
+            return self.__sorted(cls_name, field).range(ts)
+
+    def nearby(self, lat, lon, radius_km, limit=None, cls="Place"):
+        """Return {key: obj} of the objects within radius_km of a point.
+
+        The objects are in ascending order of distance. The GeoIndex
+        answering the query is built on first use and kept in sync from
+        then on.
+
+        Args:
+            lat (float): Latitude of the point, in degrees.
+            lon (float): Longitude of the point, in degrees.
+            radius_km (float): Great-circle radius in kilometres.
+            limit (int): If given, only return the limit nearest objects.
+            cls (type or str): Class of the objects, with latitude and
+                longitude attributes.
+
+        Raises:
+            ValueError: If a coordinate or the radius is out of range.
+        """
+        with FileStorage.__lock:
+            geo.validate(lat, lon, radius_km)
+            return self.__grid(cls).nearby(lat, lon, radius_km, limit)
+
+    def bbox(self, south, west, north, east, cls="Place"):
+        """Return {key: obj} of the objects inside a bounding box.
+
+        Args:
+            south, west, north, east (float): Edges of the box in degrees;
+                west greater than east crosses the antimeridian.
+            cls (type or str): Class of the objects, with latitude and
+                longitude attributes.
+
+        Raises:
+            ValueError: If an edge is out of range or south > north.
+        """
+        with FileStorage.__lock:
+            geo.validate(south, west)
+            geo.validate(north, east)
+            if south > north:
+                raise ValueError("south edge above north edge")
+            return self.__grid(cls).bbox(south, west, north, east)
+
+    def search(self, cls, terms, limit=None):
+        """Return {key: obj} of the objects matching any word of terms.
+
+        The objects are in descending order of BM25 score. The TextIndex
+        answering the query is loaded or built on first use and kept in
+        sync from then on.
+
+        Args:
+            cls (type or str): One of the classes of SEARCHABLE.
+            terms (str): The words to look for.
+            limit (int): If given, only return the limit best objects.
+
+        Raises:
+            ValueError: If cls is not searchable.
+        """
+        with FileStorage.__lock:
+            cls_name = self.__cls_name(cls)
+            if cls_name not in SEARCHABLE:
+                raise ValueError("not searchable: {}".format(cls_name))
+            self.__load_shards(cls_name)
+            self.__materialize(cls_name)
+            self.__class_index()
+            index = FileStorage.__texts.get(cls_name)
+            if index is None:
+                index = TextIndex(cls_name, SEARCHABLE[cls_name])
+                index.load(self.__text_path(cls_name))
+                self.add_index(index)
+                FileStorage.__texts[cls_name] = index
+            return index.search(terms, limit)
+
+    def query(self, cls, conditions=(), order_by=(), limit=None):
+        """Return an iterator over the objects of class cls matching every
+        condition, sorted by order_by, at most limit of them.
+
+        The candidates come from the first index that applies: the
+        ForeignKeyIndex of a field compared with == to a non-empty id, the
+        ColumnarIndex when a numeric field is compared or is the only sort
+        key, the SortedIndex of a timestamp that is compared or is the
+        only sort key; otherwise every object of the class is scanned.
+        Each candidate is then checked against every condition. Unless
+        they have to be sorted, objects are yielded as they are found, so
+        a limit ends the scan early.
+
+        Args:
+            cls (type or str): The model class.
+            conditions (iterable): (field, operator, value) triples; see
+                models/engine/query.py.
+            order_by (iterable): Field names, prefixed with "-" for
+                descending order.
+            limit (int): If given, the most objects to return.
+
+        Raises:
+            KeyError: If a field is not a field of cls.
+            ValueError: If an operator or a value is invalid.
+        """
+        cls_name = self.__cls_name(cls)
+        conditions, keys = prepare(registry[cls_name], conditions, order_by)
+        with FileStorage.__lock:
+            self.__load_shards(cls_name)
+            self.__materialize(cls_name)
+            candidates, order = self.__plan(cls_name, conditions, keys, limit)
+        found = (obj for obj in candidates if matches(obj, conditions))
+        if keys and keys != order:
+            return iter(ordered(found, registry[cls_name], keys, limit))
+        return islice(found, limit)
+
+    def to_json(self, obj):
+        """Return the JSON text of obj.to_dict(), on one line.
+
+        When the serializer writes JSON, the record of a stored object is
+        taken from the cache save() encodes into, and left there.
+        """
+        with FileStorage.__lock:
+            key = "{}.{}".format(obj.__class__.__name__, obj.id)
+            if (FileStorage.__serializer.text and
+                    FileStorage.__objects.get(key) is obj):
+                return self.__fragment(key)
+            return json.dumps(obj.to_dict())
 
     def new(self, obj):
         """Set in __objects obj with key <obj_class_name>.id"""
-        ocname = obj.__class__.__name__
-        FileStorage.__objects["{}.{}".format(ocname, obj.id)] = obj
+        with FileStorage.__lock:
+            ocname = obj.__class__.__name__
+            key = "{}.{}".format(ocname, obj.id)
+            self.__put(key, obj)
+            FileStorage.__pending[key] = obj
+
+    def touch(self, obj, name=None):
+        """Mark obj as changed so the next save re-encodes it.
+
+        Called by BaseModel on attribute assignment. Objects that are not
+        stored yet (still inside __init__) are ignored. In-place changes
+        to mutable attributes such as lists are not seen and need an
+        explicit assignment or save().
+
+        Args:
+            obj (BaseModel): The changed object.
+            name (str): The assigned attribute, None if unknown.
+        """
+        with FileStorage.__lock:
+            ocname = obj.__class__.__name__
+            key = "{}.{}".format(ocname, obj.id)
+            self.__class_index()
+            if FileStorage.__objects.get(key) is obj:
+                FileStorage.__pending[key] = obj
+                FileStorage.__fragments.pop(key, None)
+                for index in self.__each_index(ocname):
+                    if name is None or name in index.fields:
+                        index.add(key, obj)
+
+    def delete(self, obj=None):
+        """Delete obj from __objects if it's inside."""
+        with FileStorage.__lock:
+            if obj is None:
+                return
+            key = "{}.{}".format(obj.__class__.__name__, obj.id)
+            if self.__drop(key) is not None:
+                FileStorage.__pending[key] = None
+
+    def begin(self):
+        """Start a batch: saves are deferred until the matching commit().
+
+        Batches nest; only the outermost commit() writes.
+        """
+        with FileStorage.__lock:
+            FileStorage.__batches += 1
+
+    def commit(self):
+        """End the innermost batch, writing once if it was the outermost.
+
+        Raises:
+            RuntimeError: If no batch was begun.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__batches == 0:
+                raise RuntimeError("commit() without begin()")
+            FileStorage.__batches -= 1
+            if FileStorage.__batches == 0:
+                self.flush()
+
+    def flush(self):
+        """Perform the write owed by deferred saves, if any.
+
+        Raises the error of a failed background write, if any. In
+        asynchronous mode, also wait until the writer thread has
+        written everything queued so far. Text indexes changed since they
+        were saved are saved too, and files whose fsync was skipped by
+        the fsync interval are synced now.
+        """
+        with FileStorage.__lock:
+            self.__raise_failure()
+            if FileStorage.__owed:
+                self.__write()
+            if FileStorage.__queue is not None:
+                FileStorage.__queue.join()
+                self.__raise_failure()
+            self.__sync_later()
+            for cls_name, index in FileStorage.__texts.items():
+                if index.unsaved:
+                    index.save(self.__text_path(cls_name))
 
     def save(self):
-        """Serialize __objects to the JSON file __file_path."""
-        odict = FileStorage.__objects
-        objdict = {obj: odict[obj].to_dict() for obj in odict.keys()}
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objdict, f)
+        """Persist __objects, or defer the write when grouping saves.
+
+        Appends the pending mutations to the journal in journal mode,
+        otherwise serializes __objects to the JSON file __file_path.
+        """
+        with FileStorage.__lock:
+            elapsed = (time.monotonic() - FileStorage.__last_write) * 1000
+            if FileStorage.__batches or elapsed < FileStorage.__group_window:
+                FileStorage.__owed = True
+                if not FileStorage.__batches and \
+                        FileStorage.__commit_timer is None:
+                    timer = threading.Timer(
+                        (FileStorage.__group_window - elapsed) / 1000,
+                        self.__expire)
+                    timer.daemon = True
+                    FileStorage.__commit_timer = timer
+                    timer.start()
+            else:
+                self.__write()
+
+    def compact(self):
+        """Write a full snapshot to __file_path and drop the journal.
+
+        In sharded mode, rewrite every shard instead.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__sharded:
+                self.__load_shards()
+                self.__write_shards(set(self.__class_index()) |
+                                    set(FileStorage.__raw_by_class))
+                return
+            if FileStorage.__async:
+                self.__enqueue(compact=True)
+                self.flush()
+                return
+            self.__snapshot((key, self.__fragment(key)) for key in
+                            chain(FileStorage.__objects, FileStorage.__raw))
+            FileStorage.__pending.clear()
+            FileStorage.__owed = False
+            FileStorage.__imaged = None
 
     def reload(self):
-        """Deserialize the JSON file __file_path to __objects, if it exists."""
+        """Deserialize __file_path and replay __log_path, if they exist.
+
+        A json snapshot is streamed one object at a time, so the parsed
+        document is never held in memory next to the rebuilt objects; a
+        binary one is mapped and its records decoded on demand. A torn
+        record at the end of the journal is truncated away. When
+        __file_path does not exist, a snapshot written next to it with
+        another codec or format is read instead, with its journal.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__queue is not None:
+                self.flush()
+            self.__unmap()
+            if FileStorage.__sharded:
+                FileStorage.__unloaded = {
+                    cls_name for cls_name in registry
+                    if os.path.exists(self.__shard_path(cls_name))}
+                FileStorage.__resharding = os.path.exists(
+                    FileStorage.__file_path)
+                if not FileStorage.__resharding:
+                    return
+            restore = self.__restorer()
+            path = self.__found_path()
+            try:
+                self.__read(path, restore)
+            except FileNotFoundError:
+                pass
+            if FileStorage.__sharded:
+                return
+            FileStorage.__stale = []
+            if path != FileStorage.__file_path:
+                FileStorage.__stale = [path, path + ".log"]
+                self.__replay(path + ".log", restore)
+            self.__replay(FileStorage.__log_path, restore)
+
+    def __replay(self, path, restore):
+        """Apply the records of the journal at path, if it exists.
+
+        A torn record at its end, left by a crash mid-append, is cut off
+        so the next append starts on a line of its own.
+        """
         try:
-            with open(FileStorage.__file_path) as f:
-                objdict = json.load(f)
-                for o in objdict.values():
-                    cls_name = o["__class__"]
-                    del o["__class__"]
-                    self.new(eval(cls_name)(**o))
+            with open(path, "rb+") as f:
+                end = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        rec = json.loads(line)
+                    except ValueError:
+                        f.truncate(end)
+                        break
+                    end += len(line)
+                    if rec["obj"] is None:
+                        self.__drop(rec["key"])
+                    else:
+                        restore(rec["key"], rec["obj"])
         except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def __found_path():
+        """Return the snapshot reload() reads.
+
+        That is __file_path, or when it does not exist the newest snapshot
+        next to it written with another codec or format, as left by a
+        change of HBNB_SERIALIZER or HBNB_SNAPSHOT_FORMAT.
+        """
+        path = FileStorage.__file_path
+        if os.path.exists(path):
+            return path
+        root = os.path.splitext(path)[0]
+        found = []
+        for ext in chain((serializer.extension for serializer in
+                          serializers.SERIALIZERS.values()), (".hbnb",)):
+            try:
+                found.append((os.path.getmtime(root + ext), root + ext))
+            except OSError:
+                pass
+        return max(found)[1] if found else path
+
+    def __expire(self):
+        """Body of the group commit timer: make the owed write, if any.
+
+        A write inside a batch is left to commit(). The error of a failed
+        write is raised by the next flush(); the write stays owed.
+        """
+        with FileStorage.__lock:
+            FileStorage.__commit_timer = None
+            if not FileStorage.__owed or FileStorage.__batches:
+                return
+            try:
+                self.__write()
+            except BaseException as e:
+                FileStorage.__owed = True
+                FileStorage.__failure = e
+
+    def __write(self):
+        """Physically write the pending mutations, as save() describes."""
+        if FileStorage.__commit_timer is not None:
+            FileStorage.__commit_timer.cancel()
+            FileStorage.__commit_timer = None
+        FileStorage.__owed = False
+        FileStorage.__last_write = time.monotonic()
+        if FileStorage.__sharded:
+            shards = {key.partition(".")[0] for key in FileStorage.__pending}
+            if FileStorage.__resharding:
+                self.__load_shards()
+                shards |= set(self.__class_index())
+                shards |= set(FileStorage.__raw_by_class)
+            self.__write_shards(shards)
+        elif FileStorage.__async:
+            self.__enqueue()
+        elif not FileStorage.__journal:
+            self.compact()
+        else:
+            self.__append((key, "null" if obj is None else
+                           self.__json(key))
+                          for key, obj in FileStorage.__pending.items())
+            FileStorage.__pending.clear()
+            FileStorage.__imaged = None
+            if os.path.getsize(FileStorage.__log_path) > \
+                    FileStorage.__log_limit:
+                self.compact()
+
+    def __enqueue(self, compact=False):
+        """Hand the pending mutations over to the writer thread.
+
+        Only the to_dict() of each changed object is taken here; the
+        first write after __objects is replaced copies every object.
+
+        Args:
+            compact (bool): Whether to write a full snapshot even in
+                journal mode.
+        """
+        self.__raise_failure()
+        reset = FileStorage.__imaged is not FileStorage.__objects
+        if reset:
+            FileStorage.__imaged = FileStorage.__objects
+            changes = {key: obj.to_dict()
+                       for key, obj in FileStorage.__objects.items()}
+            changes.update((key, dict(self.__unbuilt(key)))
+                           for key in FileStorage.__raw)
+        else:
+            changes = {key: None if obj is None else obj.to_dict()
+                       for key, obj in FileStorage.__pending.items()}
+        FileStorage.__pending.clear()
+        if FileStorage.__queue is None:
+            FileStorage.__queue = queue.Queue()
+            threading.Thread(target=FileStorage.__run,
+                             args=(FileStorage.__queue,),
+                             name="FileStorage writer", daemon=True).start()
+        FileStorage.__queue.put((reset, changes, compact))
+
+    @staticmethod
+    def __run(jobs):
+        """Body of the writer thread: encode and write queued changes.
+
+        Every write waiting in the queue is taken at once and written
+        together, in journal mode as one append.
+
+        Args:
+            jobs (queue.Queue): The queue filled by __enqueue().
+        """
+        image = {}
+        while True:
+            batch = [jobs.get()]
+            while True:
+                try:
+                    batch.append(jobs.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                snapshot = not FileStorage.__journal
+                records = {}
+                for reset, changes, compact in batch:
+                    if reset:
+                        image.clear()
+                    snapshot = snapshot or reset or compact
+                    for key, o in changes.items():
+                        if o is None:
+                            image.pop(key, None)
+                            records[key] = "null"
+                        else:
+                            image[key] = FileStorage.__serializer.dumps(o)
+                            if FileStorage.__serializer.text:
+                                records[key] = image[key]
+                            else:
+                                records[key] = json.dumps(o)
+                if not snapshot:
+                    FileStorage.__append(records.items())
+                    snapshot = (os.path.getsize(FileStorage.__log_path) >
+                                FileStorage.__log_limit)
+                if snapshot:
+                    FileStorage.__snapshot(image.items())
+            except BaseException as e:
+                FileStorage.__failure = e
+            finally:
+                for _ in batch:
+                    jobs.task_done()
+
+    @staticmethod
+    def __raise_failure():
+        """Raise, once, the error of the last failed background write."""
+        failure = FileStorage.__failure
+        if failure is not None:
+            FileStorage.__failure = None
+            raise failure
+
+    @staticmethod
+    def __append(records):
+        """Append (key, JSON text or "null") records to __log_path."""
+        with open(FileStorage.__log_path, "a") as f:
+            for key, frag in records:
+                f.write('{{"key": {}, "obj": {}}}\n'.format(json.dumps(key),
+                                                            frag))
+            if not FileStorage.__sync(f):
+                FileStorage.__defer_sync(FileStorage.__log_path)
+
+    @staticmethod
+    def __snapshot(items, path=None):
+        """Atomically replace a snapshot by the (key, record) items.
+
+        Args:
+            items (iterable): The (key, record) pairs to write.
+            path (str): The file to replace; defaults to __file_path, in
+                which case the journal is removed once the snapshot is in
+                place.
+        """
+        target = FileStorage.__file_path if path is None else path
+        tmp_path = "{}.{}.tmp".format(target, os.getpid())
+        try:
+            if FileStorage.__format == "binary":
+                with open(tmp_path, "wb") as f:
+                    binary_snapshot.write(f, items)
+                    synced = FileStorage.__sync(f)
+            else:
+                with open(tmp_path, "wb") as f:
+                    FileStorage.__serializer.dump(f, items)
+                    synced = FileStorage.__sync(f)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if synced:
+            FileStorage.__sync_dir()
+        else:
+            FileStorage.__defer_sync(target)
+        if path is None:
+            for stale in [FileStorage.__log_path] + FileStorage.__stale:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+            FileStorage.__stale = []
+
+    @staticmethod
+    def __sync(f):
+        """Flush f and fsync it as the policy says; return True if it did."""
+        f.flush()
+        policy = FileStorage.__fsync
+        if policy == "never":
+            return False
+        now = time.monotonic()
+        if policy != "always" and \
+                (now - FileStorage.__last_sync) * 1000 < float(policy):
+            return False
+        os.fsync(f.fileno())
+        FileStorage.__last_sync = now
+        return True
+
+    @staticmethod
+    def __defer_sync(path):
+        """Have the timer fsync path once the fsync interval has passed.
+
+        Does nothing unless the policy is an interval.
+        """
+        policy = FileStorage.__fsync
+        if policy in ("always", "never"):
+            return
+        with FileStorage.__sync_lock:
+            FileStorage.__unsynced.add(path)
+            if FileStorage.__sync_timer is not None:
+                return
+            elapsed = time.monotonic() - FileStorage.__last_sync
+            timer = threading.Timer(max(float(policy) / 1000 - elapsed, 0),
+                                    FileStorage.__sync_later)
+            timer.daemon = True
+            FileStorage.__sync_timer = timer
+            timer.start()
+
+    @staticmethod
+    def __sync_later():
+        """Fsync the files in __unsynced and the directory of the
+        snapshot, and cancel the timer."""
+        with FileStorage.__sync_lock:
+            if FileStorage.__sync_timer is not None:
+                FileStorage.__sync_timer.cancel()
+                FileStorage.__sync_timer = None
+            paths = FileStorage.__unsynced
+            FileStorage.__unsynced = set()
+            if paths:
+                FileStorage.__last_sync = time.monotonic()
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue  # removed since, e.g. a journal folded back
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        if paths:
+            FileStorage.__sync_dir()
+
+    @staticmethod
+    def __sync_dir():
+        """Fsync the directory of __file_path so a rename is durable."""
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(
+                FileStorage.__file_path)), os.O_RDONLY)
+        except OSError:
+            return  # platforms that can't open directories (Windows)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __plan(self, cls_name, conditions, keys, limit):
+        """Return the candidates of a query, as query() describes, and the
+        sort keys they are already in order of.
+
+        When every condition and the only sort key are numeric, the
+        ColumnarIndex also sorts the candidates and applies the limit.
+        """
+        by_class = self.__class_index().get(cls_name, {})
+        # a ForeignKeyIndex leaves out the objects with an empty parent id
+        lookups = [index.lookup(value)
+                   for index in self.__each_index(cls_name)
+                   if isinstance(index, ForeignKeyIndex)
+                   for field, op, value in conditions
+                   if index.fields == (field,) and op in ("==", "=") and
+                   value]
+        if lookups:
+            return list(min(lookups, key=len).values()), []
+        types = fields(registry[cls_name])
+        numeric = [(field, op, value) for field, op, value in conditions
+                   if types[field] in (int, float)]
+        order = [key for key in keys[:1] if types[key[0]] in (int, float)]
+        if numeric or order and len(keys) == 1:
+            if len(keys) != 1:
+                order = []
+            rows = self.columns(cls_name).select(
+                numeric, order[0] if order else None,
+                limit if order and len(numeric) == len(conditions) else None)
+            return [by_class[key] for key in rows], order
+        for field in TIMESTAMPS:
+            bounds = [(op, value) for name, op, value in conditions
+                      if name == field]
+            if not bounds and keys not in ([(field, False)],
+                                           [(field, True)]):
+                continue
+            start = stop = None
+            for op, value in bounds:
+                if op in (">", ">=", "==", "="):
+                    start = value if start is None else max(start, value)
+                if op in ("<", "<=", "==", "="):
+                    if op != "<":
+                        value += timedelta(microseconds=1)
+                    stop = value if stop is None else min(stop, value)
+            objs = list(self.__sorted(cls_name, field).range(
+                start, stop).values())
+            if keys == [(field, True)]:
+                objs.reverse()
+                return objs, keys
+            return objs, [(field, False)]
+        return list(by_class.values()), []
+
+    def __sorted(self, cls_name, field):
+        """Return the SortedIndex of field over class cls_name (None for
+        every class), built on first use."""
+        self.__load_shards(cls_name)
+        self.__materialize(cls_name)
+        self.__class_index()
+        index = FileStorage.__ranges.get((cls_name, field))
+        if index is None:
+            index = SortedIndex(cls_name, field)
+            self.add_index(index)
+            FileStorage.__ranges[(cls_name, field)] = index
+        return index
+
+    def __grid(self, cls):
+        """Return the GeoIndex of class cls, built on first use."""
+        cls_name = self.__cls_name(cls)
+        self.__load_shards(cls_name)
+        self.__materialize(cls_name)
+        self.__class_index()
+        index = FileStorage.__grids.get(cls_name)
+        if index is None:
+            index = GeoIndex(cls_name)
+            self.add_index(index)
+            FileStorage.__grids[cls_name] = index
+        return index
+
+    @staticmethod
+    def __cls_name(cls):
+        """Return the class name of cls, which may already be a str."""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    @staticmethod
+    def __each_index(cls_name):
+        """Yield the secondary indexes covering objects of cls_name."""
+        yield from FileStorage.__indexes.get(cls_name, ())
+        yield from FileStorage.__indexes.get(None, ())
+
+    @staticmethod
+    def __class_index():
+        """Return __by_class, rebuilding indexes if __objects was replaced."""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__by_class = {}
+            FileStorage.__ids = {}
+            for indexes in FileStorage.__indexes.values():
+                for index in indexes:
+                    index.clear()
+            FileStorage.__indexed = FileStorage.__objects
+            for key, obj in FileStorage.__objects.items():
+                cls_name = key.partition(".")[0]
+                FileStorage.__by_class.setdefault(cls_name, {})[key] = obj
+                FileStorage.__ids.setdefault(cls_name, {})[obj.id] = obj
+                for index in FileStorage.__each_index(cls_name):
+                    index.add(key, obj)
+        return FileStorage.__by_class
+
+    def __put(self, key, obj):
+        """Store obj under key and keep the cache and indexes current."""
+        by_class = self.__class_index()
+        cls_name = key.partition(".")[0]
+        self.__unstash(key)
+        FileStorage.__objects[key] = obj
+        FileStorage.__fragments.pop(key, None)
+        by_class.setdefault(cls_name, {})[key] = obj
+        FileStorage.__ids.setdefault(cls_name, {})[obj.id] = obj
+        for index in self.__each_index(cls_name):
+            index.add(key, obj)
+
+    def __drop(self, key):
+        """Remove and return the object stored under key, if any."""
+        by_class = self.__class_index()
+        cls_name = key.partition(".")[0]
+        self.__unstash(key)
+        obj = FileStorage.__objects.pop(key, None)
+        FileStorage.__fragments.pop(key, None)
+        by_class.get(cls_name, {}).pop(key, None)
+        if obj is not None:
+            FileStorage.__ids[cls_name].pop(obj.id, None)
+        for index in self.__each_index(cls_name):
+            index.remove(key)
+        return obj
+
+    def __stash(self, key, o):
+        """Keep the to_dict() representation o under key, unbuilt."""
+        self.__drop(key)
+        FileStorage.__raw[key] = o
+        FileStorage.__raw_by_class.setdefault(key.partition(".")[0],
+                                              set()).add(key)
+
+    @staticmethod
+    def __unstash(key):
+        """Forget the unbuilt representation stored under key, if any."""
+        if FileStorage.__raw.pop(key, None) is not None:
+            FileStorage.__raw_by_class[key.partition(".")[0]].discard(key)
+
+    def __load(self, key):
+        """Build, store and return the object stashed under key."""
+        frag = FileStorage.__fragments.get(key)
+        obj = self.__build(self.__unbuilt(key))
+        self.__put(key, obj)
+        if frag is not None:
+            FileStorage.__fragments[key] = frag
+        return obj
+
+    def __map(self, snapshot):
+        """Stash every record of the binary snapshot, undecoded."""
+        raw = FileStorage.__raw
+        raw_by_class = FileStorage.__raw_by_class
+        for key, offset in snapshot.entries():
+            cls_name = key.partition(".")[0]
+            if FileStorage.__maps.get(cls_name) is not snapshot:
+                self.__unmap(cls_name)
+                FileStorage.__maps[cls_name] = snapshot
+            if key in FileStorage.__objects:
+                self.__drop(key)
+            raw[key] = offset
+            raw_by_class.setdefault(cls_name, set()).add(key)
+
+    @staticmethod
+    def __unmap(cls_name=None):
+        """Decode the records stashed from the map of cls_name, or of
+        every class, and close the snapshots no class uses anymore."""
+        maps = FileStorage.__maps
+        if cls_name is None:
+            names = list(maps)
+        else:
+            names = [cls_name] if cls_name in maps else []
+        raw = FileStorage.__raw
+        for name in names:
+            snapshot = maps.pop(name)
+            for key in FileStorage.__raw_by_class.get(name, ()):
+                if isinstance(raw[key], int):
+                    raw[key] = snapshot.load(raw[key])
+            if snapshot not in maps.values():
+                snapshot.close()
+
+    @staticmethod
+    def __unbuilt(key):
+        """Return the to_dict() representation stashed under key."""
+        o = FileStorage.__raw[key]
+        if isinstance(o, int):
+            return FileStorage.__maps[key.partition(".")[0]].load(o)
+        return o
+
+    def __restorer(self):
+        """Return the function storing a reloaded (key, to_dict()) pair."""
+        if FileStorage.__lazy:
+            return self.__stash
+
+        def restore(key, o):
+            self.__put(key, self.__build(o))
+        return restore
+
+    def __read(self, path, restore):
+        """Pass every (key, to_dict()) pair of the snapshot at path to
+        restore, or stash its records if it is a binary snapshot."""
+        with open(path, "rb") as f:
+            magic = f.read(len(binary_snapshot.MAGIC))
+            if magic == binary_snapshot.MAGIC:
+                self.__map(BinarySnapshot(path))
+                return
+            f.seek(0)
+            serializer = serializers.by_magic(magic)
+            if serializer is None and FileStorage.__workers > 1 and \
+                    parallel_load.available():
+                try:
+                    for key, o in parallel_load.load(
+                            path, FileStorage.__workers,
+                            FileStorage.__load_chunk):
+                        restore(key, o)
+                    return
+                except ValueError:
+                    pass  # not cut at member boundaries, read it serially
+            if serializer is None:
+                serializer = FileStorage.__serializer
+                if not serializer.text:
+                    serializer = serializers.get("json")
+            for key, o in serializer.load(f):
+                restore(key, o)
+
+    @staticmethod
+    def __shard_path(cls_name):
+        """Return the shard file of class cls_name."""
+        root, ext = os.path.splitext(FileStorage.__file_path)
+        return "{}.{}{}".format(root, cls_name, ext)
+
+    @staticmethod
+    def __text_path(cls_name):
+        """Return the file the TextIndex of class cls_name is saved to."""
+        return "{}.{}.fts".format(FileStorage.__file_path, cls_name)
+
+    def __load_shards(self, cls_name=None):
+        """Read the unread shard of cls_name, or every unread shard."""
+        if not FileStorage.__unloaded:
+            return
+        if cls_name is None:
+            names = list(FileStorage.__unloaded)
+        elif cls_name in FileStorage.__unloaded:
+            names = [cls_name]
+        else:
+            return
+        restore = self.__restorer()
+        for name in names:
+            FileStorage.__unloaded.discard(name)
+            try:
+                self.__read(self.__shard_path(name), restore)
+            except FileNotFoundError:
+                pass
+
+    def __write_shards(self, shards):
+        """Rewrite the shards of the classes in shards.
+
+        A class without objects left has its shard removed. Once done,
+        the single-file snapshot is removed if it was being split.
+        """
+        by_class = self.__class_index()
+        for cls_name in shards:
+            self.__load_shards(cls_name)
+            keys = list(chain(by_class.get(cls_name, ()),
+                              FileStorage.__raw_by_class.get(cls_name, ())))
+            path = self.__shard_path(cls_name)
+            if keys:
+                self.__snapshot(((key, self.__fragment(key)) for key in keys),
+                                path)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        FileStorage.__pending.clear()
+        FileStorage.__owed = False
+        if FileStorage.__resharding:
+            FileStorage.__resharding = False
+            try:
+                os.remove(FileStorage.__file_path)
+            except FileNotFoundError:
+                pass
+
+    def __materialize(self, cls_name=None):
+        """Build every stashed object, or only those of class cls_name."""
+        if not FileStorage.__raw:
             return
+        if cls_name is None:
+            keys = list(FileStorage.__raw)
+        else:
+            keys = list(FileStorage.__raw_by_class.get(cls_name, ()))
+        for key in keys:
+            self.__load(key)
+
+    @staticmethod
+    def __fragment(key):
+        """Return the record of the object stored under key.
+
+        The record is encoded by __serializer and cached until the object
+        is touched, new()'d again or deleted.
+        """
+        frag = FileStorage.__fragments.get(key)
+        if frag is None:
+            obj = FileStorage.__objects.get(key)
+            if obj is None:
+                o = FileStorage.__raw[key]
+                if isinstance(o, int):
+                    frag = FileStorage.__maps[key.partition(".")[0]].text(o)
+                else:
+                    frag = FileStorage.__serializer.dumps(o)
+            else:
+                frag = FileStorage.__serializer.dumps(obj.to_dict())
+            FileStorage.__fragments[key] = frag
+        return frag
+
+    @staticmethod
+    def __json(key):
+        """Return the JSON text of the object stored under key."""
+        if FileStorage.__serializer.text:
+            return FileStorage.__fragment(key)
+        obj = FileStorage.__objects.get(key)
+        if obj is None:
+            return json.dumps(FileStorage.__unbuilt(key))
+        return json.dumps(obj.to_dict())
+
+    @staticmethod
+    def __build(o):
+        """Rebuild an object from its to_dict() representation."""
+        cls_name = o["__class__"]
+        del o["__class__"]
+        return registry[cls_name](**o)
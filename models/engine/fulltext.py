@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+"""Defines the full-text index of FileStorage.
+
+Text is cut into runs of letters and digits, case-folded, as the
+unicode61 tokenizer of SQLite FTS5 does when it keeps diacritics. Matches
+are ranked by Okapi BM25 with the parameters and IDF of the bm25()
+function of FTS5, so both engines order search results alike.
+
+The index can be saved to a file and loaded again by another process. An
+entry is only reused for an object whose indexed text still has the
+digest recorded with it; any other object is tokenized again.
+"""
+import json
+import os
+import re
+from collections import Counter
+from hashlib import blake2b
+from math import log
+from models.engine.indexes import Index
+
+TOKEN = re.compile(r"[^\W_]+")
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Return the list of the case-folded words of text."""
+    return TOKEN.findall(text.casefold())
+
+
+def digest(text):
+    """Return a 64-bit digest of text."""
+    return int.from_bytes(blake2b(text.encode("utf-8", "surrogatepass"),
+                                  digest_size=8).digest(), "big")
+
+
+class TextIndex(Index):
+    """Inverted index over the text attributes of a class.
+
+    Each indexed version of an object is a document with its own number.
+    When an object changes or goes away, its document is only marked
+    dead: its postings are skipped by search() and dropped once dead
+    documents outnumber live ones. clear() keeps the documents as spares,
+    which add() reuses when it is given an object whose text is unchanged,
+    so rebuilding the index after a reload tokenizes nothing new.
+
+    Attributes:
+        unsaved (bool): Whether documents were posted or removed since the
+            index was last saved or loaded.
+        __postings (dict): Word mapped to {document: occurrences}.
+        __docs (dict): Document mapped to its (key, length, digest).
+        __lengths (dict): Live document mapped to its length.
+        __live (dict): Key mapped to the document of its object.
+        __spare (dict): Key mapped to a document add() may reuse.
+        __objs (dict): Key mapped to its object.
+        __total (int): Sum of the lengths of the live documents.
+        __next (int): Number of the next document.
+    """
+
+    def __init__(self, cls_name, fields):
+        """Initialize a new TextIndex.
+
+        Args:
+            cls_name (str): Name of the indexed class.
+            fields (tuple): Attributes whose str values are indexed.
+        """
+        self.cls_name = cls_name
+        self.fields = tuple(fields)
+        self.unsaved = False
+        self.__postings = {}
+        self.__docs = {}
+        self.__lengths = {}
+        self.__live = {}
+        self.__spare = {}
+        self.__objs = {}
+        self.__total = 0
+        self.__next = 0
+
+    def add(self, key, obj):
+        """Index the text of obj under key."""
+        text = "\n".join(value for value in (getattr(obj, field, None)
+                                             for field in self.fields)
+                         if isinstance(value, str))
+        hashed = digest(text)
+        doc = self.__live.pop(key, None)
+        if doc is None:
+            doc = self.__spare.pop(key, None)
+        else:
+            self.__total -= self.__lengths.pop(doc)
+        if doc is None or self.__docs[doc][2] != hashed:
+            doc = self.__post(key, text, hashed)
+        length = self.__docs[doc][1]
+        self.__live[key] = doc
+        self.__lengths[doc] = length
+        self.__objs[key] = obj
+        self.__total += length
+        dead = len(self.__docs) - len(self.__live) - len(self.__spare)
+        if dead > max(len(self.__live), 1024):
+            self.__purge()
+
+    def remove(self, key):
+        """Forget the entry for key, if any."""
+        doc = self.__live.pop(key, None)
+        if doc is not None:
+            del self.__objs[key]
+            self.__total -= self.__lengths.pop(doc)
+            self.unsaved = True
+
+    def clear(self):
+        """Forget every entry, keeping the documents as spares."""
+        self.__spare.update(self.__live)
+        self.__live = {}
+        self.__lengths = {}
+        self.__objs = {}
+        self.__total = 0
+
+    def search(self, terms, limit=None):
+        """Return {key: obj} of the objects matching any word of terms.
+
+        The objects are in descending order of BM25 score, ties in order
+        of key, at most limit of them if given. Spare documents are
+        dropped first: the caller indexes every object before searching.
+
+        Args:
+            terms (str): The words to look for.
+            limit (int): If given, only return the limit best objects.
+        """
+        self.__spare.clear()
+        lengths = self.__lengths
+        count = len(lengths)
+        if not count or limit == 0:
+            return {}
+        base = K1 * (1 - B)
+        slope = K1 * B * count / self.__total if self.__total else 0.0
+        scores = {}
+        for word in set(tokenize(terms)):
+            posting = self.__postings.get(word)
+            if not posting:
+                continue
+            if len(self.__docs) == count:
+                found = len(posting)
+            else:
+                found = sum(1 for doc in posting if doc in lengths)
+            idf = max(log((count - found + 0.5) / (found + 0.5)), 1e-6)
+            weight = idf * (K1 + 1)
+            for doc, freq in posting.items():
+                length = lengths.get(doc)
+                if length is not None:
+                    scores[doc] = (scores.get(doc, 0.0) + freq * weight /
+                                   (freq + base + slope * length))
+        if limit is not None and limit < len(scores):
+            least = sorted(scores.values(), reverse=True)[limit - 1]
+            scores = {doc: score for doc, score in scores.items()
+                      if score >= least}
+        docs = self.__docs
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], docs[doc][0]))
+        return {docs[doc][0]: self.__objs[docs[doc][0]]
+                for doc in ranked[:limit]}
+
+    def save(self, path):
+        """Write the live and spare documents to path, atomically."""
+        docs = {doc: number for number, doc in enumerate(
+            set(self.__live.values()) | set(self.__spare.values()))}
+        postings = {}
+        for word, posting in self.__postings.items():
+            kept = [(docs[doc], freq) for doc, freq in posting.items()
+                    if doc in docs]
+            if kept:
+                postings[word] = [[number for number, freq in kept],
+                                  [freq for number, freq in kept]]
+        text = json.dumps({"fields": self.fields,
+                           "docs": [self.__docs[doc] for doc in docs],
+                           "postings": postings})
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self.unsaved = False
+
+    def load(self, path):
+        """Add the documents saved to path as spares.
+
+        A missing, unreadable or foreign file is ignored: it only saves
+        tokenizing again.
+        """
+        try:
+            with open(path) as f:
+                body = json.load(f)
+            if tuple(body["fields"]) != self.fields:
+                return
+            first = self.__next
+            docs = {first + number: (key, int(length), int(hashed))
+                    for number, (key, length, hashed) in
+                    enumerate(body["docs"])}
+            postings = {word: dict(zip((first + number for number in
+                                        numbers), freqs))
+                        for word, (numbers, freqs) in
+                        body["postings"].items()}
+        except (OSError, ValueError, TypeError, KeyError):
+            return
+        for word, posting in postings.items():
+            self.__postings.setdefault(word, {}).update(posting)
+        self.__docs.update(docs)
+        for doc, (key, length, hashed) in docs.items():
+            if key not in self.__live:
+                self.__spare[key] = doc
+        self.__next = first + len(docs)
+
+    def __post(self, key, text, hashed):
+        """Index text as a new document of key and return its number."""
+        words = tokenize(text)
+        doc = self.__next
+        self.__next += 1
+        self.__docs[doc] = (key, len(words), hashed)
+        for word, freq in Counter(words).items():
+            self.__postings.setdefault(word, {})[doc] = freq
+        self.unsaved = True
+        return doc
+
+    def __purge(self):
+        """Drop the postings of dead documents."""
+        kept = set(self.__live.values()) | set(self.__spare.values())
+        self.__docs = {doc: self.__docs[doc] for doc in kept}
+        postings = {}
+        for word, posting in self.__postings.items():
+            posting = {doc: freq for doc, freq in posting.items()
+                       if doc in kept}
+            if posting:
+                postings[word] = posting
+        self.__postings = postings
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""Defines the geometry shared by the geospatial queries of the engines.
+
+Coordinates are latitude and longitude in degrees and distances are
+great-circle distances in kilometres. A bounding box is a
+(south, west, north, east) tuple; west is greater than east when the box
+crosses the antimeridian.
+"""
+from math import asin, cos, degrees, inf, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = radians(EARTH_RADIUS_KM)
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Return the haversine distance between two points."""
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    a = (sin((phi2 - phi1) / 2) ** 2 +
+         cos(phi1) * cos(phi2) * sin(radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def around(lat, lon, radius_km):
+    """Return the bounding box of the points within radius_km of a point.
+
+    The box spans every longitude when it reaches a pole.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    south = lat - dlat
+    north = lat + dlat
+    if south <= -90.0 or north >= 90.0:
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+    dlon = degrees(asin(min(1.0, sin(radius_km / EARTH_RADIUS_KM) /
+                            cos(radians(lat)))))
+    if dlon >= 180.0:
+        return south, -180.0, north, 180.0
+    west = lon - dlon
+    east = lon + dlon
+    if west < -180.0:
+        west += 360.0
+    if east > 180.0:
+        east -= 360.0
+    return south, west, north, east
+
+
+def gap_km(lat, lon, south, west, north, east):
+    """Return a lower bound of the distance from a point inside a box to
+    any point outside it.
+
+    A point beyond a parallel edge is at least the latitude difference
+    away; a point beyond a meridian edge is across the great circle of
+    that meridian, so at least the cross-track distance to it away.
+    West and east may lie beyond -180 and 180 for a box crossing the
+    antimeridian.
+    """
+    gaps = []
+    if north < 90.0:
+        gaps.append((north - lat) * KM_PER_DEGREE)
+    if south > -90.0:
+        gaps.append((lat - south) * KM_PER_DEGREE)
+    if east - west < 360.0:
+        for delta in (lon - west, east - lon):
+            gaps.append(EARTH_RADIUS_KM * asin(
+                cos(radians(lat)) * sin(radians(min(delta, 90.0)))))
+    return min(gaps, default=inf)
+
+
+def coordinates(obj):
+    """Return the (latitude, longitude) set on obj, or None.
+
+    Class defaults do not count, so objects without a location are not
+    placed at 0, 0.
+    """
+    attrs = obj._attributes()
+    lat = attrs.get("latitude")
+    lon = attrs.get("longitude")
+    for value in (lat, lon):
+        if type(value) not in (int, float):
+            return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return lat, lon
+
+
+def validate(lat, lon, radius_km=0.0):
+    """Raise ValueError unless the arguments of a query are in range."""
+    if not -90.0 <= lat <= 90.0:
+        raise ValueError("latitude out of range: {}".format(lat))
+    if not -180.0 <= lon <= 180.0:
+        raise ValueError("longitude out of range: {}".format(lon))
+    if not radius_km >= 0.0:
+        raise ValueError("negative radius: {}".format(radius_km))
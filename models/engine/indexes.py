@@ -0,0 +1,328 @@
+#!/usr/bin/python3
+"""Defines the secondary indexes kept current by FileStorage."""
+import heapq
+from bisect import bisect_left
+from bisect import insort
+from datetime import datetime
+from math import floor
+from models.engine import geo
+
+
+class Index:
+    """Base class of a secondary index over stored objects.
+
+    FileStorage calls add() whenever an object is stored or one of the
+    attributes in fields is assigned, and remove() when it is deleted.
+
+    Attributes:
+        cls_name (str): Name of the indexed class, None for every class.
+        fields (tuple): Attributes whose assignment re-indexes an object.
+    """
+    cls_name = None
+    fields = ()
+
+    def add(self, key, obj):
+        """Index obj under key, replacing any previous entry for key."""
+        raise NotImplementedError
+
+    def remove(self, key):
+        """Forget the entry for key, if any."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Forget every entry."""
+        raise NotImplementedError
+
+
+class ForeignKeyIndex(Index):
+    """Reverse index from a parent id to the objects referencing it.
+
+    Attributes:
+        parent (str): Name of the class the field refers to.
+        __by_parent (dict): Parent id mapped to {key: obj}.
+        __values (dict): Key mapped to the parent id it is indexed under.
+    """
+
+    def __init__(self, cls_name, field, parent):
+        """Initialize a new ForeignKeyIndex.
+
+        Args:
+            cls_name (str): Name of the referencing class.
+            field (str): Attribute holding the parent id.
+            parent (str): Name of the referenced class.
+        """
+        self.cls_name = cls_name
+        self.fields = (field,)
+        self.parent = parent
+        self.__by_parent = {}
+        self.__values = {}
+
+    def add(self, key, obj):
+        """Index obj under the parent id held in its field."""
+        self.remove(key)
+        value = getattr(obj, self.fields[0], None)
+        if value:
+            self.__by_parent.setdefault(value, {})[key] = obj
+            self.__values[key] = value
+
+    def remove(self, key):
+        """Forget the entry for key, if any."""
+        value = self.__values.pop(key, None)
+        if value is not None:
+            children = self.__by_parent[value]
+            del children[key]
+            if not children:
+                del self.__by_parent[value]
+
+    def clear(self):
+        """Forget every entry."""
+        self.__by_parent = {}
+        self.__values = {}
+
+    def lookup(self, value):
+        """Return {key: obj} of the objects referencing parent id value."""
+        return dict(self.__by_parent.get(value, {}))
+
+
+class SortedIndex(Index):
+    """Index ordering objects by a datetime attribute, for range queries.
+
+    The order is only built by the first range query, with one sort, and
+    kept current by bisection from then on; until then add() and remove()
+    are dictionary updates, so filling the index stays linear. Objects
+    whose attribute does not hold a datetime are left out.
+
+    Attributes:
+        __values (dict): Key mapped to the value it is indexed under.
+        __objs (dict): Key mapped to its object.
+        __sorted (list): (value, key) pairs in order, None until needed.
+    """
+
+    def __init__(self, cls_name, field):
+        """Initialize a new SortedIndex.
+
+        Args:
+            cls_name (str): Name of the indexed class, None for every
+                class.
+            field (str): Attribute holding the datetime to order by.
+        """
+        self.cls_name = cls_name
+        self.fields = (field,)
+        self.__values = {}
+        self.__objs = {}
+        self.__sorted = None
+
+    def add(self, key, obj):
+        """Index obj under the value of its field."""
+        self.remove(key)
+        value = getattr(obj, self.fields[0], None)
+        if isinstance(value, datetime):
+            self.__values[key] = value
+            self.__objs[key] = obj
+            if self.__sorted is not None:
+                insort(self.__sorted, (value, key))
+
+    def remove(self, key):
+        """Forget the entry for key, if any."""
+        value = self.__values.pop(key, None)
+        if value is not None:
+            del self.__objs[key]
+            if self.__sorted is not None:
+                del self.__sorted[bisect_left(self.__sorted, (value, key))]
+
+    def clear(self):
+        """Forget every entry."""
+        self.__values = {}
+        self.__objs = {}
+        self.__sorted = None
+
+    def range(self, start=None, stop=None):
+        """Return {key: obj} of the objects with start <= value < stop.
+
+        The objects are in ascending order of value. A missing bound
+        leaves that side of the range open.
+        """
+        if self.__sorted is None:
+            self.__sorted = sorted((value, key) for key, value
+                                   in self.__values.items())
+        entries = self.__sorted
+        lo = 0 if start is None else bisect_left(entries, (start,))
+        hi = len(entries) if stop is None else bisect_left(entries, (stop,))
+        return {key: self.__objs[key] for value, key in entries[lo:hi]}
+
+
+class GeoIndex(Index):
+    """Grid index over the latitude and longitude of objects.
+
+    The globe is cut into square cells of cell_size degrees; each cell
+    holds the coordinates of the objects inside it, so a query only
+    reads the cells overlapping its bounding box. Objects without both
+    coordinates set are left out (see geo.coordinates()).
+
+    Attributes:
+        cell_size (float): Side of a cell in degrees.
+        __cells (dict): (row, column) mapped to {key: (lat, lon)}.
+        __points (dict): Key mapped to its (lat, lon).
+        __objs (dict): Key mapped to its object.
+    """
+    fields = ("latitude", "longitude")
+
+    def __init__(self, cls_name, cell_size=0.01):
+        """Initialize a new GeoIndex.
+
+        Args:
+            cls_name (str): Name of the indexed class.
+            cell_size (float): Side of a cell in degrees; 0.01 is about
+                1.1 km along a meridian.
+        """
+        self.cls_name = cls_name
+        self.cell_size = cell_size
+        self.__cells = {}
+        self.__points = {}
+        self.__objs = {}
+
+    def add(self, key, obj):
+        """Index obj under the cell of its coordinates."""
+        self.remove(key)
+        point = geo.coordinates(obj)
+        if point is not None:
+            self.__points[key] = point
+            self.__objs[key] = obj
+            self.__cells.setdefault(self.__cell(*point), {})[key] = point
+
+    def remove(self, key):
+        """Forget the entry for key, if any."""
+        point = self.__points.pop(key, None)
+        if point is not None:
+            del self.__objs[key]
+            cell = self.__cell(*point)
+            del self.__cells[cell][key]
+            if not self.__cells[cell]:
+                del self.__cells[cell]
+
+    def clear(self):
+        """Forget every entry."""
+        self.__cells = {}
+        self.__points = {}
+        self.__objs = {}
+
+    def bbox(self, south, west, north, east):
+        """Return {key: obj} of the objects inside a bounding box.
+
+        West greater than east means the box crosses the antimeridian.
+        """
+        return {key: self.__objs[key] for key, lat, lon
+                in self.__inside(south, west, north, east)}
+
+    def nearby(self, lat, lon, radius_km, limit=None):
+        """Return {key: obj} of the objects within radius_km of a point.
+
+        The objects are in ascending order of distance, at most limit of
+        them if given. When the area holds many more objects than the
+        limit, rings of cells are read outward from the cell of the point
+        until no unread cell can hold a nearer object instead.
+        """
+        if limit == 0:
+            return {}
+        box = geo.around(lat, lon, radius_km)
+        found = None
+        if (limit is not None and self.__span(*box) <= len(self.__cells) and
+                sum(map(len, self.__overlapping(*box))) > 16 * limit):
+            found = self.__nearest(lat, lon, radius_km, limit)
+        if found is None:
+            found = ((geo.distance_km(lat, lon, plat, plon), key)
+                     for key, plat, plon in self.__inside(*box))
+            found = sorted(item for item in found if item[0] <= radius_km)
+            if limit is not None:
+                found = found[:limit]
+        return {key: self.__objs[key] for distance, key in found}
+
+    def __cell(self, lat, lon):
+        """Return the (row, column) of the cell holding a point."""
+        return floor(lat / self.cell_size), floor(lon / self.cell_size)
+
+    def __span(self, south, west, north, east):
+        """Return the number of cells overlapping a bounding box."""
+        row0, col0 = self.__cell(south, west)
+        row1, col1 = self.__cell(north, east)
+        if west > east:
+            col1 += round(360.0 / self.cell_size)
+        return (row1 - row0 + 1) * (col1 - col0 + 1)
+
+    def __nearest(self, lat, lon, radius_km, limit):
+        """Return the sorted (distance, key) pairs of the limit nearest
+        points within radius_km, reading rings of cells outward.
+
+        Returns None once a ring would wrap around the globe.
+        """
+        size = self.cell_size
+        columns = round(360.0 / size)
+        half = columns // 2
+        row0, col0 = self.__cell(lat, lon)
+        heap = []
+        ring = 0
+        while 2 * ring + 1 < columns:
+            for row, col in self.__ring(row0, col0, ring):
+                col = (col + half) % columns - half
+                for points in (self.__cells.get((row, col)),
+                               self.__cells.get((row, half))
+                               if col == -half else None):
+                    if not points:
+                        continue
+                    for key, (plat, plon) in points.items():
+                        distance = geo.distance_km(lat, lon, plat, plon)
+                        if distance > radius_km:
+                            continue
+                        if len(heap) < limit:
+                            heapq.heappush(heap, (-distance, key))
+                        elif distance < -heap[0][0]:
+                            heapq.heapreplace(heap, (-distance, key))
+            bound = geo.gap_km(lat, lon, (row0 - ring) * size,
+                               (col0 - ring) * size, (row0 + ring + 1) * size,
+                               (col0 + ring + 1) * size)
+            if bound > radius_km or (len(heap) == limit and
+                                     -heap[0][0] < bound):
+                return sorted((-distance, key) for distance, key in heap)
+            ring += 1
+        return None
+
+    @staticmethod
+    def __ring(row0, col0, ring):
+        """Yield the cells at exactly ring cells from (row0, col0)."""
+        if ring == 0:
+            yield row0, col0
+            return
+        for col in range(col0 - ring, col0 + ring + 1):
+            yield row0 - ring, col
+            yield row0 + ring, col
+        for row in range(row0 - ring + 1, row0 + ring):
+            yield row, col0 - ring
+            yield row, col0 + ring
+
+    def __inside(self, south, west, north, east):
+        """Yield (key, lat, lon) of the points inside a bounding box."""
+        for points in self.__overlapping(south, west, north, east):
+            for key, (lat, lon) in points.items():
+                if south <= lat <= north and (
+                        west <= lon <= east if west <= east else
+                        lon >= west or lon <= east):
+                    yield key, lat, lon
+
+    def __overlapping(self, south, west, north, east):
+        """Yield the {key: (lat, lon)} of the non-empty cells overlapping a
+        bounding box."""
+        if west > east:
+            yield from self.__overlapping(south, west, north, 180.0)
+            yield from self.__overlapping(south, -180.0, north, east)
+            return
+        row0, col0 = self.__cell(south, west)
+        row1, col1 = self.__cell(north, east)
+        if (row1 - row0 + 1) * (col1 - col0 + 1) <= len(self.__cells):
+            cells = (self.__cells.get((row, col)) for row in
+                     range(row0, row1 + 1) for col in range(col0, col1 + 1))
+        else:
+            cells = (points for (row, col), points in self.__cells.items()
+                     if row0 <= row <= row1 and col0 <= col <= col1)
+        for points in cells:
+            if points:
+                yield points
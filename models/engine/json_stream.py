@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Defines a streaming reader for the JSON file of FileStorage."""
+import json
+import re
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JSONStream:
+    """Read the members of a top-level JSON object one at a time.
+
+    Only the member being decoded and one chunk of text are held in
+    memory, instead of the whole parsed document.
+
+    Attributes:
+        __file (file): Text file positioned at the start of the document.
+        __chunk_size (int): Number of characters read at a time.
+        __buf (str): Text read but not consumed yet, from __pos on.
+        __pos (int): Read position inside __buf.
+    """
+    __decoder = json.JSONDecoder()
+
+    def __init__(self, f, chunk_size=64 * 1024):
+        """Initialize a new JSONStream.
+
+        Args:
+            f (file): Text file holding a JSON object.
+            chunk_size (int): Number of characters read at a time.
+        """
+        self.__file = f
+        self.__chunk_size = chunk_size
+        self.__buf = ""
+        self.__pos = 0
+
+    def __iter__(self):
+        """Yield the (key, value) pairs of the object in document order."""
+        self.__expect("{")
+        if self.__peek() == "}":
+            return
+        while True:
+            key = self.__value()
+            self.__expect(":")
+            yield key, self.__value()
+            if self.__peek() == "}":
+                return
+            self.__expect(",")
+
+    def __fill(self):
+        """Append the next chunk to the buffer; return False at EOF."""
+        chunk = self.__file.read(self.__chunk_size)
+        self.__buf = self.__buf[self.__pos:] + chunk
+        self.__pos = 0
+        return chunk != ""
+
+    def __peek(self):
+        """Skip whitespace and return the next character ("" at EOF)."""
+        while True:
+            self.__pos = WHITESPACE.match(self.__buf, self.__pos).end()
+            if self.__pos < len(self.__buf) or not self.__fill():
+                return self.__buf[self.__pos:self.__pos + 1]
+
+    def __expect(self, char):
+        """Consume char or raise json.JSONDecodeError."""
+        if self.__peek() != char:
+            raise json.JSONDecodeError("Expecting '{}'".format(char),
+                                       self.__buf, self.__pos)
+        self.__pos += 1
+
+    def __value(self):
+        """Decode and return the next JSON value, reading as needed."""
+        self.__peek()
+        while True:
+            try:
+                value, self.__pos = self.__decoder.raw_decode(self.__buf,
+                                                              self.__pos)
+                return value
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+"""Defines a parallel reader for the JSON snapshots of FileStorage.
+
+The snapshot is cut into byte ranges at member boundaries, which forked
+processes decode into plain {key: to_dict()} dictionaries; they are sent
+back pickled through pipes and yielded in file order, so the caller
+builds objects from the first range while the next ones are decoded.
+
+A boundary is a "}, " closing a member followed by the quoted key of a
+registered class. Such text can also occur inside a record, e.g. in a
+nested dictionary, so every range must decode to whole members ending
+exactly where the next range starts; otherwise load() raises ValueError
+and the caller reads the file serially.
+
+Workers are only forked, where os.fork() exists: a spawned worker would
+import models, whose storage would reload the file again. They are forked
+by hand rather than through multiprocessing.Pool, whose threads pickle
+the task function by reference: that imports models, and deadlocks when
+reload() runs while models is being imported.
+"""
+import json
+import os
+import pickle
+import re
+import signal
+from collections import deque
+from itertools import islice
+from models.base_model import registry
+
+WINDOW = 1024 * 1024
+
+
+def available():
+    """Return True if worker processes can be forked on this platform."""
+    return hasattr(os, "fork")
+
+
+def split(path, parts):
+    """Return the byte ranges of the snapshot at path, at most parts.
+
+    Ranges are (start, stop) pairs; the stop of the last one is None,
+    meaning the end of the file. Cut points with no boundary within
+    WINDOW bytes after them are dropped.
+    """
+    size = os.path.getsize(path)
+    boundary = re.compile(rb'\}, "(?:' + b"|".join(
+        re.escape(name.encode()) for name in registry) + rb')\.')
+    starts = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            target = max(size * i // parts, starts[-1] + 1)
+            f.seek(target)
+            match = boundary.search(f.read(WINDOW))
+            if match is not None:
+                starts.append(target + match.start() + 3)
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def decode(path, start, stop):
+    """Return {key: value} of the members in a byte range.
+
+    The range is decoded in one json.loads() call, once wrapped in the
+    braces of a document: the first range already starts with "{", the
+    last one ends with "}" and the others end with ", ".
+
+    Args:
+        path (str): The snapshot file.
+        start (int): Offset of the first member, or 0 for the opening
+            brace of the document.
+        stop (int): Offset where the next range starts, or None to read
+            up to the closing brace.
+
+    Raises:
+        ValueError: If the range does not hold whole members.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(-1 if stop is None else stop - start)
+    if start != 0:
+        data = b"{" + data
+    if stop is not None:
+        data = data.rstrip()
+        if not data.endswith(b","):
+            raise ValueError("range does not end after a member")
+        data = data[:-1] + b"}"
+    doc = json.loads(data)
+    if not isinstance(doc, dict):
+        raise ValueError("snapshot is not a JSON object")
+    return doc
+
+
+def _fork(path, start, stop):
+    """Fork a process decoding a byte range and return (pid, read_fd).
+
+    The process writes (True, the decoded range), or (False, the error
+    message) if decode() raised ValueError, pickled to the pipe.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            try:
+                result = (True, decode(path, start, stop))
+            except ValueError as e:
+                result = (False, str(e))
+            with os.fdopen(write_fd, "wb") as f:
+                pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    return pid, read_fd
+
+
+def _collect(pid, read_fd):
+    """Return the range decoded by a forked process and reap it.
+
+    Raises:
+        ValueError: If the range does not hold whole members or the
+            process died without sending it.
+    """
+    try:
+        with os.fdopen(read_fd, "rb") as f:
+            ok, result = pickle.load(f)
+    except EOFError:
+        raise ValueError("worker sent no result")
+    finally:
+        os.waitpid(pid, 0)
+    if not ok:
+        raise ValueError(result)
+    return result
+
+
+def load(path, workers, chunk_size=4 * 1024 * 1024):
+    """Yield the (key, value) pairs of the snapshot at path in order.
+
+    Args:
+        path (str): The snapshot file.
+        workers (int): Number of worker processes.
+        chunk_size (int): Approximate size in bytes of a range; there are
+            up to four ranges per worker, so decoding overlaps with the
+            caller consuming earlier ranges.
+
+    Raises:
+        ValueError: If the file cannot be cut at member boundaries.
+    """
+    parts = min(workers * 4, max(os.path.getsize(path) // chunk_size, 1))
+    ranges = split(path, parts)
+    if len(ranges) == 1:
+        yield from decode(path, 0, None).items()
+        return
+    ranges = iter(ranges)
+    running = deque()
+    try:
+        for start, stop in islice(ranges, workers):
+            running.append(_fork(path, start, stop))
+        while running:
+            doc = _collect(*running.popleft())
+            following = next(ranges, None)
+            if following is not None:
+                running.append(_fork(path, *following))
+            yield from doc.items()
+    finally:
+        for pid, read_fd in running:
+            os.kill(pid, signal.SIGKILL)
+            os.close(read_fd)
+            os.waitpid(pid, 0)
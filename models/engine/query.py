@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Defines the filter, order and limit queries shared by the engines.
+
+A query selects the objects of one class matching every condition, a
+(field, operator, value) triple whose operator is a key of OPERATORS,
+sorted by its sort keys and cut to its limit. A sort key is a field name,
+prefixed with "-" for descending order. The fields of a class are its id,
+its timestamps and its str, int and float class attributes; condition
+values are converted to the type of their field, so the console can pass
+them as text.
+"""
+import heapq
+from datetime import datetime
+from models.engine.columnar import OPERATORS
+from models.engine.storage_engine import to_datetime
+
+
+def fields(cls):
+    """Return {field: type} of the fields of cls queries can use."""
+    types = {"id": str, "created_at": datetime, "updated_at": datetime}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if (not name.startswith("_") and name not in types and
+                    type(value) in (str, int, float)):
+                types[name] = type(value)
+    return types
+
+
+def prepare(cls, conditions=(), order_by=()):
+    """Return the conditions and sort keys of a query on cls, checked.
+
+    Numeric values become floats and timestamps naive datetimes; sort keys
+    become (field, descending) pairs.
+
+    Raises:
+        KeyError: If a field is not a field of cls.
+        ValueError: If an operator is unknown or a value does not convert
+            to the type of its field.
+    """
+    types = fields(cls)
+    checked = []
+    for field, op, value in conditions:
+        if op not in OPERATORS:
+            raise ValueError("unknown operator: {}".format(op))
+        kind = types[field]
+        if kind is datetime:
+            value = to_datetime(value)
+        elif kind in (int, float):
+            value = float(value)
+        else:
+            value = str(value)
+        checked.append((field, op, value))
+    keys = []
+    for key in order_by:
+        field = key.lstrip("-")
+        if field not in types:
+            raise KeyError(field)
+        keys.append((field, key.startswith("-")))
+    return checked, keys
+
+
+def matches(obj, conditions):
+    """Return True if obj satisfies every prepared condition."""
+    for field, op, value in conditions:
+        try:
+            if not OPERATORS[op](getattr(obj, field, None), value):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def ordered(objs, cls, keys, limit=None):
+    """Return objs sorted by prepared sort keys, at most limit of them.
+
+    Values that are not of the type of their field sort after the others.
+    """
+    types = fields(cls)
+    objs = list(objs) if limit is None or len(keys) != 1 else objs
+    for field, descending in reversed(keys):
+        kind = (int, float) if types[field] in (int, float) else types[field]
+
+        def key(obj, field=field, kind=kind):
+            value = getattr(obj, field, None)
+            if isinstance(value, kind):
+                return (descending, value)
+            return (not descending, str(value))
+        if len(keys) == 1 and limit is not None:
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return pick(limit, objs, key=key)
+        objs.sort(key=key, reverse=descending)
+    return objs[:limit]
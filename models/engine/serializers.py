@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+"""Defines the serializers FileStorage can write snapshots with.
+
+A serializer encodes the to_dict() representation of one object into a
+record, and writes (key, record) pairs as a snapshot file. FileStorage
+caches the record of each object until it changes, so a save only
+encodes the changed objects. Every serializer stores the same to_dict()
+values, datetimes included as ISO 8601 strings, so objects round-trip
+identically whatever the codec.
+
+json (stdlib) is the default. orjson and msgpack are optional: selecting
+one that is not installed falls back to json. pickle uses protocol 5;
+only reload pickle snapshots you wrote, since unpickling can run
+arbitrary code.
+"""
+import io
+import json
+import pickle
+from models.engine.json_stream import JSONStream
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Serializer:
+    """Base class of a snapshot codec.
+
+    Attributes:
+        name (str): Name selecting the serializer in HBNB_SERIALIZER.
+        extension (str): Extension of the default snapshot file.
+        magic (bytes): First bytes of its snapshots, None for JSON text.
+        text (bool): Whether records are JSON text (str), which the JSON
+            snapshot, the journal and the binary format can embed.
+    """
+    name = None
+    extension = None
+    magic = None
+    text = False
+
+    def available(self):
+        """Return True if the library of the codec is installed."""
+        return True
+
+    def dumps(self, o):
+        """Return the record of the to_dict() representation o."""
+        raise NotImplementedError
+
+    def dump(self, f, records):
+        """Write (key, record) pairs as a snapshot to the binary file f."""
+        raise NotImplementedError
+
+    def load(self, f):
+        """Yield the (key, to_dict()) pairs of the snapshot in binary f."""
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+    """Stdlib json; the snapshot is one JSON object, read as a stream."""
+    name = "json"
+    extension = ".json"
+    text = True
+
+    def dumps(self, o):
+        """Return the JSON text of o."""
+        return json.dumps(o)
+
+    def dump(self, f, records):
+        """Write {key: record, ...} to the binary file f."""
+        out = io.TextIOWrapper(f, encoding="utf-8")
+        out.write("{")
+        sep = ""
+        for key, record in records:
+            out.write("{}{}: {}".format(sep, json.dumps(key), record))
+            sep = ", "
+        out.write("}")
+        out.flush()
+        out.detach()
+
+    def load(self, f):
+        """Yield the members of the JSON object in f one at a time."""
+        return JSONStream(io.TextIOWrapper(f, encoding="utf-8"))
+
+
+class ORJSONSerializer(JSONSerializer):
+    """orjson; same snapshot layout as json, decoded in one call.
+
+    orjson writes NaN and infinities as null and rejects integers that
+    do not fit in 64 bits, where json keeps them.
+    """
+    name = "orjson"
+
+    def available(self):
+        """Return True if orjson is installed."""
+        return orjson is not None
+
+    def dumps(self, o):
+        """Return the JSON text of o."""
+        return orjson.dumps(o).decode()
+
+    def load(self, f):
+        """Return the (key, value) pairs of the JSON object in f."""
+        return orjson.loads(f.read()).items()
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack; the snapshot is the magic then packed key, record pairs."""
+    name = "msgpack"
+    extension = ".msgpack"
+    magic = b"HBNBMPK1"
+
+    def available(self):
+        """Return True if msgpack is installed."""
+        return msgpack is not None
+
+    def dumps(self, o):
+        """Return the packed bytes of o."""
+        return msgpack.packb(o)
+
+    def dump(self, f, records):
+        """Write the magic then every key and record to f."""
+        f.write(self.magic)
+        for key, record in records:
+            f.write(msgpack.packb(key))
+            f.write(record)
+
+    def load(self, f):
+        """Yield the (key, to_dict()) pairs unpacked from f."""
+        f.read(len(self.magic))
+        values = iter(msgpack.Unpacker(f, raw=False))
+        for key in values:
+            yield key, next(values)
+
+
+class PickleSerializer(Serializer):
+    """pickle protocol 5; the magic then one pickle per key and record."""
+    name = "pickle"
+    extension = ".pickle"
+    magic = b"HBNBPKL5"
+
+    def dumps(self, o):
+        """Return the pickle of o."""
+        return pickle.dumps(o, protocol=5)
+
+    def dump(self, f, records):
+        """Write the magic then every key and record to f."""
+        f.write(self.magic)
+        for key, record in records:
+            f.write(pickle.dumps(key, protocol=5))
+            f.write(record)
+
+    def load(self, f):
+        """Yield the (key, to_dict()) pairs unpickled from f."""
+        f.read(len(self.magic))
+        while True:
+            try:
+                key = pickle.load(f)
+            except EOFError:
+                return
+            yield key, pickle.load(f)
+
+
+SERIALIZERS = {s.name: s for s in (JSONSerializer(), ORJSONSerializer(),
+                                   MsgpackSerializer(), PickleSerializer())}
+
+
+def get(name):
+    """Return the serializer called name, or json if it is not installed.
+
+    Raises:
+        ValueError: If no serializer is called name.
+    """
+    try:
+        serializer = SERIALIZERS[name]
+    except KeyError:
+        raise ValueError("unknown serializer: {}".format(name)) from None
+    return serializer if serializer.available() else SERIALIZERS["json"]
+
+
+def by_magic(magic):
+    """Return the serializer whose snapshots start with magic, or None.
+
+    Raises:
+        ValueError: If that serializer is not installed.
+    """
+    for serializer in SERIALIZERS.values():
+        if serializer.magic is not None and magic.startswith(
+                serializer.magic):
+            if not serializer.available():
+                raise ValueError("snapshot written with {}, which is not "
+                                 "installed".format(serializer.name))
+            return serializer
+    return None
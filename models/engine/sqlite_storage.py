@@ -0,0 +1,643 @@
+#!/usr/bin/python3
+"""Defines the SQLiteStorage class."""
+import json
+import os
+import sqlite3
+import weakref
+from datetime import datetime
+from models.base_model import registry
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
+from models.engine import geo
+from models.engine.columnar import AGGREGATES
+from models.engine.columnar import OPERATORS
+from models.engine.columnar import classify
+from models.engine.fulltext import tokenize
+from models.engine.query import prepare
+from models.engine.storage_engine import SEARCHABLE
+from models.engine.storage_engine import StorageEngine
+from models.engine.storage_engine import TIMESTAMPS
+from models.engine.storage_engine import to_datetime
+
+SQL_OPERATORS = {
+    "==": "=",
+    "=": "=",
+    "!=": "!=",
+    "<": "<",
+    "<=": "<=",
+    ">": ">",
+    ">=": ">="
+}
+
+
+def column(cls, field):
+    """Return the SQL expression of field, its class default when NULL.
+
+    A row stores NULL for a field the object never set, where the object
+    reads the class attribute; aggregates and sorts use this expression
+    so they see the same value FileStorage does.
+    """
+    default = getattr(cls, field, None)
+    if type(default) is str:
+        return "COALESCE({}, '{}')".format(field, default.replace("'", "''"))
+    if type(default) in (int, float):
+        return "COALESCE({}, {!r})".format(field, default)
+    return field
+
+
+def condition(cls, field, op, value):
+    """Return the SQL clause comparing field to the parameter value.
+
+    NULL rows also match when the class default of field does, as in
+    column(); the column itself is left bare so its index is still used.
+    """
+    clause = "{} {} ?".format(field, SQL_OPERATORS[op])
+    default = getattr(cls, field, None)
+    if type(default) in (str, int, float):
+        try:
+            hit = OPERATORS[op](default, value)
+        except TypeError:
+            hit = False
+        if hit:
+            clause = "({} OR {} IS NULL)".format(clause, field)
+    return clause
+
+
+class SQLiteStorage(StorageEngine):
+    """Represent a storage engine backed by a SQLite database.
+
+    Every model class has its own table, with one column per id,
+    created_at, updated_at and declared str, int or float class
+    attribute, plus an "extra" column holding the other attributes as
+    JSON. Columns have no declared type, so values come back with the
+    type they were stored with. A field the object never set is NULL,
+    which conditions, sorts and aggregates read as the class default, as
+    FileStorage does. The *_id, created_at, updated_at and latitude
+    columns are indexed.
+
+    The first search() of a class creates an FTS5 table over its
+    SEARCHABLE columns, "<class>_fts", which reads their text from the
+    table of the class and is kept current by triggers on it. Rows are
+    written with INSERT OR REPLACE, so the connection enables recursive
+    triggers for the rows it replaces to be removed from the index.
+
+    Only the objects in use are kept in memory: rows are built on
+    demand, at most once while the object is referenced, and changed
+    objects are held until they are written.
+
+    Attributes:
+        __db_path (str): The database file, from HBNB_SQLITE_PATH.
+        __conn (sqlite3.Connection): The open connection, None until
+            reload().
+        __tables (dict): Class name mapped to the tuple of its columns,
+            for the tables known to exist.
+        __live (weakref.WeakValueDictionary): Key mapped to the object
+            built or created for it.
+        __dirty (dict): Key mapped to the objects created or changed
+            since they were last written to the database.
+        __batches (int): Number of begin() calls not committed yet.
+        __owed (bool): Whether a save() was deferred by a batch.
+    """
+    __db_path = os.getenv("HBNB_SQLITE_PATH", "file.db")
+    __conn = None
+    __tables = {}
+    __live = weakref.WeakValueDictionary()
+    __dirty = {}
+    __batches = 0
+    __owed = False
+
+    def all(self, cls=None):
+        """Return {key: obj} of the stored objects.
+
+        Args:
+            cls (type or str): If given, only return the objects of this
+                class.
+        """
+        if cls is None:
+            names = list(registry)
+        else:
+            names = [self.__cls_name(cls)]
+        objs = {}
+        for cls_name in names:
+            for row in self.__select(cls_name, "", ()):
+                obj = self.__build(cls_name, row)
+                objs["{}.{}".format(cls_name, obj.id)] = obj
+        return objs
+
+    def count(self, cls=None):
+        """Return the number of stored objects, optionally of class cls."""
+        if cls is None:
+            names = list(registry)
+        else:
+            names = [self.__cls_name(cls)]
+        total = 0
+        for cls_name in names:
+            if cls_name in registry:
+                total += self.__query('SELECT COUNT(*) FROM "{}"'.format(
+                    cls_name), (), cls_name).fetchone()[0]
+        return total
+
+    def get(self, cls, id):
+        """Return the object of class cls with the given id, or None.
+
+        Args:
+            cls (type or str): Class of the object.
+            id (str): Id of the object.
+        """
+        cls_name = self.__cls_name(cls)
+        obj = SQLiteStorage.__live.get("{}.{}".format(cls_name, id))
+        if obj is None:
+            for row in self.__select(cls_name, "WHERE id = ?", (id,)):
+                obj = self.__build(cls_name, row)
+        return obj
+
+    def exists(self, cls, id):
+        """Return True if an object of class cls with the given id is
+        stored, without building it.
+
+        Args:
+            cls (type or str): Class of the object.
+            id (str): Id of the object.
+        """
+        cls_name = self.__cls_name(cls)
+        if "{}.{}".format(cls_name, id) in SQLiteStorage.__live:
+            return True
+        if cls_name not in registry:
+            return False
+        return self.__query('SELECT 1 FROM "{}" WHERE id = ?'.format(
+            cls_name), (id,), cls_name).fetchone() is not None
+
+    def children(self, parent_cls, parent_id, child_cls):
+        """Return {key: obj} of the child_cls objects referencing a parent.
+
+        A child references a parent of class Parent through its parent_id
+        attribute.
+
+        Args:
+            parent_cls (type or str): Class of the referenced object.
+            parent_id (str): Id of the referenced object.
+            child_cls (type or str): Class of the referencing objects.
+        """
+        field = self.__cls_name(parent_cls).lower() + "_id"
+        child = self.__cls_name(child_cls)
+        if child not in registry or field not in self.__table(child):
+            return {}
+        objs = {}
+        for row in self.__select(child, "WHERE {} = ?".format(field),
+                                 (parent_id,)):
+            obj = self.__build(child, row)
+            objs["{}.{}".format(child, obj.id)] = obj
+        return objs
+
+    def since(self, ts, cls=None, field="updated_at"):
+        """Return {key: obj} of the objects whose field is at or after ts.
+
+        Timestamps are stored as ISO 8601 text, which sorts like the
+        datetimes it represents.
+
+        Args:
+            ts (datetime or str): Lower bound, see to_datetime().
+            cls (type or str): If given, only return objects of this class.
+            field (str): One of TIMESTAMPS.
+
+        Raises:
+            ValueError: If field is not a timestamp or ts is invalid text.
+        """
+        if field not in TIMESTAMPS:
+            raise ValueError("not a timestamp: {}".format(field))
+        bound = to_datetime(ts).isoformat()
+        if cls is None:
+            names = list(registry)
+        else:
+            names = [self.__cls_name(cls)]
+        found = []
+        for cls_name in names:
+            for row in self.__select(cls_name, "WHERE {} >= ?".format(field),
+                                     (bound,)):
+                found.append((row[field], "{}.{}".format(cls_name, row["id"]),
+                              self.__build(cls_name, row)))
+        found.sort(key=lambda item: item[:2])
+        return {key: obj for value, key, obj in found}
+
+    def nearby(self, lat, lon, radius_km, limit=None, cls="Place"):
+        """Return {key: obj} of the objects within radius_km of a point.
+
+        The rows inside the bounding box of the circle are selected in
+        SQL, then filtered and ordered by their haversine distance.
+
+        Args:
+            lat (float): Latitude of the point, in degrees.
+            lon (float): Longitude of the point, in degrees.
+            radius_km (float): Great-circle radius in kilometres.
+            limit (int): If given, only return the limit nearest objects.
+            cls (type or str): Class of the objects, with latitude and
+                longitude attributes.
+
+        Raises:
+            ValueError: If a coordinate or the radius is out of range.
+        """
+        geo.validate(lat, lon, radius_km)
+        found = []
+        for key, obj in self.bbox(*geo.around(lat, lon, radius_km),
+                                  cls=cls).items():
+            distance = geo.distance_km(lat, lon, obj.latitude, obj.longitude)
+            if distance <= radius_km:
+                found.append((distance, key, obj))
+        found.sort(key=lambda item: item[:2])
+        return {key: obj for distance, key, obj in found[:limit]}
+
+    def bbox(self, south, west, north, east, cls="Place"):
+        """Return {key: obj} of the objects inside a bounding box.
+
+        Args:
+            south, west, north, east (float): Edges of the box in degrees;
+                west greater than east crosses the antimeridian.
+            cls (type or str): Class of the objects, with latitude and
+                longitude attributes.
+
+        Raises:
+            ValueError: If an edge is out of range or south > north.
+        """
+        geo.validate(south, west)
+        geo.validate(north, east)
+        if south > north:
+            raise ValueError("south edge above north edge")
+        cls_name = self.__cls_name(cls)
+        if cls_name not in registry or not {"latitude", "longitude"} <= \
+                set(self.__table(cls_name)):
+            return {}
+        if west > east:
+            longitude = "(longitude >= ? OR longitude <= ?)"
+        else:
+            longitude = "longitude BETWEEN ? AND ?"
+        where = "WHERE latitude BETWEEN ? AND ? AND " + longitude
+        objs = {}
+        for row in self.__select(cls_name, where,
+                                 (south, north, west, east)):
+            obj = self.__build(cls_name, row)
+            if geo.coordinates(obj) is not None:
+                objs["{}.{}".format(cls_name, obj.id)] = obj
+        return objs
+
+    def search(self, cls, terms, limit=None):
+        """Return {key: obj} of the objects matching any word of terms.
+
+        The words are matched and ranked by the bm25() function of FTS5.
+
+        Args:
+            cls (type or str): One of the classes of SEARCHABLE.
+            terms (str): The words to look for.
+            limit (int): If given, only return the limit best objects.
+
+        Raises:
+            ValueError: If cls is not searchable.
+        """
+        cls_name = self.__cls_name(cls)
+        if cls_name not in SEARCHABLE:
+            raise ValueError("not searchable: {}".format(cls_name))
+        words = sorted(set(tokenize(terms)))
+        if not words:
+            return {}
+        fts = self.__fts(cls_name)
+        rows = self.__query(
+            'SELECT "{0}".* FROM "{1}" JOIN "{0}" ON "{0}".rowid = '
+            '"{1}".rowid WHERE "{1}" MATCH ? ORDER BY "{1}".rank, '
+            '"{0}".id LIMIT ?'.format(cls_name, fts),
+            (" OR ".join('"{}"'.format(word) for word in words),
+             -1 if limit is None else limit), cls_name)
+        objs = {}
+        for row in rows:
+            obj = self.__build(cls_name, row)
+            objs["{}.{}".format(cls_name, obj.id)] = obj
+        return objs
+
+    def query(self, cls, conditions=(), order_by=(), limit=None):
+        """Return an iterator over the objects of class cls matching every
+        condition, sorted by order_by, at most limit of them.
+
+        The query runs as one SELECT, so SQLite picks the indexes; rows
+        are built into objects as the iterator reaches them.
+
+        Args:
+            cls (type or str): The model class.
+            conditions (iterable): (field, operator, value) triples; see
+                models/engine/query.py.
+            order_by (iterable): Field names, prefixed with "-" for
+                descending order.
+            limit (int): If given, the most objects to return.
+
+        Raises:
+            KeyError: If a field is not a field of cls.
+            ValueError: If an operator or a value is invalid.
+        """
+        cls_name = self.__cls_name(cls)
+        klass = registry[cls_name]
+        conditions, keys = prepare(klass, conditions, order_by)
+        where = " AND ".join(condition(klass, field, op, value)
+                             for field, op, value in conditions)
+        order = ", ".join(column(klass, field) +
+                          (" DESC" if descending else "")
+                          for field, descending in keys)
+        rows = self.__select(
+            cls_name, "{}{} LIMIT ?".format(
+                "WHERE " + where if where else "",
+                " ORDER BY " + order if order else ""),
+            [value.isoformat() if isinstance(value, datetime) else value
+             for field, op, value in conditions] +
+            [-1 if limit is None else limit])
+        return (self.__build(cls_name, row) for row in rows)
+
+    def columns(self, cls):
+        """Return a SQLiteColumns answering queries over class cls."""
+        cls_name = self.__cls_name(cls)
+        return SQLiteColumns(registry[cls_name],
+                             lambda sql, params: self.__query(sql, params,
+                                                              cls_name))
+
+    def new(self, obj):
+        """Add obj to the objects written by the next save()."""
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        SQLiteStorage.__live[key] = obj
+        SQLiteStorage.__dirty[key] = obj
+
+    def touch(self, obj, name=None):
+        """Mark obj as changed so the next save writes it.
+
+        Args:
+            obj (BaseModel): The changed object.
+            name (str): The assigned attribute, unused.
+        """
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if SQLiteStorage.__live.get(key) is obj:
+            SQLiteStorage.__dirty[key] = obj
+
+    def delete(self, obj=None):
+        """Delete obj from the database if it's inside."""
+        if obj is None:
+            return
+        cls_name = obj.__class__.__name__
+        key = "{}.{}".format(cls_name, obj.id)
+        SQLiteStorage.__live.pop(key, None)
+        SQLiteStorage.__dirty.pop(key, None)
+        self.__query('DELETE FROM "{}" WHERE id = ?'.format(cls_name),
+                     (obj.id,), cls_name)
+
+    def begin(self):
+        """Start a batch: saves are deferred until the matching commit().
+
+        Batches nest; only the outermost commit() writes.
+        """
+        SQLiteStorage.__batches += 1
+
+    def commit(self):
+        """End the innermost batch, saving once if it was the outermost.
+
+        Raises:
+            RuntimeError: If no batch was begun.
+        """
+        if SQLiteStorage.__batches == 0:
+            raise RuntimeError("commit() without begin()")
+        SQLiteStorage.__batches -= 1
+        if SQLiteStorage.__batches == 0:
+            self.flush()
+
+    def flush(self):
+        """Perform the save deferred by a batch, if any."""
+        if SQLiteStorage.__owed:
+            self.save()
+
+    def save(self):
+        """Write the changed objects and commit the transaction."""
+        if SQLiteStorage.__batches:
+            SQLiteStorage.__owed = True
+            return
+        SQLiteStorage.__owed = False
+        self.__write()
+        SQLiteStorage.__conn.commit()
+
+    def reload(self):
+        """Open __db_path, dropping the changes not saved yet."""
+        if SQLiteStorage.__conn is None:
+            SQLiteStorage.__conn = sqlite3.connect(SQLiteStorage.__db_path)
+            SQLiteStorage.__conn.row_factory = sqlite3.Row
+            SQLiteStorage.__conn.execute("PRAGMA recursive_triggers = ON")
+        else:
+            SQLiteStorage.__conn.rollback()
+        SQLiteStorage.__tables = {}
+        SQLiteStorage.__live = weakref.WeakValueDictionary()
+        SQLiteStorage.__dirty = {}
+
+    def close(self):
+        """Close the connection; the next reload() opens it again."""
+        if SQLiteStorage.__conn is not None:
+            SQLiteStorage.__conn.close()
+            SQLiteStorage.__conn = None
+
+    @staticmethod
+    def __cls_name(cls):
+        """Return the class name of cls, which may already be a str."""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __table(self, cls_name):
+        """Create or extend the table of cls_name; return its columns."""
+        columns = SQLiteStorage.__tables.get(cls_name)
+        if columns is not None:
+            return columns
+        columns = ["id", "created_at", "updated_at"]
+        for klass in reversed(registry[cls_name].__mro__):
+            for name, value in vars(klass).items():
+                if (not name.startswith("_") and name not in columns and
+                        type(value) in (str, int, float)):
+                    columns.append(name)
+        conn = SQLiteStorage.__conn
+        conn.execute('CREATE TABLE IF NOT EXISTS "{}" '
+                     '(id TEXT PRIMARY KEY, created_at, updated_at, '
+                     'extra)'.format(cls_name))
+        existing = {row[1] for row in conn.execute(
+            'PRAGMA table_info("{}")'.format(cls_name))}
+        for name in columns:
+            if name not in existing:
+                conn.execute('ALTER TABLE "{}" ADD COLUMN {}'.format(
+                    cls_name, name))
+            if (name.endswith("_id") or name in TIMESTAMPS or
+                    name == "latitude"):
+                conn.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                             'ON "{0}" ({1})'.format(cls_name, name))
+        columns = tuple(columns)
+        SQLiteStorage.__tables[cls_name] = columns
+        return columns
+
+    def __fts(self, cls_name):
+        """Create the FTS5 table of cls_name if needed; return its name.
+
+        The table, its triggers and the initial rebuild are one unit:
+        committed at once when no transaction is open, otherwise part of
+        the open transaction, so they are saved or dropped with the rows
+        it holds. Either way a table never exists without its entries.
+        """
+        self.__table(cls_name)
+        fts = cls_name + "_fts"
+        conn = SQLiteStorage.__conn
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?",
+                        (fts,)).fetchone() is not None:
+            return fts
+        own = not conn.in_transaction
+        if own:
+            conn.execute("BEGIN")
+        fields = SEARCHABLE[cls_name]
+        columns = ", ".join(fields)
+        new = ", ".join("new." + name for name in fields)
+        old = ", ".join("old." + name for name in fields)
+        conn.execute('CREATE VIRTUAL TABLE "{}" USING fts5({}, content="{}", '
+                     'content_rowid="rowid", tokenize="unicode61 '
+                     'remove_diacritics 0")'.format(fts, columns, cls_name))
+        conn.execute('CREATE TRIGGER "{0}_insert" AFTER INSERT ON "{1}" '
+                     'BEGIN INSERT INTO "{0}" (rowid, {2}) VALUES '
+                     '(new.rowid, {3}); END'.format(fts, cls_name, columns,
+                                                    new))
+        conn.execute('CREATE TRIGGER "{0}_delete" AFTER DELETE ON "{1}" '
+                     'BEGIN INSERT INTO "{0}" ("{0}", rowid, {2}) VALUES '
+                     '(\'delete\', old.rowid, {3}); END'.format(
+                         fts, cls_name, columns, old))
+        conn.execute('CREATE TRIGGER "{0}_update" AFTER UPDATE ON "{1}" '
+                     'BEGIN INSERT INTO "{0}" ("{0}", rowid, {2}) VALUES '
+                     '(\'delete\', old.rowid, {3}); INSERT INTO "{0}" '
+                     '(rowid, {2}) VALUES (new.rowid, {4}); END'.format(
+                         fts, cls_name, columns, old, new))
+        conn.execute('INSERT INTO "{0}" ("{0}") VALUES (\'rebuild\')'.format(
+            fts))
+        if own:
+            conn.commit()
+        return fts
+
+    def __query(self, sql, params, cls_name):
+        """Run sql on the table of cls_name once changes are written."""
+        self.__table(cls_name)
+        self.__write()
+        return SQLiteStorage.__conn.execute(sql, params)
+
+    def __select(self, cls_name, where, params):
+        """Return the rows of cls_name matching the where clause."""
+        if cls_name not in registry:
+            return []
+        return self.__query('SELECT * FROM "{}" {}'.format(cls_name, where),
+                            params, cls_name)
+
+    def __write(self):
+        """Write the changed objects into the open transaction."""
+        dirty = SQLiteStorage.__dirty
+        while dirty:
+            key, obj = dirty.popitem()
+            cls_name = key.partition(".")[0]
+            columns = self.__table(cls_name)
+            odict = obj.to_dict()
+            del odict["__class__"]
+            row = []
+            for name in columns:
+                value = odict.get(name)
+                if type(value) in (str, int, float):
+                    del odict[name]
+                    row.append(value)
+                else:
+                    row.append(None)
+            row.append(json.dumps(odict) if odict else None)
+            SQLiteStorage.__conn.execute(
+                'INSERT OR REPLACE INTO "{}" ({}, extra) VALUES ({}?)'.format(
+                    cls_name, ", ".join(columns), "?, " * len(columns)), row)
+
+    def __build(self, cls_name, row):
+        """Return the object of the row, building it if not in use."""
+        key = "{}.{}".format(cls_name, row["id"])
+        obj = SQLiteStorage.__live.get(key)
+        if obj is None:
+            kwargs = {name: row[name] for name in self.__table(cls_name)
+                      if row[name] is not None}
+            if row["extra"] is not None:
+                kwargs.update(json.loads(row["extra"]))
+            obj = registry[cls_name](**kwargs)
+            SQLiteStorage.__live[key] = obj
+        return obj
+
+
+class SQLiteColumns:
+    """Answer the select() and aggregate() queries of ColumnarIndex in SQL.
+
+    Attributes:
+        cls_name (str): Name of the queried class.
+        cls (type): The queried class.
+        numeric (tuple): Fields that can be aggregated.
+        encoded (tuple): Id fields that can only be compared.
+        fields (tuple): Every field a condition can use.
+    """
+
+    def __init__(self, cls, query):
+        """Initialize a new SQLiteColumns.
+
+        Args:
+            cls (type): The model class, whose table is queried.
+            query (callable): Run (sql, params) and return the cursor.
+        """
+        self.cls_name = cls.__name__
+        self.cls = cls
+        self.numeric, self.encoded = classify(cls)
+        self.fields = self.numeric + self.encoded
+        self.__query = query
+
+    def select(self, conditions=()):
+        """Return the keys of the objects matching every condition.
+
+        Args:
+            conditions (iterable): (field, operator, value) triples, where
+                operator is a key of OPERATORS.
+        """
+        where, params = self.__where(conditions)
+        return ["{}.{}".format(self.cls_name, row[0]) for row in
+                self.__query('SELECT id FROM "{}"{}'.format(
+                    self.cls_name, where), params)]
+
+    def aggregate(self, func, field=None, conditions=()):
+        """Aggregate a numeric field over the objects matching conditions.
+
+        Args:
+            func (str): One of AGGREGATES.
+            field (str): Numeric field to aggregate, unused for count.
+            conditions (iterable): (field, operator, value) triples.
+
+        Returns:
+            The count as an int, the other aggregates as a float, or None
+            when no object matches.
+        """
+        if func not in AGGREGATES:
+            raise ValueError("unknown aggregate: {}".format(func))
+        if func == "count":
+            expr = "COUNT(*)"
+        elif field not in self.numeric:
+            raise KeyError(field)
+        else:
+            expr = "{}({})".format(func.upper(), column(self.cls, field))
+        where, params = self.__where(conditions)
+        result = self.__query('SELECT {} FROM "{}"{}'.format(
+            expr, self.cls_name, where), params).fetchone()[0]
+        if func == "count" or result is None:
+            return result
+        return float(result)
+
+    def __where(self, conditions):
+        """Return the WHERE clause and parameters of conditions."""
+        clauses = []
+        params = []
+        for field, op, value in conditions:
+            if field in self.numeric:
+                value = float(value)
+            elif field not in self.encoded:
+                raise KeyError(field)
+            clauses.append(condition(self.cls, field, op, value))
+            params.append(value)
+        if not clauses:
+            return "", params
+        return " WHERE " + " AND ".join(clauses), params
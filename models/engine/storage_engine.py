@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+"""Defines the interface shared by the storage engines."""
+import json
+from datetime import datetime
+from models.base_model import parse_datetime
+
+# Attributes since() can order by.
+TIMESTAMPS = ("created_at", "updated_at")
+
+# Classes search() can query, mapped to the attributes it matches.
+SEARCHABLE = {
+    "Place": ("name", "description"),
+    "Review": ("text",)
+}
+
+
+def to_datetime(ts):
+    """Return ts as a naive datetime in local time, as the models store.
+
+    Args:
+        ts (datetime or str): A datetime or its ISO 8601 text; an aware
+            one is converted to local time.
+
+    Raises:
+        ValueError: If ts is text that is not a timestamp.
+    """
+    if not isinstance(ts, datetime):
+        ts = parse_datetime(ts)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+class StorageEngine:
+    """Base class of a storage engine.
+
+    models.storage is an instance of a subclass; the models and the
+    console only use the methods below. Objects are keyed by
+    "<class name>.<id>" and classes may be given as a type or its name.
+    """
+
+    def all(self, cls=None):
+        """Return {key: obj} of the stored objects, optionally of cls."""
+        raise NotImplementedError
+
+    def count(self, cls=None):
+        """Return the number of stored objects, optionally of cls."""
+        raise NotImplementedError
+
+    def get(self, cls, id):
+        """Return the object of class cls with the given id, or None."""
+        raise NotImplementedError
+
+    def exists(self, cls, id):
+        """Return True if an object of class cls with the given id is stored.
+
+        Engines that can answer without building the object override this.
+        """
+        return self.get(cls, id) is not None
+
+    def since(self, ts, cls=None, field="updated_at"):
+        """Return {key: obj} of the objects whose field is at or after ts.
+
+        The objects are in ascending order of field.
+
+        Args:
+            ts (datetime or str): Lower bound, see to_datetime().
+            cls (type or str): If given, only return objects of this class.
+            field (str): One of TIMESTAMPS.
+        """
+        raise NotImplementedError
+
+    def nearby(self, lat, lon, radius_km, limit=None, cls="Place"):
+        """Return {key: obj} of the objects within radius_km of a point.
+
+        The objects are in ascending order of distance, at most limit of
+        them if given. Only objects with both latitude and longitude set
+        are found.
+        """
+        raise NotImplementedError
+
+    def bbox(self, south, west, north, east, cls="Place"):
+        """Return {key: obj} of the objects inside a bounding box.
+
+        West greater than east means the box crosses the antimeridian.
+        """
+        raise NotImplementedError
+
+    def search(self, cls, terms, limit=None):
+        """Return {key: obj} of the objects matching any word of terms.
+
+        The objects are in descending order of their BM25 score over the
+        SEARCHABLE attributes of cls, at most limit of them if given.
+
+        Raises:
+            ValueError: If cls is not in SEARCHABLE.
+        """
+        raise NotImplementedError
+
+    def query(self, cls, conditions=(), order_by=(), limit=None):
+        """Return an iterator over the objects of class cls matching every
+        condition, sorted by order_by, at most limit of them.
+
+        Args:
+            cls (type or str): The model class.
+            conditions (iterable): (field, operator, value) triples; see
+                models/engine/query.py.
+            order_by (iterable): Field names, prefixed with "-" for
+                descending order.
+            limit (int): If given, the most objects to return.
+
+        Raises:
+            KeyError: If a field is not a field of cls.
+            ValueError: If an operator or a value is invalid.
+        """
+        raise NotImplementedError
+
+    def to_json(self, obj):
+        """Return the JSON text of obj.to_dict(), on one line.
+
+        Engines that keep the encoded record of a stored object override
+        this to reuse it.
+        """
+        return json.dumps(obj.to_dict())
+
+    def new(self, obj):
+        """Add the newly created obj to the store."""
+        raise NotImplementedError
+
+    def touch(self, obj, name=None):
+        """Note that attribute name of obj was assigned.
+
+        Engines that do not track changes can keep this no-op.
+        """
+
+    def delete(self, obj=None):
+        """Remove obj from the store, if it is there."""
+        raise NotImplementedError
+
+    def save(self):
+        """Persist every change made since the last save."""
+        raise NotImplementedError
+
+    def reload(self):
+        """Load the store from its backing file."""
+        raise NotImplementedError
+
+    def begin(self):
+        """Start a batch: saves are deferred until the matching commit()."""
+        raise NotImplementedError
+
+    def commit(self):
+        """End the innermost batch, saving once if it was the outermost.
+
+        Raises:
+            RuntimeError: If no batch was begun.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Wait until every requested save is written.
+
+        Engines that always write synchronously can keep this no-op.
+        """
+
+    def columns(self, cls):
+        """Return an object answering select() and aggregate() queries
+        over class cls, as ColumnarIndex does."""
+        raise NotImplementedError
@@ -5,6 +5,7 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_registry
 """
 import os
 import models
@@ -12,6 +13,7 @@ import unittest
 from datetime import datetime
 from time import sleep
 from models.base_model import BaseModel
+from models.base_model import registry
 
 
 class TestBaseModel_instantiation(unittest.TestCase):
@@ -77,6 +79,17 @@ class TestBaseModel_instantiation(unittest.TestCase):
         with self.assertRaises(TypeError):
             BaseModel(id=None, created_at=None, updated_at=None)
 
+    def test_instantiation_with_kwargs_no_microseconds(self):
+        dt = datetime.today().replace(microsecond=0)
+        dt_iso = dt.isoformat()
+        bm = BaseModel(id="345", created_at=dt_iso, updated_at=dt_iso)
+        self.assertEqual(bm.created_at, dt)
+        self.assertEqual(bm.updated_at, dt)
+
+    def test_instantiation_with_invalid_datetime_kwargs(self):
+        with self.assertRaises(ValueError):
+            BaseModel(id="345", created_at="yesterday", updated_at="today")
+
     def test_instantiation_with_args_and_kwargs(self):
         dt = datetime.today()
         dt_iso = dt.isoformat()
@@ -188,5 +201,32 @@ class TestBaseModel_to_dict(unittest.TestCase):
             bm.to_dict(None)
 
 
+class TestBaseModel_registry(unittest.TestCase):
+    """Unittests for testing the model class registry."""
+
+    def tearDown(self):
+        registry.pop("Plugin", None)
+
+    def test_builtin_models_registered(self):
+        for name in ("BaseModel", "User", "State", "City", "Place",
+                     "Amenity", "Review"):
+            self.assertIn(name, registry)
+        self.assertIs(BaseModel, registry["BaseModel"])
+
+    def test_subclass_registered(self):
+        class Plugin(BaseModel):
+            pass
+        self.assertIs(Plugin, registry["Plugin"])
+
+    def test_plugin_reloaded_from_storage(self):
+        class Plugin(BaseModel):
+            pass
+        pl = Plugin()
+        models.storage.delete(pl)
+        odict = pl.to_dict()
+        del odict["__class__"]
+        self.assertEqual(Plugin, type(registry["Plugin"](**odict)))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/binary_snapshot.py.
+
+Unittest classes:
+    TestBinarySnapshot
+    TestBinarySnapshot_convert
+"""
+import json
+import os
+import tempfile
+import unittest
+from models.engine import binary_snapshot
+from models.engine.binary_snapshot import BinarySnapshot
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """Unittests for testing writing and reading binary snapshots."""
+
+    doc = {
+        "User.3": {"id": "3", "nested": {"a": [1, {"b": None}]}},
+        "BaseModel.1": {"id": "1", "__class__": "BaseModel"},
+        "Place.2": {"id": "2", "name": "Café {loft}, \"big\"",
+                    "amenity_ids": ["a", "b"], "latitude": 9.5,
+                    "__class__": "Place"}
+    }
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "file.hbnb")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, doc):
+        with open(self.path, "wb") as f:
+            binary_snapshot.write(f, ((k, json.dumps(v))
+                                      for k, v in doc.items()))
+        return BinarySnapshot(self.path)
+
+    def test_entries_sorted(self):
+        snapshot = self.write(self.doc)
+        self.addCleanup(snapshot.close)
+        self.assertEqual(3, len(snapshot))
+        keys = [key for key, offset in snapshot.entries()]
+        self.assertEqual(sorted(self.doc), keys)
+
+    def test_load_and_text(self):
+        snapshot = self.write(self.doc)
+        self.addCleanup(snapshot.close)
+        for key, offset in snapshot.entries():
+            self.assertEqual(self.doc[key], snapshot.load(offset))
+            self.assertEqual(json.dumps(self.doc[key]),
+                             snapshot.text(offset))
+
+    def test_find(self):
+        doc = {"User.{:03}".format(i): {"id": str(i)} for i in range(50)}
+        snapshot = self.write(doc)
+        self.addCleanup(snapshot.close)
+        for key, o in doc.items():
+            self.assertEqual(o, snapshot.load(snapshot.find(key)))
+        self.assertIsNone(snapshot.find("User.050"))
+        self.assertIsNone(snapshot.find("Amenity.1"))
+
+    def test_empty(self):
+        snapshot = self.write({})
+        self.addCleanup(snapshot.close)
+        self.assertEqual(0, len(snapshot))
+        self.assertEqual([], list(snapshot.entries()))
+        self.assertIsNone(snapshot.find("User.1"))
+
+    def test_is_binary(self):
+        self.write(self.doc).close()
+        self.assertTrue(binary_snapshot.is_binary(self.path))
+        with open(self.path, "w") as f:
+            json.dump(self.doc, f)
+        self.assertFalse(binary_snapshot.is_binary(self.path))
+
+    def test_not_a_snapshot(self):
+        with open(self.path, "wb") as f:
+            f.write(b"HBNBSNAP" + b"\xff" * 28)
+        with self.assertRaises(ValueError):
+            BinarySnapshot(self.path)
+
+
+class TestBinarySnapshot_convert(unittest.TestCase):
+    """Unittests for testing conversion between the two formats."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmpdir.name, "file.json")
+        self.doc = TestBinarySnapshot.doc
+        with open(self.json_path, "w") as f:
+            json.dump(self.doc, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        binary_path = os.path.join(self.tmpdir.name, "file.hbnb")
+        back_path = os.path.join(self.tmpdir.name, "back.json")
+        binary_snapshot.convert(self.json_path, binary_path)
+        self.assertTrue(binary_snapshot.is_binary(binary_path))
+        binary_snapshot.convert(binary_path, back_path)
+        with open(back_path) as f:
+            self.assertEqual(self.doc, json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/columnar.py.
+
+Unittest classes:
+    TestColumnarIndex
+    TestColumnarIndex_no_numpy
+    TestFileStorage_columns
+"""
+import unittest
+from unittest.mock import patch
+from models import storage
+from models.engine import columnar
+from models.engine.columnar import ColumnarIndex
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+
+
+def make_place(i, **kwargs):
+    """Return a Place with id str(i) built from kwargs."""
+    stamp = "2023-08-11T13:46:34.946290"
+    return Place(id=str(i), created_at=stamp, updated_at=stamp, **kwargs)
+
+
+class TestColumnarIndex(unittest.TestCase):
+    """Unittests for testing the ColumnarIndex class."""
+
+    def setUp(self):
+        self.index = ColumnarIndex(Place)
+        self.index.add("Place.1", make_place(1, max_guest=2,
+                                             price_by_night=50,
+                                             city_id="sf"))
+        self.index.add("Place.2", make_place(2, max_guest=4,
+                                             price_by_night=100,
+                                             city_id="sf"))
+        self.index.add("Place.3", make_place(3, max_guest=6,
+                                             price_by_night=300,
+                                             city_id="la"))
+
+    def test_fields(self):
+        self.assertIn("price_by_night", self.index.numeric)
+        self.assertIn("latitude", self.index.numeric)
+        self.assertNotIn("name", self.index.numeric)
+        self.assertEqual(("city_id", "user_id"), self.index.encoded)
+        self.assertEqual((), ColumnarIndex(City).numeric)
+
+    def test_select(self):
+        self.assertEqual(["Place.1", "Place.2", "Place.3"],
+                         self.index.select())
+        self.assertEqual(["Place.2"], self.index.select(
+            [("city_id", "==", "sf"), ("max_guest", ">=", "4")]))
+        self.assertEqual([], self.index.select([("city_id", "==", "ny")]))
+
+    def test_select_order(self):
+        self.index.add("Place.4", make_place(4, max_guest="many",
+                                             price_by_night=100))
+        self.assertEqual(["Place.1", "Place.2", "Place.4", "Place.3"],
+                         self.index.select(order=("price_by_night", False)))
+        self.assertEqual(["Place.3", "Place.2"], self.index.select(
+            order=("price_by_night", True), limit=2))
+        self.assertEqual(["Place.3", "Place.2", "Place.1", "Place.4"],
+                         self.index.select(order=("max_guest", True)))
+        self.assertEqual(["Place.2"], self.index.select(
+            [("city_id", "==", "sf")], ("max_guest", True), 1))
+        with self.assertRaises(KeyError):
+            self.index.select(order=("name", False))
+
+    def test_select_encoded_order(self):
+        index = ColumnarIndex(Place)
+        for i, city_id in enumerate(("b", "a", "c", "")):
+            index.add("Place.{}".format(i), make_place(i, city_id=city_id))
+        for op, value, expected in (("<", "b", ["Place.1", "Place.3"]),
+                                    ("<=", "b", ["Place.0", "Place.1",
+                                                 "Place.3"]),
+                                    (">", "a", ["Place.0", "Place.2"]),
+                                    (">=", "c", ["Place.2"]),
+                                    ("!=", "a", ["Place.0", "Place.2",
+                                                 "Place.3"]),
+                                    ("==", "", ["Place.3"]),
+                                    ("==", "a", ["Place.1"]),
+                                    ("<", "ab", ["Place.1", "Place.3"])):
+            self.assertEqual(expected, index.select(
+                [("city_id", op, value)]), (op, value))
+        self.assertEqual(2, index.aggregate(
+            "count", None, [("city_id", "<", "b")]))
+
+    def test_aggregate(self):
+        where = [("city_id", "==", "sf")]
+        self.assertEqual(3, self.index.aggregate("count"))
+        self.assertEqual(2, self.index.aggregate("count", None, where))
+        self.assertEqual(75.0, self.index.aggregate("avg", "price_by_night",
+                                                    where))
+        self.assertEqual(450.0, self.index.aggregate("sum", "price_by_night"))
+        self.assertEqual(2.0, self.index.aggregate("min", "max_guest"))
+        self.assertEqual(6.0, self.index.aggregate("max", "max_guest"))
+        self.assertIsNone(self.index.aggregate(
+            "avg", "max_guest", [("max_guest", ">", 10)]))
+
+    def test_aggregate_errors(self):
+        with self.assertRaises(ValueError):
+            self.index.aggregate("median", "max_guest")
+        with self.assertRaises(KeyError):
+            self.index.aggregate("avg", "name")
+        with self.assertRaises(KeyError):
+            self.index.select([("name", "==", "x")])
+
+    def test_add_updates_row(self):
+        self.index.add("Place.1", make_place(1, max_guest=8, city_id="la"))
+        self.assertEqual(3, len(self.index))
+        self.assertEqual(["Place.1", "Place.3"],
+                         self.index.select([("city_id", "==", "la")]))
+
+    def test_non_numeric_value(self):
+        self.index.add("Place.1", make_place(1, max_guest="many"))
+        self.assertEqual(2, self.index.aggregate(
+            "count", None, [("max_guest", ">=", 0)]))
+
+    def test_remove(self):
+        self.index.remove("Place.2")
+        self.index.remove("Place.4")
+        self.assertEqual(2, len(self.index))
+        self.assertEqual(["Place.1"],
+                         self.index.select([("city_id", "==", "sf")]))
+
+    def test_remove_compacts(self):
+        for i in range(4, 3000):
+            self.index.add("Place.{}".format(i), make_place(i, max_guest=i))
+        for i in range(4, 2990):
+            self.index.remove("Place.{}".format(i))
+        self.assertEqual(13, len(self.index))
+        self.assertEqual(2999.0, self.index.aggregate("max", "max_guest"))
+        self.assertEqual(["Place.3"], self.index.select(
+            [("city_id", "==", "la")]))
+
+
+class TestColumnarIndex_no_numpy(TestColumnarIndex):
+    """Unittests for testing ColumnarIndex with the stdlib fallback."""
+
+    def setUp(self):
+        patcher = patch.object(columnar, "numpy", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+class TestFileStorage_columns(unittest.TestCase):
+    """Unittests for testing the columnar mirror kept by FileStorage."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_columns_follow_storage(self):
+        pl1 = Place()
+        pl1.price_by_night = 80
+        columns = storage.columns(Place)
+        self.assertIs(columns, storage.columns("Place"))
+        pl2 = Place()
+        pl2.price_by_night = 120
+        self.assertEqual(100.0, columns.aggregate("avg", "price_by_night"))
+        storage.delete(pl1)
+        self.assertEqual(120.0, columns.aggregate("avg", "price_by_night"))
+
+    def test_columns_rebuilt_when_objects_replaced(self):
+        Place()
+        columns = storage.columns(Place)
+        FileStorage._FileStorage__objects = {}
+        Place()
+        Place()
+        self.assertEqual(2, columns.aggregate("count"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""Defines unittests for models/compact.py.
+
+Unittest classes:
+    TestCompact
+"""
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from models import storage
+from models.base_model import registry
+from models.compact import compact
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from console import HBNBCommand
+
+
+class TestCompact(unittest.TestCase):
+    """Unittests for testing compact model variants."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.cls = compact(Place)
+
+    def tearDown(self):
+        registry["Place"] = Place
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_variant_registered(self):
+        self.assertIs(self.cls, registry["Place"])
+        self.assertEqual("Place", self.cls.__name__)
+        self.assertTrue(issubclass(self.cls, Place))
+        self.assertIs(self.cls, compact(self.cls))
+
+    def test_declared_fields_in_slots(self):
+        pl = self.cls()
+        pl.name = "Loft"
+        self.assertIn("name", self.cls.__slots__)
+        self.assertEqual({}, pl.__dict__)
+        self.assertEqual("Loft", pl.name)
+
+    def test_unset_fields_use_class_defaults(self):
+        pl = self.cls()
+        self.assertEqual("", pl.city_id)
+        self.assertEqual(0, pl.max_guest)
+        self.assertEqual([], pl.amenity_ids)
+        with self.assertRaises(AttributeError):
+            pl.unknown
+
+    def test_overflow_attributes(self):
+        pl = self.cls()
+        pl.color = "blue"
+        self.assertEqual({"color": "blue"}, pl.__dict__)
+        self.assertEqual("blue", pl.to_dict()["color"])
+
+    def test_matches_regular_representation(self):
+        odict = {"id": "1", "created_at": "2023-08-11T13:46:34.946290",
+                 "updated_at": "2023-08-11T13:46:34.946302",
+                 "name": "Loft", "max_guest": 4, "color": "blue"}
+        regular = Place(**odict)
+        pl = self.cls(**odict)
+        self.assertEqual(regular.to_dict(), pl.to_dict())
+        self.assertEqual(str(regular), str(pl))
+
+    def test_new_instance_stored(self):
+        pl = self.cls()
+        self.assertIs(pl, storage.get(Place, pl.id))
+
+    def test_console_create_and_update(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        HBNBCommand().onecmd("update Place {} max_guest 5".format(testId))
+        HBNBCommand().onecmd("Place.update({}, {{'latitude': '9.5', "
+                             "'color': 'blue'}})".format(testId))
+        pl = storage.get(Place, testId)
+        self.assertIs(self.cls, type(pl))
+        self.assertEqual(5, pl.max_guest)
+        self.assertEqual(9.5, pl.latitude)
+        self.assertEqual("blue", pl.color)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,11 +10,22 @@ Unittest classes:
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_count
+    TestHBNBCommand_stats
+    TestHBNBCommand_since
+    TestHBNBCommand_nearby
+    TestHBNBCommand_search
+    TestHBNBCommand_query
+    TestHBNBCommand_output
+    TestHBNBCommand_batch
 """
+import json
 import os
 import sys
 import unittest
 from models import storage
+from models.base_model import BaseModel
+from models.base_model import registry
 from models.engine.file_storage import FileStorage
 from console import HBNBCommand
 from io import StringIO
@@ -71,10 +82,12 @@ class TestHBNBCommand_help(unittest.TestCase):
             self.assertEqual(h, output.getvalue().strip())
 
     def test_help_all(self):
-        h = ("Usage: all or all <class> or <class>.all()\n        "
+        h = ("Usage: all [<class>] [--page-size <n>] [--page <n>] or\n"
+             "       <class>.all([--page-size <n>] [--page <n>])\n        "
              "Display string representations of all instances of a given class"
              ".\n        If no class is specified, displays all instantiated "
-             "objects.")
+             "objects.\n        With --page-size, only display the given page "
+             "of n instances\n        (the first by default).")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help all"))
             self.assertEqual(h, output.getvalue().strip())
@@ -99,7 +112,9 @@ class TestHBNBCommand_help(unittest.TestCase):
     def test_help(self):
         h = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  begin   count   destroy  nearby  query  search  since  "
+             "update\nall  commit  create  help     output  quit   show    "
+             "stats")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(h, output.getvalue().strip())
@@ -116,6 +131,14 @@ class TestHBNBCommand_exit(unittest.TestCase):
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertTrue(HBNBCommand().onecmd("EOF"))
 
+    def test_exit_flushes_storage(self):
+        for command, printed in (("quit", ""), ("EOF", "\n")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                with patch.object(storage, "flush") as flush:
+                    self.assertTrue(HBNBCommand().onecmd(command))
+                    flush.assert_called_once_with()
+                self.assertEqual(printed, output.getvalue())
+
 
 class TestHBNBCommand_create(unittest.TestCase):
     """Unittests for testing create from the HBNB command interpreter."""
@@ -198,6 +221,18 @@ class TestHBNBCommand_create(unittest.TestCase):
             testKey = "Review.{}".format(output.getvalue().strip())
             self.assertIn(testKey, storage.all().keys())
 
+    def test_create_registered_plugin(self):
+        class Plugin(BaseModel):
+            pass
+        try:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("create Plugin"))
+                testKey = "Plugin.{}".format(output.getvalue().strip())
+                self.assertIs(Plugin, type(storage.all()[testKey]))
+        finally:
+            registry.pop("Plugin")
+            storage.delete(storage.all().get(testKey))
+
 
 class TestHBNBCommand_show(unittest.TestCase):
     """Unittests for testing show from the HBNB command interpreter"""
@@ -451,6 +486,16 @@ class TestHBNBCommand_show(unittest.TestCase):
             self.assertFalse(HBNBCommand().onecmd(command))
             self.assertEqual(obj.__str__(), output.getvalue().strip())
 
+    def test_show_looks_up_once(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create User")
+            testID = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()):
+            with patch.object(storage, "get", wraps=storage.get) as get:
+                self.assertFalse(HBNBCommand().onecmd(
+                    "show User {}".format(testID)))
+        get.assert_called_once_with("User", testID)
+
 
 class TestHBNBCommand_destroy(unittest.TestCase):
     """Unittests for testing destroy from the HBNB command interpreter."""
@@ -705,6 +750,17 @@ class TestHBNBCommand_destroy(unittest.TestCase):
             self.assertFalse(HBNBCommand().onecmd(command))
             self.assertNotIn(obj, storage.all())
 
+    def test_destroy_looks_up_once(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create User")
+            testID = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()):
+            with patch.object(storage, "get", wraps=storage.get) as get:
+                self.assertFalse(HBNBCommand().onecmd(
+                    "destroy User {}".format(testID)))
+        get.assert_called_once_with("User", testID)
+        self.assertFalse(storage.exists("User", testID))
+
 
 class TestHBNBCommand_all(unittest.TestCase):
     """Unittests for testing all of the HBNB command interpreter."""
@@ -851,6 +907,73 @@ class TestHBNBCommand_all(unittest.TestCase):
             self.assertIn("Review", output.getvalue().strip())
             self.assertNotIn("BaseModel", output.getvalue().strip())
 
+    def test_all_streams_in_chunks(self):
+        for i in range(50):
+            BaseModel()
+        storage.save()
+        expected = str([obj.__str__() for obj in storage.all(
+            BaseModel).values()]) + "\n"
+        with patch("console.CHUNK_SIZE", 500):
+            with patch("sys.stdout", new=StringIO()) as output:
+                with patch.object(output, "write",
+                                  wraps=output.write) as write:
+                    self.assertFalse(HBNBCommand().onecmd("all BaseModel"))
+        self.assertEqual(expected, output.getvalue())
+        self.assertGreater(write.call_count, 10)
+
+    def test_all_pages(self):
+        for i in range(5):
+            BaseModel()
+        storage.save()
+        strs = [obj.__str__() for obj in storage.all(BaseModel).values()]
+        for arg, page in (("--page-size 2", strs[:2]),
+                          ("--page-size 2 --page 3", strs[4:6]),
+                          ("--page 2 --page-size=2", strs[2:4]),
+                          ("--page-size 2 --page 9", [])):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(
+                    "all BaseModel {}".format(arg)))
+                self.assertEqual(str(page), output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "BaseModel.all(--page-size 3, --page 2)"))
+            self.assertEqual(str(strs[3:6]), output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all --page-size 1"))
+            self.assertEqual(1, output.getvalue().count("] ("))
+        for arg, correct in (("--page-size 0", "** invalid page size **"),
+                             ("--page x", "** invalid page **"),
+                             ("--page-size", "** invalid page size **")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(
+                    "all BaseModel {}".format(arg)))
+                self.assertEqual(correct, output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all MyModel --page 1"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_all_sharded_reads_one_shard(self):
+        FileStorage._FileStorage__sharded = True
+        try:
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create State")
+                HBNBCommand().onecmd("create User")
+                id = output.getvalue().split()[0]
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("State.all()"))
+                self.assertIn(id, output.getvalue())
+            self.assertIn("User", FileStorage._FileStorage__unloaded)
+            self.assertNotIn("State", FileStorage._FileStorage__unloaded)
+        finally:
+            FileStorage._FileStorage__sharded = False
+            FileStorage._FileStorage__unloaded = set()
+            FileStorage._FileStorage__objects = {}
+            for cls_name in ("State", "User"):
+                os.remove("file.{}.json".format(cls_name))
+
 
 class TestHBNBCommand_update(unittest.TestCase):
     """Unittests for testing update from the HBNB command interpreter."""
@@ -1490,6 +1613,29 @@ class TestHBNBCommand_update(unittest.TestCase):
         test_dict = storage.all()["Place.{}".format(testId)].__dict__
         self.assertEqual(9.8, test_dict["latitude"])
 
+    def test_update_read_only_attribute(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        place = storage.get("Place", testId)
+        for testCmd, name in (
+                ("update Place {} __class__ Foo", "__class__"),
+                ("update Place {} id 1234", "id"),
+                ("update Place {} created_at now", "created_at"),
+                ("Place.update({}, updated_at, now)", "updated_at"),
+                ("Place.update({}, {{'name': 'x', '__dict__': 1}})",
+                 "__dict__"),
+                ("Place.update({}, {{5: 'x'}})", "5")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(
+                    testCmd.format(testId)))
+                self.assertEqual(
+                    "** attribute can't be updated: {} **".format(name),
+                    output.getvalue().strip())
+        self.assertIs(place, storage.get("Place", testId))
+        self.assertEqual("Place", type(place).__name__)
+        self.assertEqual("", place.name)
+
     def test_update_valid_dictionary_with_float_dot_notation(self):
         with patch("sys.stdout", new=StringIO()) as output:
             HBNBCommand().onecmd("create Place")
@@ -1500,6 +1646,15 @@ class TestHBNBCommand_update(unittest.TestCase):
         test_dict = storage.all()["Place.{}".format(testId)].__dict__
         self.assertEqual(9.8, test_dict["latitude"])
 
+    def test_update_looks_up_once(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        with patch.object(storage, "get", wraps=storage.get) as get:
+            HBNBCommand().onecmd("update Place {} max_guest 4".format(testId))
+        get.assert_called_once_with("Place", testId)
+        self.assertEqual(4, storage.get("Place", testId).max_guest)
+
 
 class TestHBNBCommand_count(unittest.TestCase):
     """Unittests for testing count method of HBNB comand interpreter."""
@@ -1566,5 +1721,661 @@ class TestHBNBCommand_count(unittest.TestCase):
             self.assertEqual("1", output.getvalue().strip())
 
 
+class TestHBNBCommand_stats(unittest.TestCase):
+    """Unittests for testing stats method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def create_places(self):
+        for guests, price in ((2, 50), (4, 100), (6, 300)):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create Place")
+                testId = output.getvalue().strip()
+            HBNBCommand().onecmd("update Place {} max_guest {}".format(
+                testId, guests))
+            HBNBCommand().onecmd("update Place {} price_by_night {}".format(
+                testId, price))
+            HBNBCommand().onecmd("update Place {} city_id {}".format(
+                testId, "sf" if guests < 6 else "la"))
+
+    def test_stats_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_stats_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats MyModel count"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_stats_missing_aggregate(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats Place"))
+            self.assertEqual("** aggregate missing **",
+                             output.getvalue().strip())
+
+    def test_stats_invalid_aggregate(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats Place median"))
+            self.assertEqual("** aggregate doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_stats_missing_attribute(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats Place avg"))
+            self.assertEqual("** attribute name missing **",
+                             output.getvalue().strip())
+
+    def test_stats_invalid_attribute(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats Place avg name"))
+            self.assertEqual("** attribute doesn't exist: name **",
+                             output.getvalue().strip())
+
+    def test_stats_space_notation(self):
+        self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("stats Place count")
+            self.assertEqual("3", output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("stats Place avg price_by_night "
+                                 "city_id==sf max_guest>=4")
+            self.assertEqual("100.0", output.getvalue().strip())
+
+    def test_stats_dot_notation(self):
+        self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("Place.stats(max, price_by_night, "
+                                 "city_id==sf)")
+            self.assertEqual("100.0", output.getvalue().strip())
+
+    def test_stats_no_match(self):
+        self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("stats Place min price_by_night "
+                                 "max_guest>10")
+            self.assertEqual("** no instance found **",
+                             output.getvalue().strip())
+
+
+class TestHBNBCommand_since(unittest.TestCase):
+    """Unittests for testing since method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def create_users(self):
+        for i in range(3):
+            storage.new(registry["User"](
+                id=str(i), created_at="2023-08-11T10:00:00",
+                updated_at="2023-08-2{}T10:00:00".format(i)))
+
+    def test_since_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("since"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_since_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.since(2023)"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_since_missing_timestamp(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("User.since()"))
+            self.assertEqual("** timestamp missing **",
+                             output.getvalue().strip())
+
+    def test_since_invalid_timestamp(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("since User yesterday"))
+            self.assertEqual("** invalid timestamp **",
+                             output.getvalue().strip())
+
+    def test_since_space_notation(self):
+        self.create_users()
+        objs = storage.all("User")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "since User 2023-08-21T10:00:00"))
+            self.assertEqual(str([str(objs["User.1"]), str(objs["User.2"])]),
+                             output.getvalue().strip())
+
+    def test_since_dot_notation(self):
+        self.create_users()
+        objs = storage.all("User")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "User.since(2023-08-22T00:00:00)"))
+            self.assertEqual(str([str(objs["User.2"])]),
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("State.since(2023-08-01)"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+
+class TestHBNBCommand_nearby(unittest.TestCase):
+    """Unittests for testing nearby method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def create_places(self):
+        places = []
+        for lat, lon in ((37.80, -122.27), (37.77, -122.41), (34.05, -118.24)):
+            pl = registry["Place"]()
+            pl.latitude = lat
+            pl.longitude = lon
+            places.append(str(pl))
+        return places
+
+    def test_nearby_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("nearby"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_nearby_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.nearby(1, 2, 3)"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_nearby_missing_arguments(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("nearby Place 37.7"))
+            self.assertEqual("** coordinates missing **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.nearby(37.7, -122)"))
+            self.assertEqual("** radius missing **",
+                             output.getvalue().strip())
+
+    def test_nearby_invalid_arguments(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("nearby Place a -122 5"))
+            self.assertEqual("** value must be a number **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("nearby Place 95 -122 5"))
+            self.assertEqual("** value out of range **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "nearby Place 37 -122 5 -1"))
+            self.assertEqual("** value out of range **",
+                             output.getvalue().strip())
+
+    def test_nearby_space_notation(self):
+        places = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "nearby Place 37.77 -122.41 20"))
+            self.assertEqual(str([places[1], places[0]]),
+                             output.getvalue().strip())
+
+    def test_nearby_dot_notation(self):
+        places = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.nearby(34, -118, 1000, 2)"))
+            self.assertEqual(str([places[2], places[0]]),
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("User.nearby(34, -118, 5)"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+    def test_nearby_limit_zero(self):
+        for i in range(400):
+            pl = registry["Place"]()
+            pl.latitude = 37.77 + i // 20 / 100
+            pl.longitude = -122.41 + i % 20 / 100
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.nearby(37.8, -122.3, 2, 0)"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+
+class TestHBNBCommand_search(unittest.TestCase):
+    """Unittests for testing search method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        for index in FileStorage._FileStorage__texts.values():
+            FileStorage._FileStorage__indexes[index.cls_name].remove(index)
+        FileStorage._FileStorage__texts = {}
+        for path in ("file.json", "file.json.Place.fts"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def create_places(self):
+        places = []
+        for name, description in (("Loft", "Bright loft with a pool"),
+                                  ("Cabin", "Quiet cabin, pool and pool "
+                                            "table"),
+                                  ("Studio", "Small studio downtown")):
+            pl = registry["Place"]()
+            pl.name = name
+            pl.description = description
+            places.append(pl)
+        return places
+
+    def test_search_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_search_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.search(pool)"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_search_missing_terms(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Place"))
+            self.assertEqual("** search terms missing **",
+                             output.getvalue().strip())
+
+    def test_search_not_searchable(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search User pool"))
+            self.assertEqual("** class not searchable **",
+                             output.getvalue().strip())
+
+    def test_search_space_notation(self):
+        places = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Place pool"))
+            self.assertEqual(str([str(places[1]), str(places[0])]),
+                             output.getvalue().strip())
+
+    def test_search_dot_notation(self):
+        places = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.search("downtown studio")'))
+            self.assertEqual(str([str(places[2])]),
+                             output.getvalue().strip())
+
+    def test_search_after_update_and_destroy(self):
+        places = self.create_places()
+        HBNBCommand().onecmd("search Place pool")
+        HBNBCommand().onecmd('update Place {} description "Big pool"'.format(
+            places[2].id))
+        HBNBCommand().onecmd("destroy Place {}".format(places[1].id))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Place pool"))
+            self.assertEqual(str([str(places[2]), str(places[0])]),
+                             output.getvalue().strip())
+
+
+class TestHBNBCommand_query(unittest.TestCase):
+    """Unittests for testing query method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def create_places(self):
+        places = []
+        for price, guests, name in ((80, 2, "Loft"), (150, 4, "Cabin"),
+                                    (60, 1, "Studio"), (95, 3, "Big, loft")):
+            pl = registry["Place"]()
+            pl.price_by_night = price
+            pl.max_guest = guests
+            pl.name = name
+            places.append(str(pl))
+        return places
+
+    def test_query_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("query"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_query_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.where(a==1)"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_query_invalid_syntax(self):
+        for chain, part in (("where(a=1).sort_by(a)", "sort_by(a)"),
+                            ("where(a)", "a"), ("limit(-1)", "limit(-1)"),
+                            ("where(a==1) limit(2)", "limit(2)"),
+                            ("order_by(a b)", "a b")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(
+                    "query Place " + chain))
+                self.assertEqual("** invalid query: {} **".format(part),
+                                 output.getvalue().strip())
+
+    def test_query_invalid_attribute(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.where(price<100)"))
+            self.assertEqual("** attribute doesn't exist: price **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.order_by(-price)"))
+            self.assertEqual("** attribute doesn't exist: price **",
+                             output.getvalue().strip())
+
+    def test_query_invalid_value(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.where(max_guest>=two)"))
+            self.assertEqual("** invalid value **",
+                             output.getvalue().strip())
+
+    def test_query_dot_notation(self):
+        places = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.where(price_by_night<100, max_guest>=2)"
+                ".order_by(price_by_night).limit(20)"))
+            self.assertEqual(str([places[0], places[3]]),
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.order_by(-price_by_night).limit(2)"))
+            self.assertEqual(str([places[1], places[3]]),
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.limit(0)"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+    def test_query_space_notation(self):
+        places = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'query Place where(name == "Big, loft")'))
+            self.assertEqual(str([places[3]]), output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("query Place"))
+            self.assertEqual(str(places), output.getvalue().strip())
+
+
+class TestHBNBCommand_output(unittest.TestCase):
+    """Unittests for testing the json output mode of the HBNB command
+    interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def json_console(self):
+        """Return a console switched to the json output mode."""
+        console = HBNBCommand()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("output json"))
+            self.assertEqual("", output.getvalue())
+        return console
+
+    def create_places(self):
+        """Create and save three places, and return them."""
+        places = []
+        for name, price in (("Loft", 80), ("Cabin", 150), ("Studio", 60)):
+            pl = registry["Place"]()
+            pl.name = name
+            pl.price_by_night = price
+            places.append(pl)
+        storage.save()
+        return places
+
+    def lines(self, output):
+        """Return the JSON documents printed to output, one per line."""
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_output_mode(self):
+        console = HBNBCommand()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("output"))
+            self.assertEqual("text", output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("output xml"))
+            self.assertEqual("** output mode doesn't exist **",
+                             output.getvalue().strip())
+        console.onecmd("output json")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("output"))
+            self.assertEqual("json", output.getvalue().strip())
+        self.assertEqual("text", HBNBCommand().output)
+        console.onecmd("output text")
+        self.assertEqual("text", console.output)
+
+    def test_show(self):
+        pl = self.create_places()[0]
+        console = self.json_console()
+        for command in ("show Place {}", "Place.show({})"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(console.onecmd(command.format(pl.id)))
+                self.assertEqual([pl.to_dict()], self.lines(output))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("show Place 1234"))
+            self.assertEqual("** no instance found **",
+                             output.getvalue().strip())
+
+    def test_all(self):
+        places = self.create_places()
+        console = self.json_console()
+        for command in ("all Place", "Place.all()"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(console.onecmd(command))
+                self.assertEqual([pl.to_dict() for pl in places],
+                                 self.lines(output))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("all Place --page-size 2 "
+                                            "--page 2"))
+            self.assertEqual([places[2].to_dict()], self.lines(output))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("all Place --page 2"))
+            self.assertEqual("", output.getvalue())
+
+    def test_count(self):
+        self.create_places()
+        console = self.json_console()
+        for command in ("count Place", "Place.count()"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(console.onecmd(command))
+                self.assertEqual([{"count": 3}], self.lines(output))
+
+    def test_listing_commands(self):
+        places = self.create_places()
+        console = self.json_console()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd(
+                "Place.where(price_by_night<100).order_by(price_by_night)"))
+            self.assertEqual([places[2].to_dict(), places[0].to_dict()],
+                             self.lines(output))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd(
+                'Place.since("{}")'.format(places[1].updated_at.isoformat())))
+            self.assertEqual([pl.to_dict() for pl in places[1:]],
+                             self.lines(output))
+
+    def test_reuses_saved_records(self):
+        places = self.create_places()
+        console = self.json_console()
+        serializer = FileStorage._FileStorage__serializer
+        with patch.object(serializer, "dumps") as dumps:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(console.onecmd("all Place"))
+        dumps.assert_not_called()
+        self.assertEqual(len(places), len(self.lines(output)))
+
+
+class TestHBNBCommand_batch(unittest.TestCase):
+    """Unittests for testing begin and commit of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__batches = 0
+        FileStorage._FileStorage__owed = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_commit_without_begin(self):
+        correct = "** no batch in progress **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("commit"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_batch_writes_once_on_commit(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("begin"))
+            for i in range(3):
+                self.assertFalse(HBNBCommand().onecmd("create User"))
+            ids = output.getvalue().split()
+        self.assertFalse(os.path.exists("file.json"))
+        with patch("models.engine.file_storage.FileStorage.compact",
+                   autospec=True,
+                   side_effect=FileStorage.compact) as compact:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("commit"))
+                self.assertEqual("", output.getvalue())
+        self.assertEqual(1, compact.call_count)
+        with open("file.json") as f:
+            text = f.read()
+        for id in ids:
+            self.assertIn("User." + id, text)
+
+    def test_batch_update_and_destroy(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create State")
+            id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("begin")
+            HBNBCommand().onecmd("State.update({}, name, Texas)".format(id))
+            HBNBCommand().onecmd("create City")
+            HBNBCommand().onecmd("destroy State {}".format(id))
+        with open("file.json") as f:
+            self.assertIn("State." + id, f.read())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("commit")
+        with open("file.json") as f:
+            text = f.read()
+        self.assertNotIn("State." + id, text)
+        self.assertIn("City.", text)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,1692 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/file_storage.py.
+
+Unittest classes:
+    TestFileStorage_instantiation
+    TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_dirty_tracking
+    TestFileStorage_class_index
+    TestFileStorage_children
+    TestFileStorage_lazy
+    TestFileStorage_atomic_save
+    TestFileStorage_group_commit
+    TestFileStorage_async
+    TestFileStorage_binary
+    TestFileStorage_sharded
+    TestFileStorage_parallel_load
+    TestFileStorage_since
+    TestFileStorage_geo
+    TestFileStorage_search
+    TestFileStorage_query
+"""
+import os
+import glob
+import json
+import models
+import random
+import threading
+import time
+import unittest
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import patch
+from models.engine import fulltext
+from models.engine import parallel_load
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.review import Review
+
+
+class TestFileStorage_instantiation(unittest.TestCase):
+    """Unittests for testing instantiation of the FileStorage class."""
+
+    def test_FileStorage_instantiation_no_args(self):
+        self.assertEqual(type(FileStorage()), FileStorage)
+
+    def test_FileStorage_instantiation_with_arg(self):
+        with self.assertRaises(TypeError):
+            FileStorage(None)
+
+    def test_FileStorage_file_path_is_private_str(self):
+        self.assertEqual(str, type(FileStorage._FileStorage__file_path))
+
+    def test_FileStorage_objects_is_private_dict(self):
+        self.assertEqual(dict, type(FileStorage._FileStorage__objects))
+
+    def test_storage_initializes(self):
+        self.assertEqual(type(models.storage), FileStorage)
+
+
+class TestFileStorage_methods(unittest.TestCase):
+    """Unittests for testing methods of the FileStorage class."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_all(self):
+        self.assertEqual(dict, type(models.storage.all()))
+
+    def test_all_is_a_copy(self):
+        us = User()
+        del models.storage.all()["User." + us.id]
+        models.storage.all().clear()
+        self.assertIs(us, models.storage.get(User, us.id))
+        self.assertEqual(1, models.storage.count(User))
+        self.assertIn("User." + us.id, models.storage.all())
+
+    def test_new(self):
+        bm = BaseModel()
+        us = User()
+        self.assertIn("BaseModel." + bm.id, models.storage.all().keys())
+        self.assertIn(us, models.storage.all().values())
+
+    def test_new_with_None(self):
+        with self.assertRaises(AttributeError):
+            models.storage.new(None)
+
+    def test_delete(self):
+        bm = BaseModel()
+        models.storage.delete(bm)
+        self.assertNotIn("BaseModel." + bm.id, models.storage.all())
+
+    def test_delete_None(self):
+        models.storage.delete(None)
+
+    def test_save(self):
+        bm = BaseModel()
+        pl = Place()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            save_text = f.read()
+            self.assertIn("BaseModel." + bm.id, save_text)
+            self.assertIn("Place." + pl.id, save_text)
+
+    def test_reload(self):
+        bm = BaseModel()
+        pl = Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = FileStorage._FileStorage__objects
+        self.assertIn("BaseModel." + bm.id, objs)
+        self.assertIn("Place." + pl.id, objs)
+
+    def test_get(self):
+        us = User()
+        self.assertIs(us, models.storage.get(User, us.id))
+        self.assertIs(us, models.storage.get("User", us.id))
+        self.assertIsNone(models.storage.get(Place, us.id))
+        self.assertIsNone(models.storage.get(User, "1234"))
+
+    def test_exists(self):
+        us = User()
+        self.assertTrue(models.storage.exists(User, us.id))
+        self.assertTrue(models.storage.exists("User", us.id))
+        self.assertFalse(models.storage.exists(Place, us.id))
+        self.assertFalse(models.storage.exists("NoClass", us.id))
+        models.storage.delete(us)
+        self.assertFalse(models.storage.exists(User, us.id))
+        self.assertIsNone(models.storage.get(User, us.id))
+
+    def test_get_after_objects_replaced(self):
+        us = User()
+        FileStorage._FileStorage__objects = {"User." + us.id: us}
+        self.assertIs(us, models.storage.get(User, us.id))
+        FileStorage._FileStorage__objects = {}
+        self.assertIsNone(models.storage.get(User, us.id))
+
+    def test_to_json(self):
+        pl = Place()
+        pl.name = "Loft"
+        serializer = FileStorage._FileStorage__serializer
+        with patch.object(serializer, "dumps",
+                          wraps=serializer.dumps) as dumps:
+            text = models.storage.to_json(pl)
+            self.assertEqual(pl.to_dict(), json.loads(text))
+            self.assertNotIn("\n", text)
+            models.storage.save()
+            self.assertEqual(text, models.storage.to_json(pl))
+            self.assertEqual(1, dumps.call_count)
+            pl.name = "Cabin"
+            self.assertEqual("Cabin", json.loads(
+                models.storage.to_json(pl))["name"])
+            self.assertEqual(2, dumps.call_count)
+        unstored = Place(id="1", created_at="2024-01-01T00:00:00",
+                         updated_at="2024-01-01T00:00:00")
+        self.assertEqual(unstored.to_dict(),
+                         json.loads(models.storage.to_json(unstored)))
+
+    def test_reload_no_file(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual({}, models.storage.all())
+
+
+class TestFileStorage_journal(unittest.TestCase):
+    """Unittests for testing the append-only journal of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = {}
+        FileStorage._FileStorage__journal = True
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__log_limit = 4 * 1024 * 1024
+        for path in ("file.json", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_appends_to_log(self):
+        bm = BaseModel()
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        with open("file.json.log", "r") as f:
+            rec = json.loads(f.readline())
+        self.assertEqual("BaseModel." + bm.id, rec["key"])
+        self.assertEqual(bm.id, rec["obj"]["id"])
+
+    def test_save_only_logs_pending(self):
+        BaseModel()
+        models.storage.save()
+        us = User()
+        models.storage.save()
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(2, len(lines))
+        self.assertIn(us.id, lines[1])
+
+    def test_reload_replays_log(self):
+        bm = BaseModel()
+        us = User()
+        models.storage.save()
+        bm.name = "Betty"
+        bm.save()
+        models.storage.delete(us)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual("Betty", objs["BaseModel." + bm.id].name)
+        self.assertNotIn("User." + us.id, objs)
+
+    def test_reload_ignores_torn_tail(self):
+        bm = BaseModel()
+        models.storage.save()
+        with open("file.json.log", "a") as f:
+            f.write('{"key": "User.1", "obj": {"id"')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("BaseModel." + bm.id, models.storage.all())
+        self.assertNotIn("User.1", models.storage.all())
+
+    def test_append_after_torn_tail(self):
+        bm = BaseModel()
+        models.storage.save()
+        with open("file.json.log", "a") as f:
+            f.write('{"key": "User.1", "obj": {"id"')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("BaseModel." + bm.id, models.storage.all())
+        self.assertIn("User." + us.id, models.storage.all())
+        with open("file.json.log", "r") as f:
+            self.assertEqual(2, len(f.readlines()))
+
+    def test_compaction(self):
+        FileStorage._FileStorage__log_limit = 0
+        bm = BaseModel()
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, f.read())
+
+
+class TestFileStorage_dirty_tracking(unittest.TestCase):
+    """Unittests for testing dirty tracking and the fragment cache."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_snapshot_matches_json_dump(self):
+        bm = BaseModel()
+        us = User()
+        us.first_name = "Betty"
+        models.storage.save()
+        us.last_name = "Holberton"
+        models.storage.save()
+        expected = json.dumps({"BaseModel." + bm.id: bm.to_dict(),
+                               "User." + us.id: us.to_dict()})
+        with open("file.json", "r") as f:
+            self.assertEqual(expected, f.read())
+
+    def test_empty_snapshot(self):
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual("{}", f.read())
+
+    def test_save_encodes_only_changed_objects(self):
+        bm = BaseModel()
+        pl = Place()
+        models.storage.save()
+        with patch.object(BaseModel, "to_dict", wraps=bm.to_dict) as td:
+            models.storage.save()
+            self.assertEqual(0, td.call_count)
+        pl.name = "Loft"
+        with patch.object(Place, "to_dict", wraps=pl.to_dict) as td:
+            models.storage.save()
+            self.assertEqual(1, td.call_count)
+        with open("file.json", "r") as f:
+            self.assertIn('"name": "Loft"', f.read())
+
+    def test_delete_drops_fragment(self):
+        bm = BaseModel()
+        models.storage.save()
+        models.storage.delete(bm)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn(bm.id, f.read())
+
+    def test_touch_ignores_unstored_object(self):
+        bm = BaseModel(id="1", created_at="2023-08-11T13:46:34.946290",
+                       updated_at="2023-08-11T13:46:34.946290")
+        models.storage.touch(bm)
+        self.assertNotIn("BaseModel.1", models.storage.all())
+
+
+class TestFileStorage_class_index(unittest.TestCase):
+    """Unittests for testing the per-class index of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_all_with_cls(self):
+        bm = BaseModel()
+        us = User()
+        self.assertEqual({"User." + us.id: us}, models.storage.all(User))
+        self.assertEqual({"BaseModel." + bm.id: bm},
+                         models.storage.all("BaseModel"))
+
+    def test_all_with_unknown_cls(self):
+        BaseModel()
+        self.assertEqual({}, models.storage.all("MyModel"))
+
+    def test_count(self):
+        BaseModel()
+        User()
+        User()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("BaseModel"))
+        self.assertEqual(0, models.storage.count(Place))
+
+    def test_delete_updates_index(self):
+        us = User()
+        models.storage.delete(us)
+        self.assertEqual(0, models.storage.count(User))
+        self.assertEqual({}, models.storage.all(User))
+
+    def test_reload_updates_index(self):
+        User()
+        Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(User))
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count(User))
+        self.assertEqual(1, models.storage.count(Place))
+
+
+class TestFileStorage_children(unittest.TestCase):
+    """Unittests for testing the foreign-key indexes of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_children(self):
+        st = State()
+        cy1 = City()
+        cy1.state_id = st.id
+        cy2 = City()
+        cy2.state_id = st.id
+        City()
+        self.assertEqual({"City." + cy1.id: cy1, "City." + cy2.id: cy2},
+                         models.storage.children(State, st.id, City))
+
+    def test_children_by_name(self):
+        pl = Place()
+        rv = Review()
+        rv.place_id = pl.id
+        self.assertEqual({"Review." + rv.id: rv},
+                         models.storage.children("Place", pl.id, "Review"))
+
+    def test_children_follow_update(self):
+        pl1 = Place()
+        pl2 = Place()
+        rv = Review()
+        rv.place_id = pl1.id
+        rv.place_id = pl2.id
+        self.assertEqual({}, models.storage.children(Place, pl1.id, Review))
+        self.assertIn("Review." + rv.id,
+                      models.storage.children(Place, pl2.id, Review))
+
+    def test_children_follow_delete(self):
+        us = User()
+        pl = Place()
+        pl.user_id = us.id
+        models.storage.delete(pl)
+        self.assertEqual({}, models.storage.children(User, us.id, Place))
+
+    def test_children_of_unrelated_classes(self):
+        st = State()
+        self.assertEqual({}, models.storage.children(State, st.id, Review))
+
+    def test_children_after_objects_replaced(self):
+        st = State()
+        cy = City()
+        cy.state_id = st.id
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({}, models.storage.children(State, st.id, City))
+
+
+class TestFileStorage_lazy(unittest.TestCase):
+    """Unittests for testing lazy materialization in FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.pl = Place()
+        self.st = State()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.snapshot = f.read()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_get_builds_one(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertEqual("Betty", us.first_name)
+        self.assertIs(us, models.storage.get(User, self.us.id))
+        self.assertEqual(1, len(FileStorage._FileStorage__objects))
+        self.assertEqual(3, models.storage.count())
+
+    def test_exists_builds_nothing(self):
+        self.assertTrue(models.storage.exists(User, self.us.id))
+        self.assertFalse(models.storage.exists(User, self.pl.id))
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+
+    def test_all_with_cls_builds_class(self):
+        self.assertIn("Place." + self.pl.id, models.storage.all(Place))
+        self.assertEqual(1, len(FileStorage._FileStorage__objects))
+
+    def test_all_builds_everything(self):
+        self.assertEqual(3, len(models.storage.all()))
+        self.assertEqual({}, FileStorage._FileStorage__raw)
+
+    def test_save_keeps_unbuilt_objects(self):
+        us = models.storage.get(User, self.us.id)
+        us.last_name = "Holberton"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = False
+        models.storage.reload()
+        self.assertEqual(3, models.storage.count())
+        us = models.storage.get(User, self.us.id)
+        self.assertEqual("Holberton", us.last_name)
+
+    def test_save_unchanged_is_identical(self):
+        models.storage.get(State, self.st.id)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(sorted(json.loads(self.snapshot).items()),
+                             sorted(json.loads(f.read()).items()))
+
+    def test_delete(self):
+        models.storage.delete(models.storage.get(Place, self.pl.id))
+        self.assertIsNone(models.storage.get(Place, self.pl.id))
+        self.assertEqual(0, models.storage.count(Place))
+
+    def test_new_replaces_unbuilt(self):
+        stamp = self.pl.created_at.isoformat()
+        pl = Place(id=self.pl.id, created_at=stamp, updated_at=stamp)
+        models.storage.new(pl)
+        self.assertEqual(1, models.storage.count(Place))
+        self.assertIs(pl, models.storage.get(Place, self.pl.id))
+
+
+class TestFileStorage_atomic_save(unittest.TestCase):
+    """Unittests for testing atomic saves and the fsync policy."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        timer = FileStorage._FileStorage__sync_timer
+        if timer is not None:
+            timer.cancel()
+        FileStorage._FileStorage__sync_timer = None
+        FileStorage._FileStorage__unsynced = set()
+        FileStorage._FileStorage__fsync = "always"
+        FileStorage._FileStorage__journal = False
+        for path in ("file.json", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_leaves_no_temporary_file(self):
+        BaseModel()
+        models.storage.save()
+        self.assertEqual([], [p for p in os.listdir(".")
+                              if p.startswith("file.json.")])
+
+    def test_failed_save_keeps_previous_file(self):
+        bm = BaseModel()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        us = User()
+        with patch.object(User, "to_dict", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(before, f.read())
+        self.assertIn(bm.id, before)
+        self.assertNotIn(us.id, before)
+        self.assertEqual([], [p for p in os.listdir(".")
+                              if p.startswith("file.json.")])
+
+    def test_fsync_always(self):
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+            models.storage.save()
+        self.assertEqual(4, fsync.call_count)
+
+    def test_fsync_never(self):
+        FileStorage._FileStorage__fsync = "never"
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+        self.assertEqual(0, fsync.call_count)
+
+    def test_fsync_interval(self):
+        FileStorage._FileStorage__fsync = "60000"
+        FileStorage._FileStorage__last_sync = float("-inf")
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+            models.storage.save()
+        self.assertEqual(2, fsync.call_count)
+
+    def test_fsync_interval_syncs_skipped_write_on_flush(self):
+        FileStorage._FileStorage__fsync = "60000"
+        FileStorage._FileStorage__last_sync = float("-inf")
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+            models.storage.save()
+            self.assertEqual(2, fsync.call_count)
+            self.assertIsNotNone(FileStorage._FileStorage__sync_timer)
+            models.storage.flush()
+            self.assertEqual(4, fsync.call_count)
+            models.storage.flush()
+            self.assertEqual(4, fsync.call_count)
+        self.assertIsNone(FileStorage._FileStorage__sync_timer)
+
+    def test_fsync_interval_timer(self):
+        FileStorage._FileStorage__fsync = "200"
+        FileStorage._FileStorage__last_sync = time.monotonic()
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+            self.assertEqual(0, fsync.call_count)
+            FileStorage._FileStorage__sync_timer.join(5)
+            self.assertEqual(2, fsync.call_count)
+        self.assertIsNone(FileStorage._FileStorage__sync_timer)
+        self.assertEqual(set(), FileStorage._FileStorage__unsynced)
+
+    def test_fsync_policy_checked(self):
+        for policy in ("always", "never", "0", "250", "12.5"):
+            FileStorage._FileStorage__fsync = policy
+            FileStorage()
+        for policy in ("sometimes", "", "-5", "nan", "inf"):
+            FileStorage._FileStorage__fsync = policy
+            with self.assertRaises(ValueError):
+                FileStorage()
+
+    def test_fsync_journal(self):
+        FileStorage._FileStorage__journal = True
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+        self.assertEqual(1, fsync.call_count)
+
+
+class TestFileStorage_group_commit(unittest.TestCase):
+    """Unittests for testing batched and windowed saves."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        timer = FileStorage._FileStorage__commit_timer
+        if timer is not None:
+            timer.cancel()
+            FileStorage._FileStorage__commit_timer = None
+        FileStorage._FileStorage__failure = None
+        FileStorage._FileStorage__batches = 0
+        FileStorage._FileStorage__owed = False
+        FileStorage._FileStorage__group_window = 0.0
+        FileStorage._FileStorage__last_write = float("-inf")
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_batch_defers_saves(self):
+        models.storage.begin()
+        bm = BaseModel()
+        bm.save()
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        models.storage.commit()
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, f.read())
+
+    def test_nested_batches_write_on_outermost_commit(self):
+        models.storage.begin()
+        models.storage.begin()
+        BaseModel()
+        models.storage.save()
+        models.storage.commit()
+        self.assertFalse(os.path.exists("file.json"))
+        models.storage.commit()
+        self.assertTrue(os.path.exists("file.json"))
+
+    def test_commit_without_begin(self):
+        with self.assertRaises(RuntimeError):
+            models.storage.commit()
+
+    def test_commit_without_saves_does_not_write(self):
+        models.storage.begin()
+        BaseModel()
+        models.storage.commit()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_window_coalesces_saves(self):
+        FileStorage._FileStorage__group_window = 60000.0
+        BaseModel()
+        with patch.object(FileStorage, "compact",
+                          autospec=True,
+                          side_effect=FileStorage.compact) as compact:
+            for _ in range(5):
+                models.storage.save()
+            self.assertEqual(1, compact.call_count)
+            models.storage.flush()
+            self.assertEqual(2, compact.call_count)
+            models.storage.flush()
+            self.assertEqual(2, compact.call_count)
+
+    def test_window_elapsed_writes(self):
+        FileStorage._FileStorage__group_window = 60000.0
+        models.storage.save()
+        bm = BaseModel()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn(bm.id, f.read())
+        FileStorage._FileStorage__last_write -= 60
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertIn(bm.id, f.read())
+
+    def test_window_end_writes_without_save(self):
+        FileStorage._FileStorage__group_window = 50.0
+        models.storage.save()
+        bm = BaseModel()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn(bm.id, f.read())
+        timer = FileStorage._FileStorage__commit_timer
+        timer.join(5)
+        self.assertFalse(timer.is_alive())
+        self.assertFalse(FileStorage._FileStorage__owed)
+        with open("file.json", "r") as f:
+            self.assertIn(bm.id, f.read())
+
+    def test_window_end_leaves_batch(self):
+        FileStorage._FileStorage__group_window = 50.0
+        models.storage.save()
+        BaseModel()
+        models.storage.save()
+        timer = FileStorage._FileStorage__commit_timer
+        models.storage.begin()
+        timer.join(5)
+        self.assertTrue(FileStorage._FileStorage__owed)
+        models.storage.commit()
+        self.assertFalse(FileStorage._FileStorage__owed)
+
+    def test_window_end_failure_raised_by_flush(self):
+        FileStorage._FileStorage__group_window = 50.0
+        models.storage.save()
+        bm = BaseModel()
+        with patch.object(FileStorage, "compact", autospec=True,
+                          side_effect=OSError("disk full")):
+            models.storage.save()
+            FileStorage._FileStorage__commit_timer.join(5)
+        with self.assertRaises(OSError):
+            models.storage.flush()
+        self.assertTrue(FileStorage._FileStorage__owed)
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn(bm.id, f.read())
+
+
+class TestFileStorage_async(unittest.TestCase):
+    """Unittests for testing saves handed to the writer thread."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__async = True
+
+    @classmethod
+    def tearDown(self):
+        models.storage.flush()
+        FileStorage._FileStorage__async = False
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__imaged = None
+        for path in ("file.json", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def blocked_snapshot(self):
+        """Patch the snapshot writer to wait for the returned event."""
+        release = threading.Event()
+        write = FileStorage._FileStorage__snapshot
+
+        def snapshot(items):
+            release.wait(10)
+            write(items)
+        patcher = patch.object(FileStorage, "_FileStorage__snapshot",
+                               side_effect=snapshot)
+        self.addCleanup(patcher.stop)
+        self.addCleanup(release.set)
+        return patcher.start(), release
+
+    def test_save_returns_before_write(self):
+        snapshot, release = self.blocked_snapshot()
+        bm = BaseModel()
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        release.set()
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, f.read())
+
+    def test_queued_writes_are_coalesced(self):
+        snapshot, release = self.blocked_snapshot()
+        models.storage.save()
+        bm = BaseModel()
+        bm.save()
+        bm.name = "Betty"
+        bm.save()
+        release.set()
+        models.storage.flush()
+        self.assertLessEqual(snapshot.call_count, 2)
+        with open("file.json", "r") as f:
+            self.assertEqual("Betty",
+                             json.load(f)["BaseModel." + bm.id]["name"])
+
+    def test_changes_after_save_are_not_written(self):
+        snapshot, release = self.blocked_snapshot()
+        bm = BaseModel()
+        bm.save()
+        bm.name = "Betty"
+        release.set()
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertNotIn("name", json.load(f)["BaseModel." + bm.id])
+
+    def test_delete(self):
+        bm = BaseModel()
+        us = User()
+        models.storage.save()
+        models.storage.delete(bm)
+        models.storage.save()
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertNotIn("BaseModel." + bm.id, objs)
+        self.assertIn("User." + us.id, objs)
+
+    def test_journal(self):
+        FileStorage._FileStorage__journal = True
+        bm = BaseModel()
+        models.storage.save()
+        us = User()
+        us.save()
+        models.storage.delete(bm)
+        models.storage.save()
+        models.storage.flush()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertNotIn("BaseModel." + bm.id, objs)
+        self.assertIn("User." + us.id, objs)
+
+    def test_compact(self):
+        FileStorage._FileStorage__journal = True
+        models.storage.save()
+        us = User()
+        us.save()
+        models.storage.compact()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_failure_raised_by_flush(self):
+        with patch.object(FileStorage, "_FileStorage__snapshot",
+                          side_effect=OSError("disk full")):
+            BaseModel().save()
+            with self.assertRaises(OSError):
+                models.storage.flush()
+        models.storage.flush()
+
+
+class TestFileStorage_binary(unittest.TestCase):
+    """Unittests for testing the binary snapshot format in FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        FileStorage._FileStorage__format = "binary"
+        FileStorage._FileStorage__file_path = "file.hbnb"
+        FileStorage._FileStorage__log_path = "file.hbnb.log"
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.pl = Place()
+        self.pl.amenity_ids = ["a", "b"]
+        self.st = State()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        models.storage.reload()
+
+    @classmethod
+    def tearDown(self):
+        for snapshot in set(FileStorage._FileStorage__maps.values()):
+            snapshot.close()
+        FileStorage._FileStorage__maps = {}
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        FileStorage._FileStorage__fragments = {}
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__format = "json"
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__log_path = "file.json.log"
+        for path in ("file.hbnb", "file.hbnb.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_writes_binary(self):
+        with open("file.hbnb", "rb") as f:
+            self.assertEqual(b"HBNBSNAP", f.read(8))
+
+    def test_reload_decodes_nothing(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_get(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertEqual(self.us.to_dict(), us.to_dict())
+        self.assertEqual(["User." + self.us.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_all(self):
+        objs = models.storage.all()
+        self.assertEqual(3, len(objs))
+        self.assertEqual(self.pl.to_dict(),
+                         objs["Place." + self.pl.id].to_dict())
+
+    def test_save_after_reload(self):
+        models.storage.get(State, self.st.id).name = "Texas"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        models.storage.reload()
+        self.assertEqual("Texas", models.storage.get(State, self.st.id).name)
+        self.assertEqual(self.us.to_dict(),
+                         models.storage.get(User, self.us.id).to_dict())
+        self.assertEqual(3, models.storage.count())
+
+    def test_delete(self):
+        models.storage.delete(models.storage.get(Place, self.pl.id))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIsNone(models.storage.get(Place, self.pl.id))
+        self.assertEqual(2, models.storage.count())
+
+    def test_journal_replayed_over_binary(self):
+        FileStorage._FileStorage__journal = True
+        models.storage.get(User, self.us.id).last_name = "Holberton"
+        models.storage.save()
+        self.assertTrue(os.path.exists("file.hbnb.log"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Holberton",
+                         models.storage.get(User, self.us.id).last_name)
+
+    def test_reload_json_snapshot(self):
+        FileStorage._FileStorage__format = "json"
+        models.storage.compact()
+        with open("file.hbnb", "r") as f:
+            self.assertEqual(3, len(json.load(f)))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(self.us.to_dict(),
+                         models.storage.get(User, self.us.id).to_dict())
+
+
+class TestFileStorage_sharded(unittest.TestCase):
+    """Unittests for testing per-class shard files in FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__sharded = True
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        self.us = User()
+        self.st = State()
+        self.ci = City()
+        self.ci.state_id = self.st.id
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        models.storage.reload()
+
+    @classmethod
+    def tearDown(self):
+        for snapshot in set(FileStorage._FileStorage__maps.values()):
+            snapshot.close()
+        FileStorage._FileStorage__maps = {}
+        FileStorage._FileStorage__sharded = False
+        FileStorage._FileStorage__unloaded = set()
+        FileStorage._FileStorage__resharding = False
+        FileStorage._FileStorage__format = "json"
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        FileStorage._FileStorage__fragments = {}
+        for path in glob.glob("file.*.json") + glob.glob("file.*.hbnb") + [
+                "file.json", "file.hbnb"]:
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def written(self):
+        """Patch __snapshot and return the mock recording its calls."""
+        write = FileStorage._FileStorage__snapshot
+        patcher = patch.object(FileStorage, "_FileStorage__snapshot",
+                               side_effect=write)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_one_file_per_class(self):
+        self.assertEqual(["file.City.json", "file.State.json",
+                          "file.User.json"], sorted(glob.glob("file.*.json")))
+        self.assertFalse(os.path.exists("file.json"))
+        with open("file.State.json", "r") as f:
+            self.assertEqual(["State." + self.st.id], list(json.load(f)))
+
+    def test_reload_reads_no_shard(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual({"City", "State", "User"},
+                         FileStorage._FileStorage__unloaded)
+
+    def test_all_reads_one_shard(self):
+        states = models.storage.all("State")
+        self.assertEqual(["State." + self.st.id], list(states))
+        self.assertEqual({"City", "User"},
+                         FileStorage._FileStorage__unloaded)
+
+    def test_get_and_count(self):
+        self.assertEqual(self.us.to_dict(),
+                         models.storage.get(User, self.us.id).to_dict())
+        self.assertEqual(1, models.storage.count(City))
+        self.assertEqual({"State"}, FileStorage._FileStorage__unloaded)
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(set(), FileStorage._FileStorage__unloaded)
+
+    def test_children(self):
+        self.assertEqual(["City." + self.ci.id],
+                         list(models.storage.children(State, self.st.id,
+                                                      City)))
+
+    def test_save_writes_dirty_shards_only(self):
+        written = self.written()
+        models.storage.get(User, self.us.id).first_name = "Betty"
+        Review()
+        models.storage.save()
+        self.assertEqual(["file.Review.json", "file.User.json"],
+                         sorted(c.args[1] for c in written.call_args_list))
+        with open("file.User.json", "r") as f:
+            self.assertEqual("Betty", json.load(f)[
+                "User." + self.us.id]["first_name"])
+
+    def test_new_object_keeps_unread_shard(self):
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count(User))
+        self.assertIsNotNone(models.storage.get(User, us.id))
+
+    def test_delete_last_object_removes_shard(self):
+        models.storage.delete(models.storage.get(State, self.st.id))
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.State.json"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(0, models.storage.count(State))
+
+    def test_single_file_is_split(self):
+        FileStorage._FileStorage__sharded = False
+        FileStorage._FileStorage__objects = {}
+        pl = Place()
+        models.storage.save()
+        FileStorage._FileStorage__sharded = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIsNotNone(models.storage.get(Place, pl.id))
+        self.assertEqual(4, models.storage.count())
+
+    def test_compact_rewrites_every_shard(self):
+        written = self.written()
+        models.storage.compact()
+        self.assertEqual(["file.City.json", "file.State.json",
+                          "file.User.json"],
+                         sorted(c.args[1] for c in written.call_args_list))
+
+    def test_binary_shards(self):
+        models.storage.count()
+        FileStorage._FileStorage__format = "binary"
+        FileStorage._FileStorage__file_path = "file.hbnb"
+        models.storage.compact()
+        self.assertEqual(["file.City.hbnb", "file.State.hbnb",
+                          "file.User.hbnb"], sorted(glob.glob("file.*.hbnb")))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(self.st.to_dict(),
+                         models.storage.get(State, self.st.id).to_dict())
+        self.assertEqual(3, models.storage.count())
+
+
+@unittest.skipUnless(parallel_load.available(), "needs os.fork()")
+class TestFileStorage_parallel_load(unittest.TestCase):
+    """Unittests for testing reload() with worker processes."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.objs = [User(), State(), Place(), Review()]
+        self.objs += [User() for _ in range(100)]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        FileStorage._FileStorage__workers = 3
+        FileStorage._FileStorage__load_chunk = 512
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__workers = 1
+        FileStorage._FileStorage__load_chunk = 4 * 1024 * 1024
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload(self):
+        models.storage.reload()
+        self.assertEqual(104, models.storage.count())
+        for obj in self.objs:
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.assertEqual(obj.to_dict(),
+                             models.storage.all()[key].to_dict())
+
+    def test_reload_lazy(self):
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(101, models.storage.count(User))
+        self.assertEqual(self.objs[1].to_dict(), models.storage.get(
+            State, self.objs[1].id).to_dict())
+
+    def test_bad_cut_reads_serially(self):
+        id = self.objs[2].id
+        with open("file.json", "r") as f:
+            doc = json.load(f)
+        doc["Place." + id]["nested"] = {"a": {}, "User.x": 1}
+        with open("file.json", "w") as f:
+            json.dump(doc, f)
+        with open("file.json", "rb") as f:
+            fake = f.read().index(b'"User.x"')
+        with patch.object(parallel_load, "split",
+                          return_value=[(0, fake), (fake, None)]):
+            models.storage.reload()
+        self.assertEqual(104, models.storage.count())
+        self.assertEqual({"a": {}, "User.x": 1},
+                         models.storage.get(Place, id).nested)
+
+
+class TestFileStorage_since(unittest.TestCase):
+    """Unittests for testing time-range queries of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        for i, cls in enumerate((User, State, User)):
+            models.storage.new(cls(
+                id=str(i), created_at="2023-08-1{}T10:00:00".format(i),
+                updated_at="2023-08-2{}T10:00:00".format(i)))
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_since(self):
+        self.assertEqual(["State.1", "User.2"],
+                         list(models.storage.since("2023-08-21T10:00:00")))
+        self.assertEqual(["User.0", "State.1", "User.2"],
+                         list(models.storage.since(datetime(2023, 8, 1))))
+        self.assertEqual({}, models.storage.since("2024-01-01"))
+
+    def test_since_cls(self):
+        self.assertEqual(["User.2"],
+                         list(models.storage.since("2023-08-21", User)))
+        self.assertEqual(["State.1"],
+                         list(models.storage.since("2023-08-01", "State")))
+        self.assertEqual({}, models.storage.since("2023-08-01", Place))
+
+    def test_since_created_at(self):
+        self.assertEqual(["State.1", "User.2"], list(models.storage.since(
+            "2023-08-11", field="created_at")))
+
+    def test_since_follows_changes(self):
+        self.assertEqual(2, len(models.storage.since("2023-08-21")))
+        us = models.storage.get(User, "0")
+        us.save()
+        models.storage.delete(models.storage.get(State, "1"))
+        pl = Place()
+        self.assertEqual(["User.2", "User.0", "Place." + pl.id],
+                         list(models.storage.since("2023-08-21")))
+
+    def test_since_aware_timestamp(self):
+        ts = datetime(2023, 8, 21, 10, tzinfo=timezone.utc)
+        self.assertEqual(
+            list(models.storage.since(ts.astimezone().replace(tzinfo=None))),
+            list(models.storage.since(ts)))
+
+    def test_since_after_lazy_reload(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+        self.assertEqual(["State.1", "User.2"],
+                         list(models.storage.since("2023-08-21")))
+
+    def test_since_errors(self):
+        with self.assertRaises(ValueError):
+            models.storage.since("yesterday")
+        with self.assertRaises(ValueError):
+            models.storage.since("2023-08-21", field="name")
+
+
+class TestFileStorage_geo(unittest.TestCase):
+    """Unittests for testing geospatial queries of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = {}
+        for name, lat, lon in (("oakland", 37.80, -122.27),
+                               ("sf", 37.77, -122.41),
+                               ("la", 34.05, -118.24),
+                               ("fiji", -17.0, 179.99),
+                               ("samoa", -17.0, -179.99)):
+            pl = Place()
+            pl.latitude = lat
+            pl.longitude = lon
+            self.places[name] = "Place." + pl.id
+        Place()
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def keys(self, *names):
+        return [self.places[name] for name in names]
+
+    def test_nearby(self):
+        self.assertEqual(self.keys("sf", "oakland"),
+                         list(models.storage.nearby(37.77, -122.41, 20)))
+        self.assertEqual(self.keys("la", "oakland", "sf"),
+                         list(models.storage.nearby(34.05, -118.24, 600)))
+        self.assertEqual(self.keys("la"), list(models.storage.nearby(
+            34.05, -118.24, 600, limit=1)))
+        self.assertEqual({}, models.storage.nearby(0, 0, 100))
+
+    def test_nearby_across_antimeridian(self):
+        self.assertEqual(self.keys("fiji", "samoa"),
+                         list(models.storage.nearby(-17.0, 179.999, 10)))
+
+    def test_nearby_limit_same_as_scan(self):
+        rng = random.Random(21)
+        for lat, lon in ((37.77, -122.41), (-17.0, 179.995), (89.99, 10)):
+            for i in range(300):
+                pl = Place()
+                pl.latitude = max(-90, min(90, lat + rng.uniform(-.2, .2)))
+                pl.longitude = (lon + rng.uniform(-.2, .2) + 180) % 360 - 180
+            for radius in (0.5, 5, 30):
+                scan = list(models.storage.nearby(lat, lon, radius))
+                for limit in (0, 1, 10, 1000):
+                    self.assertEqual(scan[:limit], list(models.storage.nearby(
+                        lat, lon, radius, limit=limit)))
+
+    def test_nearby_other_class(self):
+        self.assertEqual({}, models.storage.nearby(37.77, -122.41, 20,
+                                                   cls=User))
+
+    def test_bbox(self):
+        self.assertEqual(sorted(self.keys("sf", "oakland", "la")),
+                         sorted(models.storage.bbox(30, -125, 40, -110)))
+        self.assertEqual(sorted(self.keys("fiji", "samoa")),
+                         sorted(models.storage.bbox(-18, 179, -16, -179)))
+
+    def test_index_follows_changes(self):
+        self.assertEqual(2, len(models.storage.nearby(37.77, -122.41, 20)))
+        la = models.storage.all()[self.places["la"]]
+        la.latitude = 37.78
+        la.longitude = -122.42
+        models.storage.delete(models.storage.all()[self.places["oakland"]])
+        self.assertEqual(self.keys("sf", "la"),
+                         list(models.storage.nearby(37.77, -122.41, 20)))
+
+    def test_nearby_after_lazy_reload(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+        self.assertEqual(self.keys("sf", "oakland"),
+                         list(models.storage.nearby(37.77, -122.41, 20)))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            models.storage.nearby(91, 0, 10)
+        with self.assertRaises(ValueError):
+            models.storage.nearby(0, 181, 10)
+        with self.assertRaises(ValueError):
+            models.storage.nearby(0, 0, -1)
+        with self.assertRaises(ValueError):
+            models.storage.bbox(10, 0, 0, 10)
+
+
+class TestFileStorage_search(unittest.TestCase):
+    """Unittests for testing full-text search of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = {}
+        for name, description in (("Loft", "Bright loft with a pool"),
+                                  ("Cabin", "Quiet cabin, pool and pool "
+                                            "table"),
+                                  ("Studio", "Small studio downtown")):
+            pl = Place()
+            pl.name = name
+            pl.description = description
+            self.places[name] = pl
+
+    @classmethod
+    def tearDown(self):
+        self.forget()
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        for path in ("file.json", "file.json.Place.fts",
+                     "file.json.Review.fts"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @staticmethod
+    def forget():
+        """Drop the text indexes, as a new process starts without them."""
+        for index in FileStorage._FileStorage__texts.values():
+            FileStorage._FileStorage__indexes[index.cls_name].remove(index)
+        FileStorage._FileStorage__texts = {}
+
+    def keys(self, *names):
+        return ["Place." + self.places[name].id for name in names]
+
+    def test_search_ranks_matches(self):
+        self.assertEqual(self.keys("Cabin", "Loft"),
+                         list(models.storage.search(Place, "pool")))
+        self.assertEqual(self.keys("Studio", "Cabin", "Loft"),
+                         list(models.storage.search(Place, "Studio POOL")))
+        self.assertEqual(self.keys("Cabin"), list(models.storage.search(
+            "Place", "pool", limit=1)))
+        self.assertEqual({}, models.storage.search(Place, "sauna"))
+        self.assertEqual({}, models.storage.search(Place, ", ;"))
+
+    def test_search_review(self):
+        rv = Review()
+        rv.text = "Great pool"
+        self.assertEqual(["Review." + rv.id],
+                         list(models.storage.search(Review, "pool")))
+
+    def test_not_searchable(self):
+        with self.assertRaises(ValueError):
+            models.storage.search(User, "pool")
+
+    def test_index_follows_changes(self):
+        models.storage.search(Place, "pool")
+        self.places["Studio"].description = "Big pool"
+        models.storage.delete(self.places["Cabin"])
+        pl = Place()
+        pl.name = "Pool house"
+        self.assertEqual(["Place." + pl.id] + self.keys("Studio", "Loft"),
+                         list(models.storage.search(Place, "pool")))
+        self.assertEqual({}, models.storage.search(Place, "downtown"))
+
+    def test_reload_reuses_entries(self):
+        models.storage.search(Place, "pool")
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(fulltext, "tokenize",
+                          wraps=fulltext.tokenize) as tokenize:
+            self.assertEqual(self.keys("Cabin", "Loft"),
+                             list(models.storage.search(Place, "pool")))
+        self.assertEqual(1, tokenize.call_count)
+
+    def test_index_file(self):
+        models.storage.search(Place, "pool")
+        models.storage.save()
+        models.storage.flush()
+        self.assertTrue(os.path.exists("file.json.Place.fts"))
+        self.forget()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        studio = models.storage.get(Place, self.places["Studio"].id)
+        studio.description = "Big pool"
+        with patch.object(fulltext, "tokenize",
+                          wraps=fulltext.tokenize) as tokenize:
+            self.assertEqual(self.keys("Cabin", "Studio", "Loft"),
+                             list(models.storage.search(Place, "pool")))
+        self.assertEqual(2, tokenize.call_count)
+
+    def test_index_file_after_lazy_reload(self):
+        models.storage.search(Place, "pool")
+        models.storage.save()
+        models.storage.flush()
+        self.forget()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+        with patch.object(fulltext, "tokenize",
+                          wraps=fulltext.tokenize) as tokenize:
+            self.assertEqual(self.keys("Cabin", "Loft"),
+                             list(models.storage.search(Place, "pool")))
+        self.assertEqual(1, tokenize.call_count)
+
+    def test_unreadable_index_file(self):
+        with open("file.json.Place.fts", "w") as f:
+            f.write('{"fields": ["name", "description"], "docs": [[')
+        self.assertEqual(self.keys("Cabin", "Loft"),
+                         list(models.storage.search(Place, "pool")))
+
+
+class TestFileStorage_query(unittest.TestCase):
+    """Unittests for testing filter/sort/limit queries of FileStorage."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        rand = random.Random(23)
+        self.cities = [City() for i in range(3)]
+        self.places = []
+        for i in range(60):
+            pl = Place()
+            pl.city_id = rand.choice(self.cities).id
+            pl.price_by_night = rand.randrange(20, 200)
+            pl.max_guest = rand.randrange(1, 6)
+            pl.name = rand.choice(["Loft", "Cabin", "Studio"])
+            pl.updated_at = datetime(2024, 1, 1 + i % 28, i % 24)
+            self.places.append(pl)
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_where(self):
+        found = list(models.storage.query(Place, [
+            ("price_by_night", "<", "100"), ("max_guest", ">=", 2)]))
+        self.assertEqual([pl for pl in self.places
+                          if pl.price_by_night < 100 and pl.max_guest >= 2],
+                         found)
+
+    def test_order_by_and_limit(self):
+        found = list(models.storage.query(
+            Place, [("name", "==", "Loft")], ["-price_by_night", "id"], 5))
+        lofts = sorted((pl for pl in self.places if pl.name == "Loft"),
+                       key=lambda pl: pl.id)
+        lofts.sort(key=lambda pl: pl.price_by_night, reverse=True)
+        self.assertEqual(lofts[:5], found)
+        found = list(models.storage.query(Place, order_by=["max_guest"],
+                                          limit=3))
+        self.assertEqual(sorted(self.places,
+                                key=lambda pl: pl.max_guest)[:3], found)
+
+    def test_foreign_key_index(self):
+        city_id = self.cities[0].id
+        with patch.object(file_storage.ForeignKeyIndex, "lookup",
+                          autospec=True, side_effect=file_storage.
+                          ForeignKeyIndex.lookup) as lookup:
+            found = list(models.storage.query(Place, [
+                ("city_id", "==", city_id), ("price_by_night", ">", 50)]))
+        lookup.assert_called()
+        self.assertEqual([pl for pl in self.places if pl.city_id == city_id
+                          and pl.price_by_night > 50], found)
+
+    def test_foreign_key_empty_value(self):
+        orphan = Place()
+        for op in ("==", "!="):
+            found = list(models.storage.query(Place, [("city_id", op, "")]))
+            self.assertEqual([pl for pl in self.places + [orphan]
+                              if (pl.city_id == "") == (op == "==")], found)
+        self.assertEqual([orphan], list(models.storage.query(
+            Place, [("city_id", "==", ""), ("price_by_night", "==", 0)])))
+
+    def test_columnar_index(self):
+        with patch.object(file_storage.ColumnarIndex, "select",
+                          autospec=True, side_effect=file_storage.
+                          ColumnarIndex.select) as select:
+            found = list(models.storage.query(Place, [
+                ("max_guest", "==", 3)]))
+        select.assert_called_once()
+        self.assertEqual([pl for pl in self.places if pl.max_guest == 3],
+                         found)
+
+    def test_columnar_order(self):
+        with patch.object(file_storage, "ordered") as ordered:
+            found = list(models.storage.query(
+                Place, [("max_guest", ">", 1)], ["-price_by_night"], 4))
+        ordered.assert_not_called()
+        self.assertEqual(sorted((pl for pl in self.places
+                                 if pl.max_guest > 1),
+                                key=lambda pl: pl.price_by_night,
+                                reverse=True)[:4], found)
+
+    def test_sorted_index(self):
+        bound = datetime(2024, 1, 20)
+        with patch.object(file_storage, "ordered") as ordered:
+            found = list(models.storage.query(Place, [
+                ("updated_at", ">=", "2024-01-20")], ["updated_at"]))
+            latest = list(models.storage.query(Place, order_by=[
+                "-updated_at"], limit=2))
+        ordered.assert_not_called()
+        expected = sorted((pl for pl in self.places
+                           if pl.updated_at >= bound),
+                          key=lambda pl: pl.updated_at)
+        self.assertEqual(expected, found)
+        self.assertEqual(sorted(self.places, key=lambda pl: pl.updated_at,
+                                reverse=True)[:2], latest)
+        found = list(models.storage.query(Place, [
+            ("updated_at", "<=", self.places[0].updated_at)]))
+        self.assertIn(self.places[0], found)
+
+    def test_limit_stops_scan(self):
+        with patch.object(file_storage, "matches",
+                          wraps=file_storage.matches) as matches:
+            found = models.storage.query(Place, [("name", "!=", "")], limit=2)
+            self.assertEqual(self.places[:2], list(found))
+        self.assertEqual(2, matches.call_count)
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            models.storage.query(Place, [("nope", "==", 1)])
+        with self.assertRaises(KeyError):
+            models.storage.query(Place, order_by=["-nope"])
+        with self.assertRaises(ValueError):
+            models.storage.query(Place, [("max_guest", "==", "many")])
+        with self.assertRaises(ValueError):
+            models.storage.query(Place, [("updated_at", ">", "yesterday")])
+        with self.assertRaises(ValueError):
+            models.storage.query(Place, [("max_guest", "~", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
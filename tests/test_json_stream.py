@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/json_stream.py.
+
+Unittest classes:
+    TestJSONStream
+"""
+import json
+import unittest
+from io import StringIO
+from models.engine.json_stream import JSONStream
+
+
+class TestJSONStream(unittest.TestCase):
+    """Unittests for testing the JSONStream class."""
+
+    doc = {
+        "BaseModel.1": {"id": "1", "__class__": "BaseModel"},
+        "Place.2": {"id": "2", "name": "Café {loft}, \"big\"",
+                    "amenity_ids": ["a", "b"], "latitude": 9.5,
+                    "__class__": "Place"},
+        "User.3": {"id": "3", "nested": {"a": [1, {"b": None}]}}
+    }
+
+    def test_matches_json_load(self):
+        text = json.dumps(self.doc)
+        self.assertEqual(self.doc, dict(JSONStream(StringIO(text))))
+
+    def test_small_chunks(self):
+        text = json.dumps(self.doc)
+        for size in range(1, 8):
+            items = list(JSONStream(StringIO(text), chunk_size=size))
+            self.assertEqual(list(self.doc.items()), items)
+
+    def test_whitespace(self):
+        text = json.dumps(self.doc, indent=4)
+        self.assertEqual(self.doc, dict(JSONStream(StringIO(text), 3)))
+
+    def test_empty_object(self):
+        self.assertEqual([], list(JSONStream(StringIO(" { } "))))
+
+    def test_empty_file(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(JSONStream(StringIO("")))
+
+    def test_truncated_file(self):
+        text = json.dumps(self.doc)[:-10]
+        with self.assertRaises(json.JSONDecodeError):
+            list(JSONStream(StringIO(text), chunk_size=4))
+
+    def test_not_an_object(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(JSONStream(StringIO("[1, 2]")))
+
+    def test_missing_comma(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(JSONStream(StringIO('{"a": {} "b": {}}')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/parallel_load.py.
+
+Unittest classes:
+    TestParallelLoad_split
+    TestParallelLoad_decode
+    TestParallelLoad_load
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine import parallel_load
+
+
+class ParallelLoadTestCase(unittest.TestCase):
+    """Write snapshots to a temporary directory."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "file.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, doc):
+        with open(self.path, "w") as f:
+            json.dump(doc, f)
+        return doc
+
+
+def make_doc(n):
+    """Return a snapshot-like dictionary of n objects."""
+    return {"User.{}".format(i): {"id": str(i), "first_name": "Betty",
+                                  "__class__": "User"} for i in range(n)}
+
+
+class TestParallelLoad_split(ParallelLoadTestCase):
+    """Unittests for testing cutting a snapshot into ranges."""
+
+    def test_ranges_start_at_members(self):
+        self.write(make_doc(100))
+        ranges = parallel_load.split(self.path, 4)
+        self.assertEqual(4, len(ranges))
+        self.assertEqual(0, ranges[0][0])
+        self.assertIsNone(ranges[-1][1])
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for (start, stop), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(stop, next_start)
+            self.assertTrue(data[next_start:].startswith(b'"User.'))
+
+    def test_one_range(self):
+        self.write(make_doc(3))
+        self.assertEqual([(0, None)], parallel_load.split(self.path, 1))
+
+    def test_no_boundary(self):
+        self.write({"NoClass.1": {"id": "1"}, "NoClass.2": {"id": "2"}})
+        self.assertEqual([(0, None)], parallel_load.split(self.path, 4))
+
+
+class TestParallelLoad_decode(ParallelLoadTestCase):
+    """Unittests for testing decoding one range."""
+
+    def test_whole_document(self):
+        doc = self.write({"User.1": {"id": "1", "text": "a}, \"User.x"},
+                          "Place.2": {"id": "2", "amenity_ids": ["a"]}})
+        self.assertEqual(doc, parallel_load.decode(self.path, 0, None))
+
+    def test_empty(self):
+        self.write({})
+        self.assertEqual({}, parallel_load.decode(self.path, 0, None))
+
+    def test_ranges(self):
+        doc = self.write(make_doc(50))
+        ranges = parallel_load.split(self.path, 5)
+        self.assertEqual(5, len(ranges))
+        decoded = {}
+        for start, stop in ranges:
+            decoded.update(parallel_load.decode(self.path, start, stop))
+        self.assertEqual(list(doc.items()), list(decoded.items()))
+
+    def test_errors(self):
+        self.write(make_doc(10))
+        start, stop = parallel_load.split(self.path, 2)[1]
+        with self.assertRaises(ValueError):
+            parallel_load.decode(self.path, 0, start - 5)
+        with self.assertRaises(ValueError):
+            parallel_load.decode(self.path, 0, start + 5)
+        with open(self.path, "w") as f:
+            f.write('["User.1"]')
+        with self.assertRaises(ValueError):
+            parallel_load.decode(self.path, 0, None)
+        with open(self.path, "w") as f:
+            f.write('{"User.1": {"id": "1"}, ')
+        with self.assertRaises(ValueError):
+            parallel_load.decode(self.path, 0, None)
+
+
+@unittest.skipUnless(parallel_load.available(), "needs os.fork()")
+class TestParallelLoad_load(ParallelLoadTestCase):
+    """Unittests for testing decoding a snapshot with worker processes."""
+
+    def test_same_as_json(self):
+        doc = self.write(make_doc(500))
+        pairs = list(parallel_load.load(self.path, 3, chunk_size=1024))
+        self.assertEqual(list(doc.items()), pairs)
+
+    def test_small_file(self):
+        doc = self.write(make_doc(5))
+        self.assertEqual(list(doc.items()),
+                         list(parallel_load.load(self.path, 4)))
+
+    def test_boundary_inside_record(self):
+        doc = make_doc(20)
+        doc["User.10"]["nested"] = {"a": {}, "User.x": 1}
+        self.write(doc)
+        with open(self.path, "rb") as f:
+            fake = f.read().index(b'"User.x"')
+        with patch.object(parallel_load, "split",
+                          return_value=[(0, fake), (fake, None)]):
+            with self.assertRaises(ValueError):
+                list(parallel_load.load(self.path, 2))
+
+    def test_worker_dies(self):
+        self.write(make_doc(500))
+        with patch.object(parallel_load, "decode",
+                          side_effect=RuntimeError):
+            with self.assertRaises(ValueError):
+                list(parallel_load.load(self.path, 2, chunk_size=1024))
+
+    def test_close_reaps_workers(self):
+        self.write(make_doc(500))
+        pairs = parallel_load.load(self.path, 3, chunk_size=1024)
+        next(pairs)
+        pairs.close()
+        with self.assertRaises(ChildProcessError):
+            os.waitpid(-1, os.WNOHANG)
+
+    def test_import_models(self):
+        stamp = "2023-08-11T13:46:34.946290"
+        doc = {"User.{}".format(i): {"id": str(i), "created_at": stamp,
+                                     "updated_at": stamp,
+                                     "first_name": "Betty",
+                                     "__class__": "User"}
+               for i in range(70000)}
+        self.write(doc)
+        self.assertGreater(os.path.getsize(self.path), 8 * 1024 * 1024)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "import models; print(models.storage.count())"],
+            cwd=self.tmpdir.name, capture_output=True, text=True,
+            timeout=60, env=dict(os.environ, PYTHONPATH=root,
+                                 HBNB_LOAD_WORKERS="2"))
+        self.assertEqual("70000", result.stdout.strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/serializers.py.
+
+Unittest classes:
+    TestSerializers
+    TestSerializers_storage
+"""
+import io
+import os
+import unittest
+import models
+from datetime import datetime
+from unittest.mock import patch
+from models.engine import serializers
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+AVAILABLE = [s for s in serializers.SERIALIZERS.values() if s.available()]
+
+
+class TestSerializers(unittest.TestCase):
+    """Unittests for testing the serializers on their own."""
+
+    records = {
+        "User.1": {"id": "1", "created_at": "2017-09-28T21:03:54.052298",
+                   "__class__": "User", "first_name": "Betty"},
+        "Place.2": {"id": "2", "name": "Café {loft}", "number_rooms": 3,
+                    "latitude": 9.5, "amenity_ids": ["a", "b"],
+                    "smoking": False, "owner": None, "__class__": "Place"}
+    }
+
+    def round_trip(self, serializer, records):
+        f = io.BytesIO()
+        serializer.dump(f, ((k, serializer.dumps(o))
+                            for k, o in records.items()))
+        f.seek(0)
+        return list(serializer.load(f))
+
+    def test_round_trip(self):
+        for serializer in AVAILABLE:
+            with self.subTest(serializer=serializer.name):
+                self.assertEqual(list(self.records.items()),
+                                 self.round_trip(serializer, self.records))
+
+    def test_empty(self):
+        for serializer in AVAILABLE:
+            with self.subTest(serializer=serializer.name):
+                self.assertEqual([], self.round_trip(serializer, {}))
+
+    def test_magic(self):
+        for serializer in AVAILABLE:
+            with self.subTest(serializer=serializer.name):
+                f = io.BytesIO()
+                serializer.dump(f, [])
+                self.assertIs(serializer if serializer.magic else None,
+                              serializers.by_magic(f.getvalue()[:8]))
+
+    def test_text_records(self):
+        for serializer in AVAILABLE:
+            if serializer.text:
+                self.assertIsInstance(serializer.dumps({}), str)
+
+    def test_get(self):
+        self.assertIs(serializers.SERIALIZERS["pickle"],
+                      serializers.get("pickle"))
+        with self.assertRaises(ValueError):
+            serializers.get("yaml")
+
+    def test_get_falls_back_to_json(self):
+        with patch("models.engine.serializers.orjson", None), \
+                patch("models.engine.serializers.msgpack", None):
+            self.assertEqual("json", serializers.get("orjson").name)
+            self.assertEqual("json", serializers.get("msgpack").name)
+
+    def test_by_magic_not_installed(self):
+        with patch("models.engine.serializers.msgpack", None):
+            with self.assertRaises(ValueError):
+                serializers.by_magic(b"HBNBMPK1")
+
+
+class TestSerializers_storage(unittest.TestCase):
+    """Unittests for testing FileStorage with every serializer."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+
+    def tearDown(self):
+        for snapshot in set(FileStorage._FileStorage__maps.values()):
+            snapshot.close()
+        FileStorage._FileStorage__maps = {}
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__raw_by_class = {}
+        FileStorage._FileStorage__serializer = serializers.get("json")
+        FileStorage._FileStorage__format = "json"
+        FileStorage._FileStorage__stale = []
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__log_path = "file.json.log"
+        FileStorage._FileStorage__fragments = {}
+        FileStorage._FileStorage__objects = {}
+        extensions = [serializer.extension for serializer in
+                      serializers.SERIALIZERS.values()] + [".hbnb"]
+        for extension in extensions:
+            for path in ("test" + extension, "test" + extension + ".log"):
+                try:
+                    os.remove(path)
+                except IOError:
+                    pass
+
+    def use(self, serializer):
+        FileStorage._FileStorage__serializer = serializer
+        FileStorage._FileStorage__file_path = "test" + serializer.extension
+        FileStorage._FileStorage__log_path = "test{}.log".format(
+            serializer.extension)
+        FileStorage._FileStorage__fragments = {}
+        FileStorage._FileStorage__objects = {}
+
+    def make_objects(self):
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        pl.name = "Café"
+        pl.number_rooms = 3
+        pl.latitude = 37.77
+        pl.amenity_ids = ["a", "b"]
+        pl.updated_at = datetime(2017, 9, 28, 21, 3, 54)
+        return us, pl
+
+    def reload(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        models.storage.reload()
+
+    def test_round_trip(self):
+        for serializer in AVAILABLE:
+            with self.subTest(serializer=serializer.name):
+                self.use(serializer)
+                objs = self.make_objects()
+                models.storage.save()
+                self.reload()
+                for obj in objs:
+                    key = "{}.{}".format(type(obj).__name__, obj.id)
+                    reloaded = models.storage.all()[key]
+                    self.assertEqual(obj.to_dict(), reloaded.to_dict())
+                    self.assertEqual(obj.updated_at, reloaded.updated_at)
+
+    def test_magic_picks_codec(self):
+        for serializer in AVAILABLE:
+            with self.subTest(serializer=serializer.name):
+                self.use(serializer)
+                us, pl = self.make_objects()
+                models.storage.save()
+                FileStorage._FileStorage__serializer = serializers.get("json")
+                self.reload()
+                self.assertEqual(2, models.storage.count())
+
+    def test_switch_codec(self):
+        for journal in (False, True):
+            for serializer in AVAILABLE:
+                if serializer.extension == ".json":
+                    continue
+                with self.subTest(serializer=serializer.name,
+                                  journal=journal):
+                    self.use(serializers.get("json"))
+                    FileStorage._FileStorage__journal = journal
+                    us, pl = self.make_objects()
+                    models.storage.compact()
+                    us.last_name = "Holberton"
+                    models.storage.save()
+                    self.use(serializer)
+                    self.reload()
+                    self.assertEqual(2, models.storage.count())
+                    self.assertEqual(
+                        "Holberton",
+                        models.storage.get(User, us.id).last_name)
+                    models.storage.compact()
+                    self.assertFalse(os.path.exists("test.json"))
+                    self.assertFalse(os.path.exists("test.json.log"))
+                    self.reload()
+                    self.assertEqual(2, models.storage.count())
+                    os.remove("test" + serializer.extension)
+
+    def test_switch_format(self):
+        us, pl = self.make_objects()
+        self.use(serializers.get("json"))
+        models.storage.new(us)
+        models.storage.new(pl)
+        models.storage.save()
+        FileStorage._FileStorage__format = "binary"
+        FileStorage._FileStorage__file_path = "test.hbnb"
+        FileStorage._FileStorage__log_path = "test.hbnb.log"
+        self.reload()
+        self.assertEqual(us.to_dict(),
+                         models.storage.get(User, us.id).to_dict())
+        models.storage.save()
+        self.assertFalse(os.path.exists("test.json"))
+        self.reload()
+        self.assertEqual(2, models.storage.count())
+
+    def test_journal(self):
+        for serializer in AVAILABLE:
+            with self.subTest(serializer=serializer.name):
+                self.use(serializer)
+                FileStorage._FileStorage__journal = True
+                us, pl = self.make_objects()
+                models.storage.compact()
+                us.last_name = "Holberton"
+                models.storage.delete(pl)
+                models.storage.save()
+                self.reload()
+                self.assertEqual(
+                    "Holberton",
+                    models.storage.get(User, us.id).last_name)
+                self.assertIsNone(models.storage.get(Place, pl.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,454 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/sqlite_storage.py.
+
+Unittest classes:
+    TestSQLiteStorage_instantiation
+    TestSQLiteStorage_methods
+    TestSQLiteStorage_columns
+    TestSQLiteStorage_console
+"""
+import json
+import os
+import sqlite3
+import unittest
+import models
+from io import StringIO
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.engine.file_storage import FileStorage
+from models.engine.sqlite_storage import SQLiteStorage
+from models.engine.storage_engine import StorageEngine
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Run each test on a fresh database installed as models.storage."""
+
+    def setUp(self):
+        SQLiteStorage._SQLiteStorage__db_path = "test.db"
+        self.storage = SQLiteStorage()
+        self.storage.reload()
+        patcher = patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.storage.close()
+        SQLiteStorage._SQLiteStorage__batches = 0
+        SQLiteStorage._SQLiteStorage__owed = False
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+
+    def reopen(self):
+        """Drop every object in use and reopen the database."""
+        self.storage.close()
+        self.storage.reload()
+
+
+class TestSQLiteStorage_instantiation(unittest.TestCase):
+    """Unittests for testing instantiation of the SQLiteStorage class."""
+
+    def test_is_storage_engine(self):
+        self.assertIsInstance(SQLiteStorage(), StorageEngine)
+
+    def test_file_storage_is_storage_engine(self):
+        self.assertIsInstance(FileStorage(), StorageEngine)
+
+    def test_interface_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            StorageEngine().all()
+
+
+class TestSQLiteStorage_methods(SQLiteTestCase):
+    """Unittests for testing methods of the SQLiteStorage class."""
+
+    def test_save_and_reload(self):
+        bm = BaseModel()
+        us = User()
+        us.email = "betty@holberton.io"
+        models.storage.save()
+        bm_dict = bm.to_dict()
+        us_dict = us.to_dict()
+        del bm, us
+        self.reopen()
+        self.assertEqual(bm_dict, models.storage.get(
+            BaseModel, bm_dict["id"]).to_dict())
+        self.assertEqual(us_dict, models.storage.get(
+            "User", us_dict["id"]).to_dict())
+
+    def test_values_keep_their_type(self):
+        pl = Place()
+        pl.name = "Loft"
+        pl.number_rooms = 3
+        pl.latitude = 37.77
+        pl.amenity_ids = ["a", "b"]
+        pl.smoking = False
+        pl.owner = None
+        pl.save()
+        pl_dict = pl.to_dict()
+        del pl
+        self.reopen()
+        self.assertEqual(pl_dict, models.storage.get(
+            Place, pl_dict["id"]).to_dict())
+
+    def test_get_returns_object_in_use(self):
+        us = User()
+        us.save()
+        self.assertIs(us, models.storage.get(User, us.id))
+        self.assertIs(us, models.storage.all(User)["User." + us.id])
+
+    def test_get_missing(self):
+        self.assertIsNone(models.storage.get(User, "1234"))
+        self.assertIsNone(models.storage.get("NoClass", "1234"))
+
+    def test_exists(self):
+        us = User()
+        self.assertTrue(models.storage.exists(User, us.id))
+        us.save()
+        id = us.id
+        del us
+        self.reopen()
+        self.assertTrue(models.storage.exists("User", id))
+        self.assertEqual({}, dict(SQLiteStorage._SQLiteStorage__live))
+        self.assertFalse(models.storage.exists(State, id))
+        self.assertFalse(models.storage.exists("NoClass", id))
+
+    def test_unsaved_changes_are_visible(self):
+        us = User()
+        self.assertEqual(1, models.storage.count(User))
+        self.assertIn("User." + us.id, models.storage.all())
+        us.first_name = "Betty"
+        self.assertEqual(1, models.storage.columns(User).aggregate("count"))
+
+    def test_reload_drops_unsaved_changes(self):
+        us = User()
+        us.save()
+        us.first_name = "Betty"
+        User()
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count())
+        self.assertNotIn("first_name",
+                         models.storage.get(User, us.id).to_dict())
+
+    def test_update_rewrites_row(self):
+        us = User()
+        us.save()
+        us.first_name = "Betty"
+        us.save()
+        id = us.id
+        del us
+        self.reopen()
+        self.assertEqual("Betty", models.storage.get(User, id).first_name)
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_delete(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        models.storage.delete(us)
+        models.storage.delete(None)
+        models.storage.save()
+        self.reopen()
+        self.assertIsNone(models.storage.get(User, us.id))
+        self.assertIsNotNone(models.storage.get(State, st.id))
+
+    def test_count(self):
+        for _ in range(3):
+            User()
+        State()
+        self.assertEqual(3, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(0, models.storage.count("NoClass"))
+        self.assertEqual(4, models.storage.count())
+
+    def test_children(self):
+        st = State()
+        ci = City()
+        ci.state_id = st.id
+        City()
+        self.assertEqual({"City." + ci.id: ci},
+                         models.storage.children(State, st.id, City))
+        self.assertEqual({}, models.storage.children(State, st.id, User))
+
+    def test_since(self):
+        for i, cls in enumerate((User, State, User)):
+            models.storage.new(cls(
+                id=str(i), created_at="2023-08-1{}T10:00:00".format(i),
+                updated_at="2023-08-2{}T10:00:00".format(i)))
+        models.storage.save()
+        self.reopen()
+        self.assertEqual(["State.1", "User.2"],
+                         list(models.storage.since("2023-08-21T10:00:00")))
+        self.assertEqual(["User.2"],
+                         list(models.storage.since("2023-08-21", User)))
+        self.assertEqual(["State.1", "User.2"], list(models.storage.since(
+            "2023-08-11", field="created_at")))
+        self.assertEqual({}, models.storage.since("2023-08-01", "NoClass"))
+        with self.assertRaises(ValueError):
+            models.storage.since("2023-08-21", field="id")
+
+    def test_nearby_and_bbox(self):
+        keys = []
+        for lat, lon in ((37.80, -122.27), (37.77, -122.41), (-17.0, 179.99),
+                         (-17.0, -179.99)):
+            pl = Place()
+            pl.latitude = lat
+            pl.longitude = lon
+            keys.append("Place." + pl.id)
+        Place()
+        models.storage.save()
+        self.reopen()
+        self.assertEqual([keys[1], keys[0]],
+                         list(models.storage.nearby(37.77, -122.41, 20)))
+        self.assertEqual([keys[1]], list(models.storage.nearby(
+            37.77, -122.41, 20, limit=1)))
+        self.assertEqual(keys[2:], list(models.storage.nearby(
+            -17.0, 179.999, 10)))
+        self.assertEqual(sorted(keys[2:]), sorted(models.storage.bbox(
+            -18, 179, -16, -179)))
+        self.assertEqual({}, models.storage.nearby(0, 0, 10, cls=User))
+        with self.assertRaises(ValueError):
+            models.storage.bbox(10, 0, 0, 10)
+
+    def test_search(self):
+        keys = []
+        for name, description in (("Loft", "Bright loft with a pool"),
+                                  ("Cabin", "Quiet cabin, pool and pool "
+                                            "table"),
+                                  ("Studio", "Small studio downtown")):
+            pl = Place()
+            pl.name = name
+            pl.description = description
+            keys.append("Place." + pl.id)
+        models.storage.save()
+        self.reopen()
+        self.assertEqual([keys[1], keys[0]],
+                         list(models.storage.search(Place, "POOL")))
+        self.assertEqual([keys[1]], list(models.storage.search(
+            "Place", "pool", limit=1)))
+        self.assertEqual({}, models.storage.search(Place, ", ;"))
+        studio = models.storage.get(Place, keys[2].partition(".")[2])
+        studio.description = "Big pool"
+        studio.save()
+        models.storage.delete(models.storage.get(
+            Place, keys[1].partition(".")[2]))
+        models.storage.save()
+        self.assertEqual([keys[2], keys[0]],
+                         list(models.storage.search(Place, "pool")))
+        self.assertEqual({}, models.storage.search(Place, "downtown"))
+        with self.assertRaises(ValueError):
+            models.storage.search(User, "pool")
+
+    def test_search_after_reopen(self):
+        pl = Place()
+        pl.description = "Bright loft with a pool"
+        models.storage.save()
+        self.reopen()
+        self.assertEqual(["Place." + pl.id],
+                         list(models.storage.search(Place, "pool")))
+        self.reopen()
+        self.assertEqual(["Place." + pl.id],
+                         list(models.storage.search(Place, "pool")))
+
+    def test_search_index_dropped_with_unsaved_rows(self):
+        pl = Place()
+        pl.description = "Bright loft with a pool"
+        models.storage.save()
+        Place().description = "Quiet cabin by the pool"
+        models.storage.count(Place)
+        self.assertEqual(2, len(models.storage.search(Place, "pool")))
+        self.reopen()
+        self.assertEqual(["Place." + pl.id],
+                         list(models.storage.search(Place, "pool")))
+
+    def test_query(self):
+        places = []
+        for price, guests, name in ((80, 2, "Loft"), (150, 4, "Cabin"),
+                                    (60, 1, "Studio"), (95, 3, "Loft")):
+            pl = Place()
+            pl.price_by_night = price
+            pl.max_guest = guests
+            pl.name = name
+            places.append("Place." + pl.id)
+        models.storage.save()
+        self.reopen()
+        found = models.storage.query(Place, [("price_by_night", "<", "100"),
+                                             ("max_guest", ">=", 2)],
+                                     ["-price_by_night"])
+        self.assertEqual([places[3], places[0]],
+                         ["Place." + obj.id for obj in found])
+        found = models.storage.query("Place", order_by=["name", "id"],
+                                     limit=2)
+        self.assertEqual(["Cabin", "Loft"], [obj.name for obj in found])
+        found = models.storage.query(Place, [("updated_at", ">=",
+                                              "2000-01-01")])
+        self.assertEqual(4, len(list(found)))
+        with self.assertRaises(KeyError):
+            models.storage.query(Place, [("nope", "==", 1)])
+        with self.assertRaises(ValueError):
+            models.storage.query(Place, [("max_guest", "==", "many")])
+
+    def test_to_json(self):
+        pl = Place()
+        pl.name = "Loft"
+        pl.save()
+        id = pl.id
+        del pl
+        self.reopen()
+        pl = models.storage.get(Place, id)
+        self.assertEqual(pl.to_dict(),
+                         json.loads(models.storage.to_json(pl)))
+
+    def test_batch_commits_once(self):
+        models.storage.begin()
+        User().save()
+        models.storage.save()
+        self.assertEqual(1, models.storage.count(User))
+        conn = sqlite3.connect("test.db")
+        try:
+            self.assertEqual(0, conn.execute(
+                'SELECT COUNT(*) FROM "User"').fetchone()[0])
+            models.storage.commit()
+            self.assertEqual(1, conn.execute(
+                'SELECT COUNT(*) FROM "User"').fetchone()[0])
+        finally:
+            conn.close()
+
+    def test_commit_without_begin(self):
+        with self.assertRaises(RuntimeError):
+            models.storage.commit()
+
+    def test_new_field_adds_column(self):
+        conn = sqlite3.connect("test.db")
+        conn.execute('CREATE TABLE "City" (id TEXT PRIMARY KEY, '
+                     'created_at, updated_at, extra, name)')
+        conn.commit()
+        conn.close()
+        self.reopen()
+        ci = City()
+        ci.state_id = "s1"
+        ci.save()
+        id = ci.id
+        del ci
+        self.reopen()
+        self.assertEqual("s1", models.storage.get(City, id).state_id)
+
+
+class TestSQLiteStorage_columns(SQLiteTestCase):
+    """Unittests for testing SQL queries of SQLiteStorage.columns()."""
+
+    def setUp(self):
+        super().setUp()
+        self.places = []
+        for guests, price, city in ((2, 50, "c1"), (4, 100, "c1"),
+                                    (6, 300, "c2")):
+            pl = Place()
+            pl.max_guest = guests
+            pl.price_by_night = price
+            pl.city_id = city
+            self.places.append(pl)
+        models.storage.save()
+
+    def test_aggregate(self):
+        columns = models.storage.columns(Place)
+        self.assertEqual(3, columns.aggregate("count"))
+        self.assertEqual(450.0, columns.aggregate("sum", "price_by_night"))
+        self.assertEqual(4.0, columns.aggregate("avg", "max_guest"))
+        self.assertEqual(2.0, columns.aggregate("min", "max_guest"))
+        self.assertEqual(300.0, columns.aggregate("max", "price_by_night"))
+
+    def test_aggregate_conditions(self):
+        columns = models.storage.columns("Place")
+        self.assertEqual(2, columns.aggregate("count", None,
+                                              [("city_id", "==", "c1")]))
+        self.assertEqual(400.0, columns.aggregate(
+            "sum", "price_by_night", [("max_guest", ">=", "4")]))
+        self.assertIsNone(columns.aggregate("max", "max_guest",
+                                            [("city_id", "=", "c9")]))
+
+    def test_unset_fields_match_file_storage(self):
+        file_storage = FileStorage()
+        for name in ("objects", "pending"):
+            patcher = patch.object(FileStorage, "_FileStorage__" + name, {})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        stamp = "2024-01-01T00:00:00"
+        for i, kwargs in enumerate(({"max_guest": 2, "name": "Loft"}, {},
+                                    {"price_by_night": 80})):
+            pl = Place(id="p{}".format(i), created_at=stamp,
+                       updated_at=stamp, **kwargs)
+            file_storage.new(pl)
+            models.storage.new(pl)
+        for pl in self.places:
+            file_storage.new(pl)
+        for conditions, order_by in (([("max_guest", "==", 0)], ["id"]),
+                                     ([("name", "==", "")], ["id"]),
+                                     ([("price_by_night", "<", 60)],
+                                      ["price_by_night", "id"]),
+                                     ([], ["-max_guest", "id"])):
+            self.assertEqual(
+                [pl.id for pl in file_storage.query(Place, conditions,
+                                                    order_by)],
+                [pl.id for pl in models.storage.query(Place, conditions,
+                                                      order_by)])
+        for func, field, conditions in (
+                ("avg", "price_by_night", []),
+                ("min", "max_guest", []),
+                ("count", None, [("max_guest", "<=", 0)]),
+                ("sum", "price_by_night", [("city_id", "==", "")])):
+            self.assertEqual(
+                file_storage.columns(Place).aggregate(func, field,
+                                                      conditions),
+                models.storage.columns(Place).aggregate(func, field,
+                                                        conditions))
+
+    def test_select(self):
+        keys = models.storage.columns(Place).select([("max_guest", "<", 5)])
+        self.assertEqual(sorted("Place." + pl.id for pl in self.places[:2]),
+                         sorted(keys))
+
+    def test_errors(self):
+        columns = models.storage.columns(Place)
+        with self.assertRaises(ValueError):
+            columns.aggregate("median", "max_guest")
+        with self.assertRaises(KeyError):
+            columns.aggregate("sum", "name")
+        with self.assertRaises(KeyError):
+            columns.select([("nope", "==", 1)])
+        with self.assertRaises(ValueError):
+            columns.select([("max_guest", "==", "many")])
+
+
+class TestSQLiteStorage_console(SQLiteTestCase):
+    """Unittests for testing the console on top of SQLiteStorage."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch("console.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_update_destroy(self):
+        from console import HBNBCommand
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("update Place {} max_guest 4".format(id))
+            HBNBCommand().onecmd("Place.stats(sum, max_guest)")
+            self.assertEqual("4.0", output.getvalue().strip())
+        self.reopen()
+        self.assertEqual(4, models.storage.get(Place, id).max_guest)
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("destroy Place {}".format(id))
+            HBNBCommand().onecmd("count Place")
+            self.assertEqual("0", output.getvalue().strip())
+
+
+if __name__ == "__main__":
+    unittest.main()